@@ -0,0 +1,152 @@
+"""
+File name: batch_rank.py
+Description: Ranks the backlogs of many users at once, e.g. to precompute their suggestions overnight.
+
+Author: Lacie Turner
+Date created: 2026-10-18
+Date last modified: 2026-10-18
+Python Version: 3.12
+"""
+
+from __future__ import annotations
+
+__author__ = "Lacie Turner"
+__maintainer__ = "Lacie Turner"
+__email__ = "tasketai@lacie.dev"
+__credits__ = ["Lacie Turner"]
+__status__ = "Development"
+__version__ = "0.0.1"
+
+import os
+import sys
+import json
+import time
+import argparse
+from pathlib import Path
+from functools import partial
+from concurrent.futures import ProcessPoolExecutor
+import prototype.src.task as task
+import prototype.src.user_data as user_data
+from prototype.src.storage import RANK_COLUMNS, STORAGE_TYPES, get_storage, replace_file
+from prototype.src.suggestions import VELOCITY_TIERS
+
+TOP_N = 10
+RECORDS_MAX_TASKS = 2_000  # backlogs up to this many tasks rank faster as Task records than as a DataFrame
+
+
+def find_users(source: Path) -> list:
+	"""
+	Finds the users to rank.
+
+	:param source: Either a directory, where every task file <name>-tasks.<format> is paired with the data file
+	               <name>.json, or a manifest with one JSON object per line, e.g.
+	               {"user": "ada", "data_file": "ada.json", "task_file": "ada-tasks.csv"}. Relative paths in a manifest
+	               are relative to the manifest.
+	:return: A dict with the user, data_file and task_file of each user.
+	"""
+	source = Path(source)
+	if source.is_dir():
+		return [{"user": task_file.name.rsplit("-tasks", 1)[0], "task_file": str(task_file),
+		         "data_file": str(source / f"{task_file.name.rsplit('-tasks', 1)[0]}.json")}
+		        for task_file in sorted(source.glob("*-tasks.*")) if task_file.suffix.lower() in STORAGE_TYPES]
+
+	users = []
+	with open(source, encoding="UTF-8") as f:
+		for line in f:
+			if not line.strip():
+				continue
+			entry = json.loads(line)
+			users.append({"user": entry.get("user", Path(entry["task_file"]).stem),
+			              "task_file": str(source.parent / entry["task_file"]),
+			              "data_file": str(source.parent / entry["data_file"]) if entry.get("data_file") else None})
+	return users
+
+
+def rank_user(user: dict, top: int = TOP_N, schema_file: Path = user_data.USER_DATA_SCHEMA_FILE) -> dict:
+	"""
+	Ranks one user's backlog and picks their top suggestions for every velocity, leaving out today's selected and
+	rejected tasks. Runs in a worker process.
+
+	:param user: The user, data_file and task_file of the user.
+	:param top: The number of suggestions per velocity.
+	:param schema_file: The schema of the user data, used if the data file is empty.
+	:return: The user and the IDs of their suggested tasks per velocity, best first, or the error that stopped them
+	         from being ranked.
+	"""
+	from prototype.src.rank_tasks import rank_top_k_by_effort, rank_top_k_records_by_effort
+	from prototype.src.suggestions import suggest_from_tiers
+
+	try:
+		excluded_tasks = set()
+		data_file = Path(user["data_file"]) if user.get("data_file") else None
+		# a user whose changes have not been compacted yet only has an event log
+		if data_file and (data_file.exists() or data_file.with_suffix(".log").exists()):
+			session = user_data.new_session(user["data_file"], user["task_file"], schema_file, login=False)
+			excluded_tasks = set(session.get_attr('selected_tasks')) | set(session.get_attr('rejected_tasks'))
+
+		# each tier only has to be ranked as far as its top suggestions, plus the tasks that are left out
+		k = top + len(excluded_tasks)
+		# reading one task past the limit tells whether the backlog is small, without reading the rest of a large one
+		tasks = get_storage(user["task_file"]).read_page(0, RECORDS_MAX_TASKS + 1)
+		if len(tasks) <= RECORDS_MAX_TASKS:
+			# a small backlog is ranked faster without building DataFrames, and for CSV and SQLite without pandas at all
+			ranked_tiers = {effort: [ranked_task.id for ranked_task, _ in ranked_tier] for effort, ranked_tier in
+			                rank_top_k_records_by_effort(tasks, k).items()}
+		else:
+			ranked_tiers = {effort: ranked_tier['id'].tolist() for effort, ranked_tier in
+			                rank_top_k_by_effort(task.load(user["task_file"], RANK_COLUMNS), k).items()}
+		suggestions = {velocity: suggest_from_tiers(ranked_tiers, velocity, exclude=excluded_tasks, limit=top)
+		               for velocity in VELOCITY_TIERS}
+	except Exception as err:
+		return {"user": user["user"], "error": f"{type(err).__name__}: {err}"}
+
+	return {"user": user["user"], "suggestions": suggestions}
+
+
+def rank_users(users: list, output_file: Path, top: int = TOP_N, workers: int = None,
+               schema_file: Path = user_data.USER_DATA_SCHEMA_FILE) -> dict:
+	"""
+	Ranks many users' backlogs across a pool of worker processes, writing one JSON line of suggestions per user.
+
+	:param users: The users, as returned by find_users.
+	:param output_file: The file to write the suggestions to. It is only replaced once every user has been ranked.
+	:param top: The number of suggestions per velocity.
+	:param workers: The number of worker processes. Defaults to the number of cores.
+	:param schema_file: The schema of the user data.
+	:return: The number of users ranked, the number that failed, and the users ranked per second.
+	"""
+	workers = workers or os.cpu_count()
+	# hand the workers several users at a time, so small backlogs are not dominated by the round trips
+	chunk_size = max(1, len(users) // (workers * 4))
+	counts = {"users": 0, "errors": 0}
+	start = time.perf_counter()
+
+	def write(temp_file):
+		with ProcessPoolExecutor(workers) as pool, open(temp_file, "w", encoding="UTF-8") as f:
+			for result in pool.map(partial(rank_user, top=top, schema_file=schema_file), users, chunksize=chunk_size):
+				f.write(json.dumps(result) + "\n")
+				counts["users"] += 1
+				counts["errors"] += "error" in result
+
+	replace_file(Path(output_file), write)
+	seconds = time.perf_counter() - start
+
+	return {**counts, "seconds": seconds, "users_per_second": counts["users"] / seconds if seconds else 0.0}
+
+
+def main(argv: list = None):
+	parser = argparse.ArgumentParser(description="Precomputes the top suggestions of many users, in parallel.")
+	parser.add_argument("source", type=Path, help="directory of <name>.json and <name>-tasks.csv files, or a manifest "
+	                                              "with one {\"user\", \"data_file\", \"task_file\"} object per line")
+	parser.add_argument("--output", type=Path, required=True, help="file to write one JSON line per user to")
+	parser.add_argument("--top", type=int, default=TOP_N, help="suggestions per velocity")
+	parser.add_argument("--workers", type=int, help="worker processes, defaults to the number of cores")
+	args = parser.parse_args(argv)
+
+	stats = rank_users(find_users(args.source), args.output, args.top, args.workers)
+	print(f"{stats['users']} users ranked in {stats['seconds']:.2f}s ({stats['users_per_second']:.1f} users/s), "
+	      f"{stats['errors']} failed", file=sys.stderr)
+
+
+if __name__ == "__main__":
+	main()
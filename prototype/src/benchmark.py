@@ -0,0 +1,208 @@
+"""
+File name: benchmark.py
+Description: Times loading, ranking, suggesting and adding tasks on generated backlogs of increasing size.
+
+Author: Lacie Turner
+Date created: 2026-10-18
+Date last modified: 2026-10-18
+Python Version: 3.12
+"""
+
+__author__ = "Lacie Turner"
+__maintainer__ = "Lacie Turner"
+__email__ = "tasketai@lacie.dev"
+__credits__ = ["Lacie Turner"]
+__status__ = "Development"
+__version__ = "0.0.1"
+
+import io
+import sys
+import json
+import time
+import argparse
+import platform
+import subprocess
+import tempfile
+import tracemalloc
+import contextlib
+import pandas as pd
+from pathlib import Path
+import prototype.src.task as task
+import prototype.src.user_data as user_data
+from prototype.tasketai import get_suggestions
+from prototype.src.task_gen import generate_task_chunks, write_csv
+from prototype.src.rank_tasks import rank_tasks
+from prototype.src.rank_cache import RankCache
+from prototype.src.ranked_index import RankedIndex
+from prototype.src.suggestions import suggest_from_tiers
+
+SIZES = [1_000, 10_000, 100_000]
+REPEAT = 3
+NUM_ADDS = 100
+SCHEMA_FILE = Path(__file__).resolve().parent.parent / "data" / "__user-data-schema.json"
+ROOT_DIR = Path(__file__).resolve().parent.parent.parent
+STARTUP_MODULES = ["prototype.src.task", "prototype.src.user_data", "prototype.tasketai"]
+STARTUP_TARGET = 0.15  # seconds to import the program, without pandas or inquirer
+
+
+def measure(function, repeat: int = REPEAT) -> dict:
+	"""
+	Times a function and measures its peak memory.
+
+	The wall time is the best of several runs without memory tracing, as tracing slows every allocation down. The peak
+	memory is then measured in one extra, traced run.
+
+	:param function: The function to measure. Called without arguments.
+	:param repeat: The number of timed runs.
+	:return: The best wall time in seconds and the peak traced memory in bytes.
+	"""
+	seconds = min(timed(function) for _ in range(repeat))
+
+	tracemalloc.start()
+	try:
+		function()
+		_, peak_memory = tracemalloc.get_traced_memory()
+	finally:
+		tracemalloc.stop()
+
+	return {"seconds": seconds, "peak_memory_bytes": peak_memory}
+
+
+def timed(function) -> float:
+	start = time.perf_counter()
+	function()
+	return time.perf_counter() - start
+
+
+def import_time(module: str, repeat: int = REPEAT) -> dict:
+	"""
+	Measures how long a module takes to import in a fresh interpreter, as reported by python -X importtime.
+
+	:param module: The module to import, e.g. "prototype.tasketai".
+	:param repeat: The number of fresh interpreters to start.
+	:return: The best cumulative import time in seconds, and the three slowest imports it includes.
+	"""
+	best = None
+	for _ in range(repeat):
+		report = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"], cwd=ROOT_DIR,
+		                        capture_output=True, text=True, check=True).stderr
+		# lines look like "import time:   self [us] | cumulative | imported package"
+		imports = [line.split("|") for line in report.splitlines() if line.startswith("import time:") and "[us]" not in line]
+		imports = [(int(cumulative) / 1e6, name.strip()) for _, cumulative, name in imports]
+		seconds = next(seconds for seconds, name in reversed(imports) if name == module)
+		if best is None or seconds < best["seconds"]:
+			slowest = sorted((entry for entry in imports if entry[1] != module), reverse=True)[:3]
+			best = {"seconds": seconds, "slowest_imports": {name: seconds for seconds, name in slowest}}
+
+	return best
+
+
+def benchmark_size(num_tasks: int, directory: Path, repeat: int = REPEAT) -> dict:
+	"""
+	Benchmarks every operation on a generated backlog of the given size.
+
+	:param num_tasks: The number of tasks to generate.
+	:param directory: The directory to write the task and user data files to.
+	:param repeat: The number of timed runs per operation.
+	:return: The measurements per operation.
+	"""
+	task_file = directory / f"tasks-{num_tasks}.csv"
+	data_file = directory / f"user-data-{num_tasks}.json"
+	results = {"generate": measure(lambda: write_csv(generate_task_chunks(num_tasks, seed=num_tasks), task_file), repeat=1)}
+
+	results["task.load"] = measure(lambda: task.load(task_file), repeat)
+	task_dataframe = task.load(task_file)
+	results["rank_tasks.rank_tasks"] = measure(lambda: rank_tasks(task_dataframe), repeat)
+	results["RankedIndex"] = measure(lambda: RankedIndex(task_dataframe), repeat)
+	results["task.get_ranked_index"] = measure(lambda: task.get_ranked_index(task_file), repeat)
+
+	cache_dir = directory / f"rank-cache-{num_tasks}"
+	RankCache(cache_dir).get(task_file, "ranked_index", lambda: RankedIndex(task_dataframe))
+	# a fresh cache, as in a new process, so the ranked index comes from the snapshot on disk
+	results["rank_cache.snapshot"] = measure(
+		lambda: RankCache(cache_dir).get(task_file, "ranked_index", lambda: RankedIndex(task_dataframe)), repeat)
+
+	user_data.open_session(data_file, task_file, SCHEMA_FILE)
+	for velocity in range(1, 4):
+		get_suggestions(velocity)  # warm up the ranked index, as the suggestion menu does
+		results[f"get_suggestions.velocity_{velocity}"] = measure(lambda: get_suggestions(velocity), repeat)
+
+	ranked_tasks = rank_tasks(task_dataframe)
+	effort_ids = {effort: list(ranked_tasks.loc[ranked_tasks['effort'] == effort, 'id']) for effort in range(1, 4)}
+	results["suggest_from_tiers"] = measure(lambda: suggest_from_tiers(effort_ids, 3), repeat)
+
+	def add_tasks():
+		with contextlib.redirect_stdout(io.StringIO()):
+			for num in range(NUM_ADDS):
+				task.add(f"benchmark task {num}", 3, 3, 2, task_file)
+
+	add_result = measure(add_tasks, repeat)
+	results["task.add"] = {"seconds": add_result["seconds"] / NUM_ADDS,
+	                       "peak_memory_bytes": add_result["peak_memory_bytes"]}
+
+	return results
+
+
+def compare(results: dict, baseline: dict, threshold: float) -> list:
+	"""
+	Compares the wall times of two benchmark runs.
+
+	:param results: The current run.
+	:param baseline: The run to compare against.
+	:param threshold: The slowdown ratio above which an operation counts as a regression.
+	:return: (size, operation, ratio) tuples of every regression.
+	"""
+	regressions = []
+	for size, operations in results["sizes"].items():
+		for operation, measurement in operations.items():
+			baseline_measurement = baseline["sizes"].get(size, {}).get(operation)
+			if not baseline_measurement or not baseline_measurement["seconds"]:
+				continue
+			ratio = measurement["seconds"] / baseline_measurement["seconds"]
+			if ratio > threshold:
+				regressions.append((size, operation, ratio))
+
+	return regressions
+
+
+def main(argv: list = None):
+	parser = argparse.ArgumentParser(description="Benchmarks Tasketai on generated task backlogs.")
+	parser.add_argument("--sizes", type=int, nargs="+", default=SIZES, help="backlog sizes, e.g. 1000 10000000")
+	parser.add_argument("--repeat", type=int, default=REPEAT, help="timed runs per operation")
+	parser.add_argument("--output", type=Path, help="write the results to this JSON file instead of stdout")
+	parser.add_argument("--compare", type=Path, help="a previous JSON result to check for regressions")
+	parser.add_argument("--threshold", type=float, default=1.25, help="slowdown ratio that counts as a regression")
+	args = parser.parse_args(argv)
+
+	results = {
+		"python": platform.python_version(),
+		"pandas": pd.__version__,
+		"machine": platform.machine(),
+		"startup": {module: import_time(module, args.repeat) for module in STARTUP_MODULES},
+		"sizes": {},
+	}
+	with tempfile.TemporaryDirectory() as directory:
+		for size in args.sizes:
+			results["sizes"][str(size)] = benchmark_size(size, Path(directory), args.repeat)
+
+	output = json.dumps(results, indent=2)
+	if args.output:
+		args.output.write_text(output)
+	else:
+		print(output)
+
+	for module, measurement in results["startup"].items():
+		if measurement["seconds"] > STARTUP_TARGET:
+			print(f"[WARN] importing {module} takes {measurement['seconds']:.3f}s, more than the {STARTUP_TARGET}s target",
+			      file=sys.stderr)
+
+	if args.compare:
+		regressions = compare(results, json.loads(args.compare.read_text()), args.threshold)
+		for size, operation, ratio in regressions:
+			print(f"[WARN] {operation} on {size} tasks is {ratio:.2f}x slower than {args.compare}", file=sys.stderr)
+		if regressions:
+			sys.exit(1)
+
+
+if __name__ == "__main__":
+	main()
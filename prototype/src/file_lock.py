@@ -0,0 +1,80 @@
+"""
+File name: file_lock.py
+Description: Locks data files against other processes while they are read or written.
+
+Author: Lacie Turner
+Date created: 2026-10-18
+Date last modified: 2026-10-18
+Python Version: 3.12
+"""
+
+__author__ = "Lacie Turner"
+__maintainer__ = "Lacie Turner"
+__email__ = "tasketai@lacie.dev"
+__credits__ = ["Lacie Turner"]
+__status__ = "Development"
+__version__ = "0.0.1"
+
+import os
+import threading
+import contextlib
+from pathlib import Path
+
+try:
+	import fcntl
+except ModuleNotFoundError:
+	fcntl = None  # not available on Windows, where files are left unlocked
+
+# lock file: [file descriptor, shared, depth], so a thread can take the lock of a file it already holds. Each thread
+# opens the lock file itself, and the locks of separate opens exclude each other even within a process.
+_local = threading.local()
+
+
+def lock_file(data_file: Path) -> Path:
+	"""
+	Gets the lock file of a data file. The data file itself is not locked, as it may be replaced by a rename, which
+	would leave the lock on the old file.
+
+	:param data_file: The data file, e.g. a task file.
+	:return: The lock file next to it.
+	"""
+	data_file = Path(data_file)
+	return data_file.with_name(f".{data_file.name}.lock")
+
+
+@contextlib.contextmanager
+def locked(data_file: Path, shared: bool = False):
+	"""
+	Locks a data file for the length of the with block, waiting for other processes to release it first.
+
+	Any number of processes can hold a shared lock at once, e.g. to read the file, but only one can hold an exclusive
+	lock, e.g. to append to or replace the file. Taking the lock again while the same thread already holds it, e.g.
+	reading the file from within a write, does not wait.
+
+	:param data_file: The data file to lock.
+	:param shared: Whether to take a shared lock instead of an exclusive one.
+	:raises: RuntimeError if an exclusive lock is taken while only a shared lock is held, which could wait forever.
+	"""
+	path = lock_file(data_file).resolve()
+	_held = _local.__dict__.setdefault("held", {})
+	if path in _held:
+		if _held[path][1] and not shared:
+			raise RuntimeError(f"Cannot lock {data_file} for writing while it is locked for reading")
+		_held[path][2] += 1
+		try:
+			yield
+		finally:
+			_held[path][2] -= 1
+		return
+
+	fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o644)
+	try:
+		if fcntl is not None:
+			fcntl.flock(fd, fcntl.LOCK_SH if shared else fcntl.LOCK_EX)
+		_held[path] = [fd, shared, 1]
+		try:
+			yield
+		finally:
+			del _held[path]
+	finally:
+		os.close(fd)  # also releases the lock
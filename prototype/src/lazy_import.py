@@ -0,0 +1,47 @@
+"""
+File name: lazy_import.py
+Description: Defers importing heavy modules until they are first used.
+
+Author: Lacie Turner
+Date created: 2026-10-18
+Date last modified: 2026-10-18
+Python Version: 3.12
+"""
+
+__author__ = "Lacie Turner"
+__maintainer__ = "Lacie Turner"
+__email__ = "tasketai@lacie.dev"
+__credits__ = ["Lacie Turner"]
+__status__ = "Development"
+__version__ = "0.0.1"
+
+import sys
+import importlib.util
+
+
+def lazy_import(name: str):
+	"""
+	Imports a top-level module lazily: the module object is returned right away, but its code only runs the first time
+	one of its attributes is accessed. Importing pandas alone takes most of a second, which short operations like adding
+	a task should not have to pay for.
+
+	Modules that use this should also use `from __future__ import annotations`, so their type hints, e.g. pd.DataFrame,
+	do not load the module when the functions are defined.
+
+	:param name: The name of the module, e.g. "pandas".
+	:return: The module, loaded on first use.
+	:raises: ModuleNotFoundError if the module is not installed.
+	"""
+	if name in sys.modules:
+		return sys.modules[name]
+
+	spec = importlib.util.find_spec(name)
+	if spec is None:
+		raise ModuleNotFoundError(f"No module named '{name}'", name=name)
+	loader = importlib.util.LazyLoader(spec.loader)
+	spec.loader = loader
+	module = importlib.util.module_from_spec(spec)
+	sys.modules[name] = module
+	loader.exec_module(module)
+
+	return module
@@ -0,0 +1,69 @@
+"""
+File name: planner.py
+Description: Plans the user's day by picking the most relevant set of tasks that fits their velocity.
+
+Author: Lacie Turner
+Date created: 2026-10-18
+Date last modified: 2026-10-18
+Python Version: 3.12
+"""
+
+from __future__ import annotations
+
+__author__ = "Lacie Turner"
+__maintainer__ = "Lacie Turner"
+__email__ = "tasketai@lacie.dev"
+__credits__ = ["Lacie Turner"]
+__status__ = "Development"
+__version__ = "0.0.1"
+
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+	from prototype.src.ranked_index import RankedIndex
+
+EFFORTS = (1, 2, 3)
+
+
+def plan(candidates, velocity: int) -> list:
+	"""
+	Picks the set of candidates with the highest total relevance score whose combined effort fits the velocity.
+
+	This is a 0/1 knapsack over the candidates, solved with a table of the best plan for every budget from 0 to the
+	velocity, so it takes O(candidates * velocity) time.
+
+	:param candidates: (task_id, effort, relevance_score) tuples, best first within each effort tier.
+	:param velocity: The effort budget.
+	:return: The IDs of the planned tasks, in the order they were given.
+	"""
+	candidates = list(candidates)  # read again by position once the plan is known
+	# best[budget] = (total relevance score, candidate positions) of the best plan using at most budget effort
+	best = [(0.0, ())] * (max(velocity, 0) + 1)
+	for position, (task_id, effort, score) in enumerate(candidates):
+		for budget in range(velocity, effort - 1, -1):
+			total_score, positions = best[budget - effort]
+			if total_score + score > best[budget][0]:
+				best[budget] = (total_score + score, positions + (position,))
+
+	return [candidates[position][0] for position in best[-1][1]]
+
+
+def plan_day(ranked_index: RankedIndex, velocity: int, exclude=()) -> list:
+	"""
+	Plans the user's day from the ranked backlog.
+
+	At most velocity // effort tasks of a tier can fit in a plan, and swapping a task for a better ranked one of the
+	same effort never makes a plan worse, so only the top velocity // effort tasks of each tier are considered. This
+	keeps planning independent of the size of the backlog.
+
+	:param ranked_index: The ranked backlog.
+	:param velocity: The velocity left for the day.
+	:param exclude: Task IDs to leave out, e.g. tasks that have already been selected or rejected.
+	:return: The IDs of the planned tasks.
+	"""
+	candidates = []
+	for effort in EFFORTS:
+		for task_id in ranked_index.top(effort, velocity // effort, exclude=exclude):
+			candidates.append((task_id, effort, ranked_index.score(task_id)))
+
+	return plan(candidates, velocity)
@@ -0,0 +1,171 @@
+"""
+File name: rank_cache.py
+Description: Caches ranking results per task file and day, in memory and optionally on disk.
+
+Author: Lacie Turner
+Date created: 2026-10-18
+Date last modified: 2026-10-18
+Python Version: 3.12
+"""
+
+__author__ = "Lacie Turner"
+__maintainer__ = "Lacie Turner"
+__email__ = "tasketai@lacie.dev"
+__credits__ = ["Lacie Turner"]
+__status__ = "Development"
+__version__ = "0.0.1"
+
+import pickle
+import hashlib
+import threading
+import datetime as dt
+from pathlib import Path
+from collections import OrderedDict
+from prototype.src.storage import replace_file
+
+MAX_ENTRIES = 8
+
+
+def file_stat(task_file: Path) -> tuple:
+	"""Gets the size and modification time of a file, which change whenever it is written."""
+	stat = Path(task_file).stat()
+	return stat.st_size, stat.st_mtime_ns
+
+
+def content_hash(task_file: Path) -> str:
+	"""Hashes the content of a file, to recognise an unchanged file whose modification time has changed."""
+	with open(task_file, "rb") as f:
+		return hashlib.file_digest(f, "blake2b").hexdigest()
+
+
+class RankCache:
+	"""
+	Keeps ranking results, e.g. a RankedIndex, per task file.
+
+	A result is valid for as long as its task file is unchanged and it is still the day it was ranked on, since the only
+	time-dependent input of a ranking is the due date multiplier. Results that keep their own scores current, i.e. a
+	RankedIndex, which is refreshed before use, are cached with expires_daily=False and stay valid across days. The
+	file counts as unchanged if its size and modification time match, or failing that, if its content hash does.
+
+	The most recently used max_entries results are kept in memory. If a cache_dir is given, every ranked result is also
+	written there as a pickle snapshot, so a fresh process can skip loading and ranking an unchanged backlog. The
+	snapshots are only meant to be read back by the user who wrote them.
+	"""
+
+	def __init__(self, cache_dir: Path = None, max_entries: int = MAX_ENTRIES):
+		self.cache_dir = None if cache_dir is None else Path(cache_dir)
+		self.max_entries = max_entries
+		self._entries = OrderedDict()
+		self._lock = threading.Lock()  # the entries are shared by every thread, e.g. of the service
+
+	def _snapshot_file(self, key: tuple) -> Path:
+		task_file, name = key
+		return self.cache_dir / f"{hashlib.sha1(str(task_file).encode()).hexdigest()[:16]}.{name}.pickle"
+
+	def _read_snapshot(self, key: tuple) -> dict:
+		if self.cache_dir is None or not self._snapshot_file(key).exists():
+			return None
+		from prototype.src.ranked_index import paused_gc
+		try:
+			with open(self._snapshot_file(key), "rb") as f, paused_gc():
+				entry = pickle.load(f)
+		except Exception:
+			return None  # unreadable, e.g. written by an older version, so it is simply re-built
+		return entry if entry.get("key") == key else None
+
+	def _write_snapshot(self, key: tuple, entry: dict) -> None:
+		if self.cache_dir is None:
+			return
+		self.cache_dir.mkdir(parents=True, exist_ok=True)
+
+		def write(temp_file):
+			with open(temp_file, "wb") as f:
+				pickle.dump(entry, f, protocol=pickle.HIGHEST_PROTOCOL)
+
+		replace_file(self._snapshot_file(key), write)
+
+	def _keep(self, key: tuple, entry: dict) -> None:
+		with self._lock:
+			self._entries[key] = entry
+			self._entries.move_to_end(key)
+			while len(self._entries) > self.max_entries:
+				self._entries.popitem(last=False)
+
+	def get(self, task_file: Path, name: str, build, expires_daily: bool = True):
+		"""
+		Gets a ranking result, building it only if there is no valid result cached for the task file.
+
+		:param task_file: The task file the result is ranked from.
+		:param name: The name of the result, e.g. "ranked_index".
+		:param build: A function that builds the result. Called without arguments.
+		:param expires_daily: Whether the result is only valid on the day it was ranked on.
+		:return: The result.
+		"""
+		key = (Path(task_file).resolve(), name)
+		stat = file_stat(task_file)
+		today = str(dt.date.today()) if expires_daily else None
+
+		file_hash = None
+		entry = self._entries.get(key) or self._read_snapshot(key)
+		if entry is not None and entry["date"] == today:
+			if entry["stat"] != stat and entry["hash"] is not None:
+				file_hash = content_hash(task_file)
+				if entry["hash"] == file_hash:
+					entry["stat"] = stat  # touched, but not changed
+			if entry["stat"] == stat:
+				self._keep(key, entry)
+				return entry["value"]
+
+		file_hash = file_hash or content_hash(task_file)  # the file is only read once, even on a miss
+		entry = {"key": key, "stat": stat, "hash": file_hash, "date": today, "value": build()}
+		self._keep(key, entry)
+		self._write_snapshot(key, entry)
+
+		return entry["value"]
+
+	def peek(self, task_file: Path, name: str, expires_daily: bool = True):
+		"""
+		Gets a ranking result from memory without building, hashing or reading a snapshot.
+
+		:param task_file: The task file the result is ranked from.
+		:param name: The name of the result.
+		:param expires_daily: Whether the result is only valid on the day it was ranked on.
+		:return: The result, if a valid one is in memory, otherwise None.
+		"""
+		entry = self._entries.get((Path(task_file).resolve(), name))
+		today = str(dt.date.today()) if expires_daily else None
+		if entry is None or entry["date"] != today or entry["stat"] != file_stat(task_file):
+			return None
+		return entry["value"]
+
+	def update(self, task_file: Path, name: str, value, expires_daily: bool = True) -> None:
+		"""
+		Replaces a result in memory after the task file was changed along with it, e.g. a task added to both.
+
+		The content hash is not re-computed, so a snapshot on disk is left to go stale and is re-built by the next
+		process that needs it.
+
+		:param task_file: The task file that was changed.
+		:param name: The name of the result.
+		:param value: The up-to-date result.
+		:param expires_daily: Whether the result is only valid on the day it was ranked on.
+		"""
+		key = (Path(task_file).resolve(), name)
+		self._keep(key, {"key": key, "stat": file_stat(task_file), "hash": None,
+		                 "date": str(dt.date.today()) if expires_daily else None, "value": value})
+
+	def discard(self, task_file: Path) -> None:
+		"""
+		Drops every result of a task file kept in memory, e.g. once its user has gone idle. Snapshots on disk are kept.
+
+		:param task_file: The task file.
+		"""
+		task_file = Path(task_file).resolve()
+		with self._lock:
+			for key in [key for key in self._entries if key[0] == task_file]:
+				del self._entries[key]
+
+	def clear(self) -> None:
+		"""Drops every result kept in memory. Snapshots on disk are kept."""
+		with self._lock:
+			self._entries.clear()
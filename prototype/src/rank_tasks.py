@@ -4,10 +4,12 @@ Description:
 
 Author: Lacie Turner
 Date created: 2025-02-10
-Date last modified: 2025-02-12
+Date last modified: 2026-10-18
 Python Version: 3.12
 """
 
+from __future__ import annotations
+
 __author__ = "Lacie Turner"
 __maintainer__ = "Lacie Turner"
 __email__ = "tasketai@lacie.dev"
@@ -15,9 +17,17 @@ __credits__ = ["Lacie Turner"]
 __status__ = "Development"
 __version__ = "0.0.1"
 
-import pandas as pd
-import datetime as dt
+import heapq
 from datetime import datetime
+from typing import TYPE_CHECKING
+from prototype.src.lazy_import import lazy_import
+
+if TYPE_CHECKING:
+    from prototype.src.storage import Task
+
+# only the DataFrame functions need numpy and pandas, so ranking Task records does not load them
+np = lazy_import("numpy")
+pd = lazy_import("pandas")
 
 
 def combine_relevance(urgency: int, importance: int) -> float:
@@ -52,28 +62,74 @@ def combine_relevance(urgency: int, importance: int) -> float:
         return 2 + ((urgency + importance) / 10)
 
 
-def preprocess_tasks(task_dataframe: pd.DataFrame) -> pd.DataFrame:
+def combine_relevance_vectorized(urgency, importance) -> np.ndarray:
+    """
+    Returns the combined relevance scores for the given arrays of urgency and importance.
+
+    Vectorized counterpart of combine_relevance, using one mask per Eisenhower quadrant instead of a call per task.
+    The arithmetic is kept in the same order as combine_relevance so both produce identical floats.
+
+    :param urgency: The urgency levels.
+    :param importance: The importance levels.
+    :return: The combined relevance scores as an array of floats.
+    """
+    urgency = np.asarray(urgency, dtype=float)
+    importance = np.asarray(importance, dtype=float)
+    is_urgent = urgency >= 4
+    is_important = importance >= 4
+
+    return np.select(
+        [
+            is_urgent & is_important,  # Urgent and Important
+            ~is_urgent & is_important,  # Not Urgent but Important
+            is_urgent & ~is_important,  # Urgent but Not Important
+        ],
+        [
+            5 + (urgency / 5) + (importance / 5),
+            4 + (importance / 5),
+            3 + (urgency / 5),
+        ],
+        default=2 + ((urgency + importance) / 10),  # Not Urgent and Not Important
+    )
+
+
+def due_date_multiplier(days_until_due) -> np.ndarray:
+    """
+    Returns the due date multipliers for the given days until due.
+
+    Overdue tasks get a large boost that is weighed heavier the longer they are overdue, tasks due today get a medium
+    boost and tasks due within a week get a smaller boost. Tasks without a due date (NaN) are left at 1.0.
+
+    :param days_until_due: The number of days until each task is due.
+    :return: The due date multipliers as an array of floats.
+    """
+    days_until_due = np.asarray(days_until_due, dtype=float)
+
+    return np.select(
+        [
+            days_until_due < 0,
+            days_until_due == 0,
+            (days_until_due > 0) & (days_until_due < 7),
+        ],
+        [
+            1.5 + (np.abs(days_until_due) * 0.05),
+            1.5,
+            1.25,
+        ],
+        default=1.0,
+    )
+
+
+def preprocess_tasks(task_dataframe: pd.DataFrame, now: datetime = None) -> pd.DataFrame:
     # Create features
-    task_dataframe['combined_relevance'] = task_dataframe.apply(lambda r: combine_relevance(r['urgency'], r['importance']), axis=1)
+    task_dataframe['combined_relevance'] = combine_relevance_vectorized(task_dataframe['urgency'], task_dataframe['importance'])
     task_dataframe['has_due_date'] = task_dataframe['due_date'].notna().astype(int)
     task_dataframe['due_date'] = pd.to_datetime(task_dataframe['due_date'], errors='coerce')
-    task_dataframe['days_until_due'] = (task_dataframe['due_date'] - dt.datetime.now()).dt.days
-    task_dataframe['days_until_due'] = task_dataframe['days_until_due'].fillna(9999)  # df['days_until_due'].max()
+    days_until_due = (task_dataframe['due_date'] - (now or datetime.now())).dt.days
 
     # Handle due date with multiplier
-    task_dataframe['due_date_multiplier'] = 1.0
-    if 'due_date' in task_dataframe.columns:
-      task_dataframe['due_date'] = pd.to_datetime(task_dataframe['due_date'], errors='coerce')
-      task_dataframe['days_until_due'] = (task_dataframe['due_date'] - datetime.now()).dt.days
-      # Overdue tasks get a large boost that is weighed heavier the longer it's overdue
-      task_dataframe.loc[task_dataframe['days_until_due'] < 0, 'due_date_multiplier'] = 1.5 + (abs(task_dataframe['days_until_due']) * 0.05)
-      # Tasks due today get a medium boost
-      task_dataframe.loc[task_dataframe['days_until_due'] == 0, 'due_date_multiplier'] = 1.5
-      # Tasks due within a week get a smaller boost
-      task_dataframe.loc[(task_dataframe['days_until_due'] > 0) & (task_dataframe['days_until_due'] < 7), 'due_date_multiplier'] = 1.25
-
-      # Handle NAs, if any
-      task_dataframe['days_until_due'] = task_dataframe['days_until_due'].fillna(9999)  # Fill with large number
+    task_dataframe['due_date_multiplier'] = due_date_multiplier(days_until_due)
+    task_dataframe['days_until_due'] = days_until_due.fillna(9999)  # Fill with large number
 
     # Calculate the relevance score
     task_dataframe['relevance_score'] = task_dataframe['combined_relevance'] * task_dataframe['due_date_multiplier']
@@ -90,12 +146,153 @@ def rank_tasks(task_dataframe: pd.DataFrame) -> pd.DataFrame:
     """
     incomplete_tasks = task_dataframe.loc[task_dataframe['complete'] == False]
     incomplete_tasks = preprocess_tasks(incomplete_tasks)
-    ranked_tasks = incomplete_tasks.sort_values('relevance_score', ascending=False)
+    ranked_tasks = incomplete_tasks.sort_values('relevance_score', ascending=False, kind='stable')
     ranked_tasks['rank'] = range(1, len(incomplete_tasks) + 1)
 
     return ranked_tasks
 
 
+def top_k_positions(scores, k: int) -> np.ndarray:
+    """
+    Returns the positions of the k highest scores, without sorting the remaining scores.
+
+    Ties are broken by position, so the result always matches the first k rows of a stable descending sort.
+
+    :param scores: The scores to select from.
+    :param k: The number of positions to return.
+    :return: The positions of the k highest scores, highest score first.
+    """
+    scores = np.asarray(scores, dtype=float)
+    k = max(0, min(k, len(scores)))
+    if k == 0:
+        return np.empty(0, dtype=np.intp)
+
+    if k < len(scores):
+        # Everything scoring at least as high as the kth best score is a candidate, including all of its ties
+        kth_score = -np.partition(-scores, k - 1)[k - 1]
+        candidates = np.flatnonzero(scores >= kth_score)
+    else:
+        candidates = np.arange(len(scores))
+
+    return candidates[np.argsort(-scores[candidates], kind='stable')][:k]
+
+
+def rank_top_k_by_effort(task_dataframe: pd.DataFrame, k: int) -> dict:
+    """
+    Returns the k best tasks of each effort tier in the given dataframe.
+
+    :param task_dataframe: The dataframe to rank.
+    :param k: The number of tasks to return per effort tier.
+    :return: A dictionary of effort to a copy of that tier's k best tasks ranked in descending order.
+    """
+    incomplete_tasks = preprocess_tasks(task_dataframe.loc[task_dataframe['complete'] == False].copy())
+    scores = incomplete_tasks['relevance_score'].to_numpy()
+    efforts = incomplete_tasks['effort'].to_numpy()
+
+    ranked_tiers = {}
+    for effort in np.unique(efforts):
+        tier_positions = np.flatnonzero(efforts == effort)
+        positions = tier_positions[top_k_positions(scores[tier_positions], k)]
+        ranked_tier = incomplete_tasks.iloc[positions].copy()
+        ranked_tier['rank'] = range(1, len(ranked_tier) + 1)
+        ranked_tiers[effort.item()] = ranked_tier
+
+    return ranked_tiers
+
+
+def rank_top_k_by_effort_chunked(task_chunks, k: int) -> dict:
+    """
+    Returns the k best tasks of each effort tier from dataframes read one chunk at a time.
+
+    Only the best k tasks of each tier seen so far are kept between chunks, so the whole backlog never has to fit in
+    memory. All chunks are scored against the same point in time, and ties keep the order the tasks were read in, so
+    the result matches rank_top_k_by_effort on the concatenated chunks.
+
+    :param task_chunks: An iterable of task dataframes, e.g. from task.load_chunks.
+    :param k: The number of tasks to return per effort tier.
+    :return: A dictionary of effort to a copy of that tier's k best tasks ranked in descending order.
+    """
+    now = datetime.now()
+    best_tasks = {}
+    for task_chunk in task_chunks:
+        task_chunk = preprocess_tasks(task_chunk.loc[task_chunk['complete'] == False].copy(), now)
+        for effort, tier_chunk in task_chunk.groupby('effort', sort=False):
+            effort = effort.item() if hasattr(effort, 'item') else effort
+            tier = pd.concat([best_tasks[effort], tier_chunk]) if effort in best_tasks else tier_chunk
+            best_tasks[effort] = tier.iloc[top_k_positions(tier['relevance_score'].to_numpy(), k)]
+
+    ranked_tiers = {}
+    for effort in sorted(best_tasks):
+        ranked_tier = best_tasks[effort].copy()
+        ranked_tier['rank'] = range(1, len(ranked_tier) + 1)
+        ranked_tiers[effort] = ranked_tier
+
+    return ranked_tiers
+
+
+def relevance_score(task: Task, now: datetime) -> float:
+    """
+    Returns the relevance score of a single Task record.
+
+    Scalar counterpart of preprocess_tasks, with the arithmetic of due_date_multiplier kept in the same order, so both
+    produce identical floats.
+
+    :param task: The task to score.
+    :param now: The time to score the task at.
+    :return: The relevance score as a float.
+    """
+    combined_relevance = combine_relevance(task.urgency, task.importance)
+    if task.due_date is None:
+        return combined_relevance * 1.0
+
+    days_until_due = (task.due_date - now).days
+    if days_until_due < 0:
+        multiplier = 1.5 + (abs(days_until_due) * 0.05)
+    elif days_until_due == 0:
+        multiplier = 1.5
+    elif days_until_due < 7:
+        multiplier = 1.25
+    else:
+        multiplier = 1.0
+
+    return combined_relevance * multiplier
+
+
+def rank_task_records(tasks, k: int = None, now: datetime = None) -> list:
+    """
+    Returns the given Task records ranked the same way as rank_tasks, without pandas.
+
+    :param tasks: The tasks to rank, e.g. from storage read_tasks.
+    :param k: Only return the k best tasks, if given, without sorting the rest.
+    :param now: The time to score the tasks at. Defaults to the current time.
+    :return: (task, relevance score) pairs of the incomplete tasks, best first.
+    """
+    now = now or datetime.now()
+    scored_tasks = [(task, relevance_score(task, now)) for task in tasks if not task.complete]
+    if k is None:
+        return sorted(scored_tasks, key=lambda scored_task: -scored_task[1])  # sorted is stable, like rank_tasks
+
+    return heapq.nsmallest(k, scored_tasks, key=lambda scored_task: -scored_task[1])  # also keeps ties in order
+
+
+def rank_top_k_records_by_effort(tasks, k: int, now: datetime = None) -> dict:
+    """
+    Returns the k best Task records of each effort tier, ranked the same way as rank_top_k_by_effort, without pandas.
+
+    :param tasks: The tasks to rank.
+    :param k: The number of tasks to return per effort tier.
+    :param now: The time to score the tasks at. Defaults to the current time.
+    :return: A dictionary of effort to that tier's k best (task, relevance score) pairs, best first.
+    """
+    now = now or datetime.now()
+    tiers = {}
+    for task in tasks:
+        if not task.complete:
+            tiers.setdefault(task.effort, []).append(task)
+
+    return {effort: rank_task_records(tiers[effort], k, now) for effort in sorted(tiers)}
+
+
 def print_dataframe(task_dataframe: pd.DataFrame, num_rows: int = None) -> None:
     # headers
     print(f"{'Rank'.ljust(4)}\t"
@@ -113,14 +310,18 @@ def print_dataframe(task_dataframe: pd.DataFrame, num_rows: int = None) -> None:
     if num_rows:
         task_dataframe = task_dataframe[:num_rows]
 
-    for index, row in task_dataframe.iterrows():
-        print(f"#{str(row['rank']).zfill(3) if row['rank'] else '---'.ljust(4)}\t"
-              f"{row['title'].rjust(32)}\t"
-              f"{str(row['urgency']).ljust(8)}\t"
-              f"{str(row['importance']).ljust(10)}\t"
-              f"{str(row['effort']).ljust(10)}\t"
-              f"{str(row['due_date']).ljust(18)}\t"
-              f"{str(row['days_until_due']).ljust(14)}\t"
-              f"{str(row['due_date_multiplier']).ljust(20)}\t"
-              f"{str(row['combined_relevance']).ljust(18)}\t"
-              f"{str(row['relevance_score']).ljust(16) if row['relevance_score'] else 'N/A'.ljust(16)}")
+    # a column at a time, instead of building a Series per row
+    columns = ['rank', 'title', 'urgency', 'importance', 'effort', 'due_date', 'days_until_due', 'due_date_multiplier',
+               'combined_relevance', 'relevance_score']
+    for (rank, title, urgency, importance, effort, due_date, days_until_due, multiplier, combined_relevance,
+         score) in zip(*(task_dataframe[column].tolist() for column in columns)):
+        print(f"#{str(rank).zfill(3) if rank else '---'.ljust(4)}\t"
+              f"{title.rjust(32)}\t"
+              f"{str(urgency).ljust(8)}\t"
+              f"{str(importance).ljust(10)}\t"
+              f"{str(effort).ljust(10)}\t"
+              f"{str(due_date).ljust(18)}\t"
+              f"{str(days_until_due).ljust(14)}\t"
+              f"{str(multiplier).ljust(20)}\t"
+              f"{str(combined_relevance).ljust(18)}\t"
+              f"{str(score).ljust(16) if score else 'N/A'.ljust(16)}")
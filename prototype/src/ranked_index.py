@@ -0,0 +1,347 @@
+"""
+File name: ranked_index.py
+Description: Keeps tasks ranked between changes instead of re-ranking the whole backlog.
+
+Author: Lacie Turner
+Date created: 2026-10-18
+Date last modified: 2026-10-18
+Python Version: 3.12
+"""
+
+__author__ = "Lacie Turner"
+__maintainer__ = "Lacie Turner"
+__email__ = "tasketai@lacie.dev"
+__credits__ = ["Lacie Turner"]
+__status__ = "Development"
+__version__ = "0.0.1"
+
+import gc
+import heapq
+import itertools
+import contextlib
+import numpy as np
+import pandas as pd
+from datetime import datetime
+from prototype.src.rank_tasks import preprocess_tasks, combine_relevance, combine_relevance_vectorized, due_date_multiplier
+from prototype.src.storage import Task, tasks_from_dataframe
+
+REMOVED = "<removed>"  # placeholder for a task whose heap entry is no longer valid
+DAY = 86_400 * 10 ** 9  # in nanoseconds
+
+
+@contextlib.contextmanager
+def paused_gc():
+	"""
+	Pauses the cyclic garbage collector while a large number of objects is created at once, e.g. a heap entry per task.
+	Every allocation would otherwise count towards a collection that walks all of the entries created so far.
+	"""
+	enabled = gc.isenabled()
+	gc.disable()
+	try:
+		yield
+	finally:
+		if enabled:
+			gc.enable()
+
+
+def next_changes(due_dates: pd.Series, now: datetime) -> np.ndarray:
+	"""
+	Returns when the due date multiplier of each task changes next.
+
+	A multiplier changes as soon as the time passes 7 days before the task is due, 1 day before it is due and when it
+	is due, and then again every day the task is overdue, since it is based on the whole days until it is due.
+
+	:param due_dates: The due dates of the tasks.
+	:param now: The time the tasks are scored at.
+	:return: The times, in nanoseconds since the epoch, after which each task's multiplier changes.
+	"""
+	days_until_due = (due_dates - now).dt.days.to_numpy()
+	days_before_due = np.where(days_until_due >= 7, 7, np.where(days_until_due >= 1, 1, np.minimum(days_until_due, 0)))
+
+	return due_dates.to_numpy(dtype='datetime64[ns]').astype(np.int64) - days_before_due * DAY
+
+
+class RankedIndex:
+	"""
+	Keeps the incomplete tasks of a backlog ranked in one priority queue per effort tier.
+
+	Adding a task or changing its score pushes a new heap entry in O(log n); removing a task marks its entry as removed,
+	and removed entries are dropped the next time they reach the top of the heap. Ties keep the order the tasks were
+	added in, which matches rank_tasks.
+
+	Only tasks with a due date can change score from one call to the next, and only at a few points in time, e.g. the
+	day they become due. Those points are kept in a timer heap, so refresh() only re-scores the tasks whose time has
+	come, i.e. the ones that moved to another due date tier plus the overdue ones, whose multiplier grows daily.
+	"""
+
+	def __init__(self, task_dataframe: pd.DataFrame, now: datetime = None):
+		incomplete_tasks = task_dataframe.loc[task_dataframe['complete'] == False].copy()
+		self._scored_at = now or datetime.now()
+		self.tasks = preprocess_tasks(incomplete_tasks, now=self._scored_at).set_index('id', drop=False)
+		self._added = {}
+		self._due_dates = self.tasks.loc[self.tasks['due_date'].notna(), 'due_date'].to_dict()
+		self._build_heaps(self.tasks['id'], self.tasks['effort'], -self.tasks['relevance_score'], np.arange(len(self.tasks)))
+		self._counter = itertools.count(len(self.tasks))
+		self._timers = []
+		self._next_changes = {}
+		self._set_timers(list(self._due_dates), pd.Series(list(self._due_dates.values()), dtype='datetime64[ns]'))
+
+	def _build_heaps(self, task_ids, efforts, negative_scores, orders) -> None:
+		task_ids = np.asarray(task_ids, dtype=object)
+		efforts = np.asarray(efforts)
+		negative_scores = np.asarray(negative_scores, dtype=float)
+		orders = np.asarray(orders)
+
+		self._heaps = {}
+		self._entries = {}
+		with paused_gc():
+			for effort in np.unique(efforts).tolist():
+				in_tier = efforts == effort
+				tier_ids = task_ids[in_tier].tolist()
+				heap = [[negative_score, order, task_id] for negative_score, order, task_id
+				        in zip(negative_scores[in_tier].tolist(), orders[in_tier].tolist(), tier_ids)]
+				self._entries.update(zip(tier_ids, zip(itertools.repeat(effort), heap)))
+				heapq.heapify(heap)
+				self._heaps[effort] = heap
+
+	def __getstate__(self) -> dict:
+		"""
+		Pickles the live heap entries as plain columns, leaving removed entries behind, which is much smaller and faster
+		to load than a list per task. The heaps are re-built when the index is unpickled.
+		"""
+		state = self.__dict__.copy()
+		entries = self._entries.values()
+		state['_entries'] = (list(self._entries), [effort for effort, _ in entries],
+		                     [entry[0] for _, entry in entries], [entry[1] for _, entry in entries])
+		state['_counter'] = next(self._counter)
+		del state['_heaps'], state['_timers'], state['_next_changes']
+
+		return state
+
+	def __setstate__(self, state: dict) -> None:
+		task_ids, efforts, negative_scores, orders = state.pop('_entries')
+		self._counter = itertools.count(state.pop('_counter'))
+		self.__dict__.update(state)
+		self._build_heaps(task_ids, efforts, negative_scores, orders)
+		self._timers = []
+		self._next_changes = {}
+		self._set_timers(list(self._due_dates), pd.Series(list(self._due_dates.values()), dtype='datetime64[ns]'))
+
+	def __len__(self) -> int:
+		return len(self._entries)
+
+	def __contains__(self, task_id) -> bool:
+		return task_id in self._entries
+
+	def _set_timers(self, task_ids: list, due_dates: pd.Series) -> None:
+		"""Sets when the given tasks have to be re-scored next. Any earlier timer of the tasks is ignored from now on."""
+		changes = next_changes(due_dates, self._scored_at).tolist()
+		self._next_changes.update(zip(task_ids, changes))
+		if len(self._timers) > 2 * len(self._next_changes):
+			self._timers = [(change, task_id) for task_id, change in self._next_changes.items()]  # drop stale timers
+			heapq.heapify(self._timers)
+		elif len(changes) > len(self._timers):
+			self._timers.extend(zip(changes, task_ids))
+			heapq.heapify(self._timers)
+		else:
+			for timer in zip(changes, task_ids):
+				heapq.heappush(self._timers, timer)
+
+	def _push(self, task_id, effort: int, score: float, order: int = None) -> None:
+		entry = [-score, next(self._counter) if order is None else order, task_id]
+		self._entries[task_id] = (effort, entry)
+		heapq.heappush(self._heaps.setdefault(effort, []), entry)
+
+	def score(self, task_id) -> float:
+		"""
+		Gets the current relevance score of a task.
+
+		:param task_id: The ID of the task.
+		:return: The task's relevance score.
+		"""
+		return -self._entries[task_id][1][0]
+
+	def add(self, task_id, title: str, urgency: int, importance: int, effort: int, due_date=None,
+	        keep_order: bool = False) -> None:
+		"""
+		Adds a new task to the index, or replaces a task that is already in it.
+
+		:param task_id: The ID of the task.
+		:param title: The title of the task.
+		:param urgency: The urgency of the task.
+		:param importance: The importance of the task.
+		:param effort: The effort of the task.
+		:param due_date: The due date of the task, if any.
+		:param keep_order: Whether a task already in the index keeps its place among equally scored tasks, not the last.
+		"""
+		urgency, importance, effort = int(urgency), int(importance), int(effort)
+		due_date = pd.to_datetime(due_date, errors='coerce') if due_date else pd.NaT
+		days_until_due = (due_date - self._scored_at).days if due_date is not pd.NaT else float('nan')
+		combined_relevance = combine_relevance(urgency, importance)
+		multiplier = due_date_multiplier([days_until_due])[0].item()
+		order = self._entries[task_id][1][1] if keep_order and task_id in self._entries else None
+
+		self.remove(task_id)
+		if due_date is not pd.NaT:
+			self._due_dates[task_id] = due_date
+			self._set_timers([task_id], pd.Series([due_date], dtype='datetime64[ns]'))
+		self._added[task_id] = {'id': task_id, 'complete': False, 'title': title, 'urgency': urgency,
+		                        'importance': importance, 'effort': effort, 'due_date': due_date,
+		                        'combined_relevance': combined_relevance, 'due_date_multiplier': multiplier,
+		                        'relevance_score': combined_relevance * multiplier}
+		self._push(task_id, effort, combined_relevance * multiplier, order=order)
+
+	def add_many(self, new_tasks: pd.DataFrame) -> None:
+		"""
+		Adds a batch of new tasks to the index, scoring them all at once instead of one call per task.
+
+		:param new_tasks: The tasks, with id, title, urgency, importance, effort and due_date columns.
+		"""
+		due_dates = pd.to_datetime(new_tasks['due_date'].replace("", None), errors='coerce')
+		combined_relevance = combine_relevance_vectorized(new_tasks['urgency'], new_tasks['importance'])
+		multipliers = due_date_multiplier((due_dates - self._scored_at).dt.days)
+
+		for task_id, title, urgency, importance, effort, due_date, relevance, multiplier in zip(
+				new_tasks['id'].tolist(), new_tasks['title'].tolist(), new_tasks['urgency'].astype(int).tolist(),
+				new_tasks['importance'].astype(int).tolist(), new_tasks['effort'].astype(int).tolist(),
+				due_dates.tolist(), combined_relevance.tolist(), multipliers.tolist()):
+			self.remove(task_id)
+			if due_date is not pd.NaT:
+				self._due_dates[task_id] = due_date
+			self._added[task_id] = {'id': task_id, 'complete': False, 'title': title, 'urgency': urgency,
+			                        'importance': importance, 'effort': effort, 'due_date': due_date,
+			                        'combined_relevance': relevance, 'due_date_multiplier': multiplier,
+			                        'relevance_score': relevance * multiplier}
+			self._push(task_id, effort, relevance * multiplier)
+
+		has_due_date = due_dates.notna().to_numpy()
+		self._set_timers(new_tasks['id'][has_due_date].tolist(), due_dates[has_due_date])
+
+	def remove(self, task_id) -> None:
+		"""
+		Removes a task from the index, e.g. once it has been completed.
+
+		:param task_id: The ID of the task. Unknown IDs are ignored.
+		"""
+		effort, entry = self._entries.pop(task_id, (None, None))
+		if entry is not None:
+			entry[-1] = REMOVED
+		self._due_dates.pop(task_id, None)
+		self._next_changes.pop(task_id, None)
+
+	def refresh(self, now: datetime = None) -> int:
+		"""
+		Re-scores the tasks whose due date multiplier has changed since they were last scored, as it depends on the
+		current time. Going back in time re-scores every task with a due date.
+
+		:param now: The time to score the tasks at. Defaults to the current time.
+		:return: The number of tasks whose score changed.
+		"""
+		now = now or datetime.now()
+		if now < self._scored_at:
+			task_ids = list(self._due_dates)
+		else:
+			now_ns = pd.Timestamp(now).value
+			task_ids = []
+			while self._timers and self._timers[0][0] < now_ns:
+				change, task_id = heapq.heappop(self._timers)
+				if self._next_changes.get(task_id) == change:  # otherwise the task was removed or re-added since
+					task_ids.append(task_id)
+		self._scored_at = now
+		if not task_ids:
+			return 0
+
+		due_dates = pd.Series([self._due_dates[task_id] for task_id in task_ids], index=task_ids, dtype='datetime64[ns]')
+		multipliers = due_date_multiplier((due_dates - self._scored_at).dt.days)
+		self._set_timers(task_ids, due_dates)
+
+		known_relevance = self.tasks['combined_relevance']
+		if not known_relevance.index.is_unique:
+			known_relevance = known_relevance[~known_relevance.index.duplicated()]
+		known_relevance = known_relevance.reindex(task_ids).tolist()  # NaN for tasks that were added later
+
+		changed = 0
+		for task_id, multiplier, combined_relevance in zip(task_ids, multipliers.tolist(), known_relevance):
+			task = self._added.get(task_id)
+			if task:
+				combined_relevance = task['combined_relevance']
+			score = combined_relevance * multiplier
+			effort, entry = self._entries[task_id]
+			if score != -entry[0]:
+				entry[-1] = REMOVED
+				self._push(task_id, effort, score, order=entry[1])
+				changed += 1
+
+		return changed
+
+	def top(self, effort: int, k: int, exclude=()) -> list:
+		"""
+		Gets the IDs of the k best tasks of an effort tier.
+
+		:param effort: The effort tier.
+		:param k: The number of task IDs to return.
+		:param exclude: Task IDs to skip, e.g. tasks that have already been selected.
+		:return: The task IDs, best first.
+		"""
+		heap = self._heaps.get(effort, [])
+		popped = []
+		task_ids = []
+		while heap and len(task_ids) < k:
+			entry = heapq.heappop(heap)
+			if entry[-1] is REMOVED:
+				continue  # drop it for good
+			popped.append(entry)
+			if entry[-1] not in exclude:
+				task_ids.append(entry[-1])
+
+		for entry in popped:
+			heapq.heappush(heap, entry)
+
+		return task_ids
+
+	def ranked(self, k: int = None) -> list:
+		"""
+		Gets the IDs of the k best tasks across every effort tier, in the same order as rank_tasks.
+
+		:param k: The number of task IDs to return. Defaults to all of them.
+		:return: The task IDs, best first.
+		"""
+		k = len(self) if k is None else k
+		task_ids = itertools.chain.from_iterable(self.top(effort, k) for effort in self._heaps)
+		return heapq.nsmallest(k, task_ids, key=lambda task_id: self._entries[task_id][1][:2])
+
+	def get_tasks(self, task_ids) -> pd.DataFrame:
+		"""
+		Gets the given tasks, with their current relevance scores.
+
+		:param task_ids: The IDs of the tasks.
+		:return: A DataFrame of the tasks, in the given order.
+		"""
+		task_ids = list(task_ids)
+		known_ids = [task_id for task_id in task_ids if task_id not in self._added]
+		tasks = self.tasks.loc[known_ids]
+		added_tasks = [self._added[task_id] for task_id in task_ids if task_id in self._added]
+		if added_tasks:
+			tasks = pd.concat([tasks, pd.DataFrame(added_tasks).set_index('id', drop=False)]).loc[task_ids]
+		tasks = tasks.assign(relevance_score=[self.score(task_id) for task_id in task_ids])
+
+		return tasks.reset_index(drop=True)
+
+	def get_task_records(self, task_ids) -> list:
+		"""
+		Gets the given tasks as Task records, with their current relevance scores, e.g. to display a page of them.
+
+		:param task_ids: The IDs of the tasks.
+		:return: (task, relevance score) pairs, in the given order.
+		"""
+		task_ids = list(task_ids)
+		known_ids = [task_id for task_id in task_ids if task_id not in self._added]
+		# the first task wins if an ID is duplicated
+		tasks = {task.id: task for task in reversed(tasks_from_dataframe(self.tasks.loc[known_ids]))} if known_ids else {}
+		for task_id in task_ids:
+			if task_id in self._added:
+				added = self._added[task_id]
+				tasks[task_id] = Task(task_id, False, added['title'], added['urgency'], added['importance'],
+				                      added['effort'], None if added['due_date'] is pd.NaT else added['due_date'].to_pydatetime())
+
+		return [(tasks[task_id], self.score(task_id)) for task_id in task_ids]
@@ -0,0 +1,348 @@
+"""
+File name: service.py
+Description: Serves ranking and suggestions for many users over HTTP/JSON.
+
+Author: Lacie Turner
+Date created: 2026-10-18
+Date last modified: 2026-10-18
+Python Version: 3.12
+"""
+
+from __future__ import annotations
+
+__author__ = "Lacie Turner"
+__maintainer__ = "Lacie Turner"
+__email__ = "tasketai@lacie.dev"
+__credits__ = ["Lacie Turner"]
+__status__ = "Development"
+__version__ = "0.0.1"
+
+import re
+import json
+import time
+import asyncio
+import argparse
+import multiprocessing
+from pathlib import Path
+from http import HTTPStatus
+from collections import OrderedDict
+from urllib.parse import urlsplit, parse_qs
+from concurrent.futures import ProcessPoolExecutor
+import prototype.src.task as task
+import prototype.src.user_data as user_data
+from prototype.src.rank_cache import file_stat
+from prototype.src.storage import get_storage
+from prototype.src.suggestions import SUGGESTION_LIMIT, suggest_from_index, to_records
+
+USER_NAME = re.compile(r"[A-Za-z0-9_-]{1,64}")
+IDLE_TIMEOUT = 15 * 60  # seconds a user's data is kept in memory after their last request
+MAX_USERS = 256
+MAX_BODY_SIZE = 16 * 1024 * 1024
+
+
+class HttpError(Exception):
+	"""An error that is answered with the given HTTP status."""
+
+	def __init__(self, status: int, message: str):
+		super().__init__(message)
+		self.status = status
+
+
+def build_ranked_index(task_file: Path):
+	"""Ranks a task file. Runs in a worker process, and the index is pickled back to the service."""
+	from prototype.src.ranked_index import RankedIndex
+	return RankedIndex(task.load(task_file))
+
+
+class UserState:
+	"""The data of a user that is kept in memory between their requests."""
+
+	def __init__(self, name: str, data_file: Path, task_file: Path, schema_file: Path):
+		self.name = name
+		self.task_file = task_file
+		self.session = user_data.new_session(data_file, task_file, schema_file)
+		self.lock = asyncio.Lock()  # orders the user's requests, e.g. so their backlog is only ranked once
+		self.last_used = time.monotonic()
+
+
+class RankingService:
+	"""
+	Answers the rank, suggest, add and select commands of many users from one process.
+
+	Each user is named by the URL, and has a data file <name>.json and a task file <name>-tasks.csv in data_dir. Their
+	session and ranked index stay in memory until they have been idle for idle_timeout seconds, or until more than
+	max_users users are in memory, least recently used first.
+
+	Ranking a backlog from scratch runs in a pool of worker processes, so a large backlog does not hold up the requests
+	of other users. The rest of the work, e.g. adding tasks or reading the ranked index, runs in a thread while the
+	event loop answers other users. A user's requests hold their lock for as long as their files or their ranked index
+	are in use, so they never see each other's changes halfway through, and are never evicted halfway through.
+	"""
+
+	def __init__(self, data_dir: Path, workers: int = None, idle_timeout: float = IDLE_TIMEOUT,
+	             max_users: int = MAX_USERS, schema_file: Path = user_data.USER_DATA_SCHEMA_FILE,
+	             task_suffix: str = ".csv"):
+		self.data_dir = Path(data_dir)
+		self.idle_timeout = idle_timeout
+		self.max_users = max_users
+		self.schema_file = Path(schema_file)
+		self.task_suffix = task_suffix
+		# forked workers would inherit the open client sockets, and keep them open after the service closed them
+		self.pool = ProcessPoolExecutor(workers, mp_context=multiprocessing.get_context("forkserver"))
+		self._users = OrderedDict()
+		task.use_rank_cache_size(max_users)
+
+	def _task_file(self, name: str) -> Path:
+		return (self.data_dir / f"{name}-tasks{self.task_suffix}").resolve()
+
+	def get_user(self, name: str, create: bool = False) -> UserState:
+		"""
+		Gets a user's state, loading it on their first request.
+
+		:param name: The user's name.
+		:param create: Whether to create the user's task file if it does not exist yet.
+		:return: The user's state.
+		:raises: HttpError if the name is invalid, or the user has no task file and create is False.
+		"""
+		if not USER_NAME.fullmatch(name):
+			raise HttpError(400, "User names may only contain letters, digits, '-' and '_'")
+
+		if name not in self._users:
+			task_file = self._task_file(name)
+			if not task_file.exists():
+				if not create:
+					raise HttpError(404, f"Unknown user: {name}")
+				get_storage(task_file).write([])
+			self._users[name] = UserState(name, self.data_dir / f"{name}.json", task_file, self.schema_file)
+			self.evict_idle()
+
+		user = self._users[name]
+		user.last_used = time.monotonic()
+		self._users.move_to_end(name)
+
+		return user
+
+	def evict(self, name: str) -> None:
+		"""Saves a user's data and drops it from memory."""
+		user = self._users.pop(name)
+		user.session.flush()
+		task.close_repository(user.task_file)
+
+	def evict_idle(self) -> int:
+		"""
+		Drops the users that have been idle for longer than idle_timeout, and the least recently used ones past
+		max_users. Users with a request in progress are kept.
+
+		:return: The number of users dropped.
+		"""
+		idle_since = time.monotonic() - self.idle_timeout
+		idle_users = [name for name, user in self._users.items() if user.last_used < idle_since]
+		excess_users = list(self._users)[:max(0, len(self._users) - self.max_users)]
+		evicted = 0
+		for name in dict.fromkeys(idle_users + excess_users):
+			if not self._users[name].lock.locked():
+				self.evict(name)
+				evicted += 1
+
+		return evicted
+
+	async def ranked_index(self, user: UserState):
+		"""Gets the user's ranked index, ranking their backlog in the worker pool if it is not in memory."""
+		ranked_index = task.peek_ranked_index(user.task_file)
+		if ranked_index is None:
+			stat = file_stat(user.task_file)
+			ranked_index = await asyncio.get_running_loop().run_in_executor(self.pool, build_ranked_index,
+			                                                                 user.task_file)
+			if file_stat(user.task_file) == stat:  # otherwise the file changed while it was ranked
+				task.keep_ranked_index(user.task_file, ranked_index)
+		ranked_index.refresh()
+
+		return ranked_index
+
+	async def rank(self, user: UserState, top: int = None) -> list:
+		async with user.lock:  # the index is read under the lock, as adding or completing tasks changes it
+			ranked_index = await self.ranked_index(user)
+			# a whole backlog takes a while to rank and convert, so it is done off the event loop
+			return await asyncio.to_thread(lambda: to_records(ranked_index.get_tasks(ranked_index.ranked(top))))
+
+	async def suggest(self, user: UserState, velocity: int = None, limit: int = SUGGESTION_LIMIT) -> list:
+		session = user.session
+		async with user.lock:
+			ranked_index = await self.ranked_index(user)
+			if velocity is None:
+				selected_effort = await asyncio.to_thread(task.get_total_effort, session.get_attr('selected_tasks'),
+				                                          user.task_file)
+				velocity = (session.get_attr('velocity') or 0) - selected_effort
+			excluded_tasks = set(session.get_attr('selected_tasks')) | set(session.get_attr('rejected_tasks'))
+
+			def suggest():
+				return to_records(ranked_index.get_tasks(suggest_from_index(ranked_index, velocity,
+				                                                            exclude=excluded_tasks, limit=limit)))
+
+			return await asyncio.to_thread(suggest)
+
+	async def add(self, user: UserState, new_tasks) -> dict:
+		async with user.lock:  # so tasks added while the backlog is being ranked are not left out of the index
+			return await asyncio.to_thread(task.import_tasks, new_tasks, user.task_file)
+
+	async def list_tasks(self, user: UserState, task_list: str, task_ids) -> dict:
+		async with user.lock:
+			return await asyncio.to_thread(self._list_tasks, user, task_list, task_ids)
+
+	def _list_tasks(self, user: UserState, task_list: str, task_ids) -> dict:
+		repository = task.get_repository(user.task_file)
+		added, unknown = [], []
+		for task_id in task_ids:
+			if repository.get_record(task_id) is None:
+				unknown.append(task_id)
+				continue
+			if task_list == "completed":
+				repository.complete(task_id)  # also takes it out of the ranking
+			user.session.add_task(task_list, task_id)
+			added.append(task_id)
+		user.session.flush()
+
+		return {task_list: added, "unknown": unknown}
+
+	async def handle(self, method: str, target: str, body: bytes):
+		"""
+		Answers a single request.
+
+		:param method: The HTTP method, e.g. "GET".
+		:param target: The request target, e.g. "/users/ada/suggest?velocity=2".
+		:param body: The request body, JSON for POST requests.
+		:return: The HTTP status, and the response as JSON-friendly values.
+		"""
+		try:
+			url = urlsplit(target)
+			query = {key: values[-1] for key, values in parse_qs(url.query).items()}
+			parts = url.path.strip("/").split("/")
+			if parts == ["health"]:
+				return 200, {"ok": True, "result": {"users": len(self._users)}}
+			if len(parts) != 3 or parts[0] != "users":
+				raise HttpError(404, f"Not found: {url.path}")
+			_, name, command = parts
+
+			if method == "GET" and command in ("rank", "suggest"):
+				user = self.get_user(name)
+				if command == "rank":
+					result = await self.rank(user, int(query["top"]) if "top" in query else None)
+				else:
+					result = await self.suggest(user, int(query["velocity"]) if "velocity" in query else None,
+					                            int(query.get("limit", SUGGESTION_LIMIT)))
+			elif method == "POST" and command in ("tasks", "select", "complete"):
+				request = json.loads(body or b"{}")
+				if not isinstance(request, dict):
+					raise HttpError(400, "The request body must be a JSON object")
+				if command == "tasks":
+					result = await self.add(self.get_user(name, create=True), request.get("tasks", []))
+				else:
+					task_list = "selected" if command == "select" else "completed"
+					result = await self.list_tasks(self.get_user(name), task_list, request.get("ids", []))
+			elif command in ("rank", "suggest", "tasks", "select", "complete"):
+				raise HttpError(405, f"Method not allowed: {method}")
+			else:
+				raise HttpError(404, f"Not found: {url.path}")
+		except HttpError as err:
+			return err.status, {"ok": False, "error": str(err)}
+		except ValueError as err:  # also bad JSON
+			return 400, {"ok": False, "error": f"{type(err).__name__}: {err}"}
+		except Exception as err:
+			return 500, {"ok": False, "error": f"{type(err).__name__}: {err}"}
+
+		return 200, {"ok": True, "result": result}
+
+	async def handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+		"""Answers the requests of one connection, which is kept open between requests unless the client closes it."""
+		try:
+			while request_line := await reader.readline():
+				headers = {}
+				while (line := await reader.readline()).strip():
+					header, _, value = line.decode("latin-1").partition(":")
+					headers[header.strip().lower()] = value.strip()
+
+				try:
+					method, target, version = request_line.decode("latin-1").split()
+					length = int(headers.get("content-length", 0))
+					if length < 0:
+						raise ValueError(f"Negative Content-Length: {length}")
+				except ValueError:
+					status, response, keep_alive = 400, {"ok": False, "error": "Malformed request"}, False
+				else:
+					if length > MAX_BODY_SIZE:
+						status, response, keep_alive = 413, {"ok": False, "error": "Request body too large"}, False
+					else:
+						status, response = await self.handle(method, target, await reader.readexactly(length))
+						keep_alive = version == "HTTP/1.1" and headers.get("connection", "").lower() != "close"
+
+				payload = json.dumps(response).encode()
+				writer.write(f"HTTP/1.1 {status} {HTTPStatus(status).phrase}\r\n"
+				             f"Content-Type: application/json\r\n"
+				             f"Content-Length: {len(payload)}\r\n"
+				             f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n".encode() + payload)
+				await writer.drain()
+				if not keep_alive:
+					break
+		except (ConnectionError, asyncio.IncompleteReadError):
+			pass  # the client went away
+		finally:
+			writer.close()
+
+	async def evict_idle_users(self) -> None:
+		"""Drops idle users every so often, for as long as the service runs."""
+		while True:
+			await asyncio.sleep(min(self.idle_timeout, 60))
+			self.evict_idle()
+
+	async def start(self, host: str = "127.0.0.1", port: int = 8080) -> asyncio.Server:
+		"""
+		Starts listening, along with the idle user eviction.
+
+		:param host: The address to listen on.
+		:param port: The port to listen on. 0 picks a free port.
+		:return: The server.
+		"""
+		server = await asyncio.start_server(self.handle_connection, host, port)
+		self._evictor = asyncio.create_task(self.evict_idle_users())
+		return server
+
+	def close(self) -> None:
+		"""Saves every user's data and stops the worker pool."""
+		if getattr(self, "_evictor", None) is not None:
+			self._evictor.cancel()
+		for name in list(self._users):
+			self.evict(name)
+		self.pool.shutdown(cancel_futures=True)
+
+
+async def serve(service: RankingService, host: str, port: int) -> None:
+	server = await service.start(host, port)
+	print(f"Serving on {', '.join(str(sock.getsockname()) for sock in server.sockets)}", flush=True)
+	try:
+		async with server:
+			await server.serve_forever()
+	finally:
+		service.close()
+
+
+def main(argv: list = None):
+	parser = argparse.ArgumentParser(description="Serves ranking and suggestions for many users over HTTP/JSON.")
+	parser.add_argument("--data-dir", type=Path, default=Path("./data"), help="directory of the users' data and task files")
+	parser.add_argument("--host", default="127.0.0.1", help="address to listen on")
+	parser.add_argument("--port", type=int, default=8080, help="port to listen on")
+	parser.add_argument("--workers", type=int, help="worker processes that rank backlogs, defaults to the number of cores")
+	parser.add_argument("--idle-timeout", type=float, default=IDLE_TIMEOUT, help="seconds before an idle user is dropped")
+	parser.add_argument("--max-users", type=int, default=MAX_USERS, help="users kept in memory at most")
+	parser.add_argument("--task-suffix", default=".csv", help="format of the task files, e.g. .csv or .sqlite")
+	args = parser.parse_args(argv)
+
+	service = RankingService(args.data_dir, args.workers, args.idle_timeout, args.max_users,
+	                         task_suffix=args.task_suffix)
+	try:
+		asyncio.run(serve(service, args.host, args.port))
+	except KeyboardInterrupt:
+		pass
+
+
+if __name__ == "__main__":
+	main()
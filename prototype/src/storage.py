@@ -0,0 +1,866 @@
+"""
+File name: storage.py
+Description: Reads and writes task files in CSV, in a columnar binary format (Feather/Arrow or Parquet) or in SQLite.
+
+Author: Lacie Turner
+Date created: 2026-10-18
+Date last modified: 2026-10-18
+Python Version: 3.12
+"""
+
+from __future__ import annotations
+
+__author__ = "Lacie Turner"
+__maintainer__ = "Lacie Turner"
+__email__ = "tasketai@lacie.dev"
+__credits__ = ["Lacie Turner"]
+__status__ = "Development"
+__version__ = "0.0.1"
+
+import io
+import os
+import re
+import csv
+import json
+import sqlite3
+import argparse
+import threading
+import dataclasses
+from array import array
+from operator import itemgetter
+from pathlib import Path
+from datetime import datetime
+from prototype.src.file_lock import locked
+from prototype.src.lazy_import import lazy_import
+
+pd = lazy_import("pandas")
+
+TASK_COLUMNS = ["id", "complete", "title", "urgency", "importance", "effort", "due_date", "_created", "_modified"]
+TASK_DTYPES = {'id': 'object', 'complete': 'bool', 'title': 'object', 'urgency': 'int8', 'importance': 'int8', 'effort': 'int8'}
+TASK_DATE_COLUMNS = ['due_date']  # _created and _modified are not needed for ranking and stay as text
+RANK_COLUMNS = ['id', 'complete', 'urgency', 'importance', 'effort', 'due_date']  # everything ranking needs
+CHUNK_SIZE = 100_000
+COMPACT_MIN_BYTES = 64 * 1024  # bytes of blanked out rows before a CSV task file is compacted...
+COMPACT_RATIO = 0.25  # ...and the share of the file they have to make up
+PAGE_INDEX_STRIDE = 256  # tasks between the byte offsets kept for paging through a CSV task file
+SQLITE_SUFFIXES = (".sqlite", ".db")
+SQLITE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS tasks (
+	id TEXT PRIMARY KEY,
+	complete INTEGER NOT NULL DEFAULT 0,
+	title TEXT NOT NULL,
+	urgency INTEGER NOT NULL,
+	importance INTEGER NOT NULL,
+	effort INTEGER NOT NULL,
+	due_date TEXT,
+	_created TEXT,
+	_modified TEXT
+);
+CREATE INDEX IF NOT EXISTS tasks_complete_effort ON tasks (complete, effort);
+CREATE INDEX IF NOT EXISTS tasks_due_date ON tasks (due_date);
+"""
+
+
+@dataclasses.dataclass(slots=True)
+class Task:
+	"""
+	A single task with every column of a task file, for looking up, ranking and displaying tasks without pandas.
+
+	The due date is parsed, so tasks can be scored as they are. Slots keep each task to a fixed set of attributes,
+	without a __dict__, so a backlog of them stays small and quick to iterate.
+	"""
+	id: str
+	complete: bool
+	title: str
+	urgency: int
+	importance: int
+	effort: int
+	due_date: datetime | None = None
+	_created: str = ""
+	_modified: str = ""
+
+	@classmethod
+	def from_row(cls, row: list) -> Task:
+		"""Parses a task from text values in TASK_COLUMNS order, as read from a CSV file."""
+		task_id, complete, title, urgency, importance, effort, due_date, created, modified = row
+		return cls(task_id, complete.upper() == "TRUE", title, int(urgency), int(importance), int(effort),
+		           datetime.fromisoformat(due_date) if due_date else None, created, modified)
+
+	def to_row(self) -> list:
+		"""Formats the task as text values in TASK_COLUMNS order, as written to a CSV file."""
+		return [self.id, "TRUE" if self.complete else "FALSE", self.title, self.urgency, self.importance, self.effort,
+		        self.due_date.isoformat() if self.due_date else "", self._created, self._modified]
+
+	def to_dict(self) -> dict:
+		"""Gets the task as JSON-friendly values, e.g. for a batch command's result."""
+		return {**dataclasses.asdict(self), "due_date": self.due_date.isoformat() if self.due_date else None}
+
+
+def tasks_from_dataframe(task_dataframe: pd.DataFrame) -> list:
+	"""
+	Converts tasks to Tasks, a column at a time rather than a row at a time. Columns that are missing, e.g. when only
+	RANK_COLUMNS were read, are left at their defaults.
+
+	:param task_dataframe: The tasks, with at least the RANK_COLUMNS.
+	:return: The Tasks, in the same order.
+	"""
+	columns = []
+	for field in dataclasses.fields(Task):
+		if field.name not in task_dataframe.columns:
+			default = "" if field.default is dataclasses.MISSING else field.default  # e.g. the title
+			columns.append([default] * len(task_dataframe))
+		elif field.name in ('due_date', '_created', '_modified') and task_dataframe[field.name].dtype.kind == "M":
+			# as microseconds, numpy converts NaT to None and the rest to datetime objects
+			dates = task_dataframe[field.name].to_numpy(dtype='datetime64[us]').astype(object).tolist()
+			columns.append(dates if field.name == 'due_date'
+			               else ["" if date is None else date.isoformat() for date in dates])
+		else:
+			columns.append(task_dataframe[field.name].tolist())
+
+	return [Task(task_id, bool(complete), title, int(urgency), int(importance), int(effort), due_date, created, modified)
+	        for task_id, complete, title, urgency, importance, effort, due_date, created, modified in zip(*columns)]
+
+
+def tasks_to_dataframe(tasks: list) -> pd.DataFrame:
+	"""
+	Converts Tasks to a DataFrame with the same column types as a task file read from CSV.
+
+	:param tasks: The Tasks.
+	:return: The tasks, in the same order.
+	"""
+	task_dataframe = pd.DataFrame([[getattr(task, column) for column in TASK_COLUMNS] for task in tasks],
+	                              columns=TASK_COLUMNS).astype(TASK_DTYPES)
+	task_dataframe['due_date'] = pd.to_datetime(task_dataframe['due_date'])
+
+	return task_dataframe
+
+def records_from_dataframe(task_dataframe: pd.DataFrame) -> dict:
+	"""
+	Converts tasks to Tasks, keyed by ID. The first task wins if an ID is duplicated.
+
+	:param task_dataframe: The tasks.
+	:return: The Tasks, in file order.
+	"""
+	records = {}
+	for task in tasks_from_dataframe(task_dataframe):
+		records.setdefault(task.id, task)
+	return records
+
+
+def import_pyarrow():
+	"""Imports pyarrow, which is only needed for the binary formats."""
+	try:
+		import pyarrow
+	except ModuleNotFoundError as err:
+		raise ModuleNotFoundError("pyarrow is required for Feather and Parquet task files: pip install pyarrow") from err
+	return pyarrow
+
+
+def arrow_schema(columns: list = None):
+	"""
+	Returns the Arrow schema of a task file.
+
+	:param columns: Only include these columns, if given.
+	:return: The schema as a pyarrow.Schema.
+	"""
+	pa = import_pyarrow()
+	fields = {
+		"id": pa.string(), "complete": pa.bool_(), "title": pa.string(),
+		"urgency": pa.int8(), "importance": pa.int8(), "effort": pa.int8(),
+		"due_date": pa.timestamp("us"), "_created": pa.timestamp("us"), "_modified": pa.timestamp("us"),
+	}
+	return pa.schema([(column, fields[column]) for column in (columns or TASK_COLUMNS)])
+
+
+def to_arrow_types(task_dataframe: pd.DataFrame) -> pd.DataFrame:
+	"""Converts tasks read from, or formatted for, a CSV file to the column types of the binary formats."""
+	complete = task_dataframe['complete']
+	if complete.dtype != bool:
+		complete = complete.astype(str).str.upper() == "TRUE"
+
+	return task_dataframe.astype({**TASK_DTYPES, 'complete': 'object'}).assign(
+		complete=complete,
+		due_date=pd.to_datetime(task_dataframe['due_date'].replace("", None), format="ISO8601"),
+		_created=pd.to_datetime(task_dataframe['_created'], format="ISO8601"),
+		_modified=pd.to_datetime(task_dataframe['_modified'], format="ISO8601"))
+
+
+def replace_file(task_file: Path, write) -> None:
+	"""
+	Writes a file through a temporary file that is renamed over it, so readers never see a half-written file. The
+	temporary file is synced to disk first, so a crash cannot leave an empty file behind either.
+
+	:param task_file: The file to replace.
+	:param write: A function that writes the new content to the path it is given.
+	"""
+	task_file = Path(task_file)
+	temp_file = task_file.parent / f".{task_file.name}.{os.urandom(8).hex()}.tmp"
+	# created like any new file, so the umask applies, and the rename passes that mode on to a new task file
+	os.close(os.open(temp_file, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o666))
+	try:
+		try:
+			os.chmod(temp_file, os.stat(task_file).st_mode & 0o7777)  # keep the mode of the file being replaced
+		except FileNotFoundError:
+			pass
+		write(temp_file)
+		with open(temp_file, "rb") as f:
+			os.fsync(f.fileno())
+		os.replace(temp_file, task_file)
+	except BaseException:
+		temp_file.unlink(missing_ok=True)
+		raise
+
+
+def blank_out(row: bytes) -> bytes:
+	"""Replaces a row with spaces, keeping its line breaks, so it is read as blank lines but keeps its length."""
+	return re.sub(rb"[^\r\n]", b" ", row)
+
+
+def scan_rows(f, offset: int):
+	"""
+	Finds the rows of a CSV file, including rows with line breaks inside quoted fields.
+
+	:param f: The file, opened in binary mode and positioned at offset.
+	:param offset: The byte offset of the first row to find.
+	:return: A generator of the byte offset and the bytes of each row.
+	"""
+	parts = []
+	num_quotes = 0
+	for line in f:
+		parts.append(line)
+		num_quotes += line.count(b'"')
+		if num_quotes % 2:
+			continue  # a quoted field goes on on the next line
+		row = b"".join(parts) if len(parts) > 1 else line
+		yield offset, row
+		offset += len(row)
+		parts.clear()
+		num_quotes = 0
+
+
+class CsvStorage:
+	"""
+	Task file stored as CSV text. Appends are cheap, but every read parses every row.
+
+	Reads take a shared lock and writes an exclusive one, so a read never sees half of a row another process is
+	appending.
+
+	A task is updated by blanking out its row with spaces, which every reader skips as blank lines, and appending the
+	new version, so an update writes two rows no matter how large the file is. The rows are found through an index of
+	the byte offset of every task's row, built on the first update and extended as the file grows. Once blanked out
+	rows make up COMPACT_RATIO of the file, it is compacted in a background thread.
+	"""
+
+	indexed = False
+	updates_in_place = False
+
+	def __init__(self, task_file: Path):
+		self.task_file = Path(task_file)
+		self._offsets = {}  # task ID: (byte offset, length) of the row that is read for it
+		self._duplicates = {}  # task ID: [(byte offset, length), ...] of later rows with the same ID
+		self._scanned = None  # (inode, bytes) of the file the offsets were found in
+		self._blank_bytes = 0
+		self._compactor = None
+		self._page_offsets = array("q")  # byte offset of every PAGE_INDEX_STRIDE-th task, for read_page
+		self._page_fingerprint = None  # (inode, bytes, modification time) of the file the page offsets were found in
+		self._page_header = None
+
+	def _scan(self) -> None:
+		"""Brings the row offsets up to date with the file. Must be called while the file is locked."""
+		stat = os.stat(self.task_file)
+		if self._scanned is None or self._scanned[0] != stat.st_ino or self._scanned[1] > stat.st_size:
+			self._offsets, self._duplicates, self._scanned, self._blank_bytes = {}, {}, (stat.st_ino, 0), 0
+		if self._scanned[1] == stat.st_size:
+			return
+
+		with open(self.task_file, "rb") as f:
+			f.seek(self._scanned[1])
+			rows = scan_rows(f, self._scanned[1])
+			if self._scanned[1] == 0:
+				next(rows, None)  # the header
+			for offset, row in rows:
+				if not row.strip():
+					self._blank_bytes += len(row)
+					continue
+				task_id = next(csv.reader([row.decode("utf-8")]))[0]
+				if task_id in self._offsets:
+					self._duplicates.setdefault(task_id, []).append((offset, len(row)))
+				else:
+					self._offsets[task_id] = (offset, len(row))
+		self._scanned = (stat.st_ino, stat.st_size)
+
+	def _read_at(self, task_id: str) -> bytes:
+		"""Reads the row of a task through the offsets, re-scanning the file once if another process moved it."""
+		for attempt in range(2):
+			self._scan()
+			offset, length = self._offsets.get(task_id, (None, 0))
+			if offset is None:
+				return None
+			with open(self.task_file, "rb") as f:
+				f.seek(offset)
+				row = f.read(length)
+			if row.strip() and next(csv.reader([row.decode("utf-8")]))[0] == task_id:
+				return row
+			self._scanned = None  # blanked out or compacted by another process
+
+		return None
+
+	def read(self, columns: list = None) -> pd.DataFrame:
+		with locked(self.task_file, shared=True):
+			return pd.read_csv(self.task_file, usecols=columns, dtype=TASK_DTYPES, date_format="ISO8601",
+			                   parse_dates=[column for column in TASK_DATE_COLUMNS if not columns or column in columns])
+
+	def read_chunks(self, chunk_size: int = CHUNK_SIZE, columns: list = None):
+		with locked(self.task_file, shared=True), pd.read_csv(self.task_file, usecols=columns, dtype=TASK_DTYPES, date_format="ISO8601", chunksize=chunk_size,
+		                 parse_dates=[column for column in TASK_DATE_COLUMNS if not columns or column in columns]) as chunks:
+			yield from chunks
+
+	def read_records(self) -> dict:
+		"""
+		Reads every task as a Task, keyed by ID, with the csv module instead of pandas. The first task wins if an ID is
+		duplicated.
+		"""
+		records = {}
+		for task in self.read_tasks():
+			records.setdefault(task.id, task)
+		return records
+
+	def read_tasks(self) -> list:
+		"""Reads every task as a Task, in file order, with the csv module instead of pandas."""
+		with locked(self.task_file, shared=True), open(self.task_file, newline="") as f:
+			reader = csv.reader(f)
+			get_fields = itemgetter(*map(next(reader).index, TASK_COLUMNS))
+			return [Task.from_row(get_fields(row)) for row in reader if len(row) > 1]  # skips blanked out rows
+
+	def read_page(self, start: int, count: int) -> list:
+		"""
+		Reads the tasks at positions [start, start + count), e.g. a page of the backlog, without reading the whole file.
+
+		The byte offset of every PAGE_INDEX_STRIDE-th task is kept, so reading starts at the nearest one before the
+		page, whether paging forward or back, and memory does not grow with the page number. The offsets are found as
+		pages further into the file are read, and are dropped when the file changes.
+
+		:param start: The position of the first task, counting from 0.
+		:param count: The number of tasks to read.
+		:return: The tasks, fewer than count if the file ends first.
+		"""
+		tasks = []
+		with locked(self.task_file, shared=True), open(self.task_file, "rb") as f:
+			stat = os.fstat(f.fileno())
+			if (stat.st_ino, stat.st_size, stat.st_mtime_ns) != self._page_fingerprint:
+				header = f.readline()
+				self._page_header = next(csv.reader([header.decode("utf-8")]))
+				self._page_offsets = array("q", [len(header)])
+				self._page_fingerprint = (stat.st_ino, stat.st_size, stat.st_mtime_ns)
+			get_fields = itemgetter(*map(self._page_header.index, TASK_COLUMNS))
+
+			checkpoint = min(start // PAGE_INDEX_STRIDE, len(self._page_offsets) - 1)
+			position = checkpoint * PAGE_INDEX_STRIDE
+			f.seek(self._page_offsets[checkpoint])
+			for offset, row in scan_rows(f, self._page_offsets[checkpoint]):
+				if len(tasks) >= count:
+					break
+				if not row.strip():
+					continue  # blanked out by an update
+				if position == len(self._page_offsets) * PAGE_INDEX_STRIDE:
+					self._page_offsets.append(offset)
+				if position >= start:
+					tasks.append(Task.from_row(get_fields(next(csv.reader([row.decode("utf-8")])))))
+				position += 1
+
+		return tasks
+
+	def append(self, rows: list) -> None:
+		"""Appends rows of text values, in TASK_COLUMNS order, quoting them where needed."""
+		with locked(self.task_file), open(self.task_file, "a", newline="") as f:
+			csv.writer(f, lineterminator="\n").writerows(rows)
+
+	def read_row(self, task_id: str) -> list:
+		"""
+		Reads the row of a single task through the row offsets.
+
+		:param task_id: The ID of the task.
+		:return: The task's text values in TASK_COLUMNS order, if it exists, otherwise None.
+		"""
+		with locked(self.task_file):
+			row = self._read_at(str(task_id))
+		return None if row is None else next(csv.reader([row.decode("utf-8")]))
+
+	def update(self, task_id: str, row: list) -> None:
+		"""
+		Replaces the row of a single task by blanking it out and appending the new row.
+
+		:param task_id: The ID of the task.
+		:param row: The task's new text values, in TASK_COLUMNS order.
+		:raises: KeyError if there is no task with the ID.
+		"""
+		task_id = str(task_id)
+		new_row = io.StringIO()
+		csv.writer(new_row, lineterminator="\n").writerow(row)
+		new_row = new_row.getvalue().encode("utf-8")
+
+		with locked(self.task_file):
+			if self._read_at(task_id) is None:
+				raise KeyError(task_id)
+			with open(self.task_file, "r+b") as f:
+				# later rows with the same ID would be read instead of the new row once the first one is blanked out
+				for offset, length in [self._offsets[task_id]] + self._duplicates.pop(task_id, []):
+					f.seek(offset)
+					blank_row = blank_out(f.read(length))
+					f.seek(offset)
+					f.write(blank_row)
+					self._blank_bytes += length
+				end = f.seek(0, os.SEEK_END)
+				f.write(new_row)
+			self._offsets[task_id] = (end, len(new_row))
+			self._scanned = (self._scanned[0], end + len(new_row))
+
+			if self._blank_bytes > max(COMPACT_MIN_BYTES, self._scanned[1] * COMPACT_RATIO) and self._compactor is None:
+				self._compactor = threading.Thread(target=self.compact, daemon=True)
+				self._compactor.start()
+
+	def compact(self) -> None:
+		"""Rewrites the task file without the rows blanked out by updates."""
+		def write(temp_file):
+			with open(self.task_file, "rb") as source, open(temp_file, "wb") as f:
+				f.writelines(row for _, row in scan_rows(source, 0) if row.strip())
+
+		try:
+			with locked(self.task_file):
+				replace_file(self.task_file, write)
+				self._scanned = None
+		finally:
+			self._compactor = None
+
+	def write(self, task_chunks) -> int:
+		num_tasks = 0
+
+		def write(temp_file):
+			nonlocal num_tasks
+			with open(temp_file, "w", newline="") as f:
+				f.write(",".join(TASK_COLUMNS) + "\n")
+				for task_chunk in task_chunks:
+					if task_chunk['complete'].dtype == bool:
+						task_chunk = task_chunk.assign(complete=task_chunk['complete'].map({True: "TRUE", False: "FALSE"}))
+					task_chunk.to_csv(f, header=False, index=False, columns=TASK_COLUMNS, date_format="%Y-%m-%dT%H:%M:%S.%f")
+					num_tasks += len(task_chunk)
+
+		with locked(self.task_file):
+			replace_file(self.task_file, write)
+		return num_tasks
+
+
+class FeatherStorage:
+	"""
+	Task file stored in the Feather (Arrow IPC) format, uncompressed so it can be memory-mapped.
+
+	Reads only touch the requested columns. Appends and updates rewrite the whole file, so this suits backlogs that are
+	read far more often than they are added to.
+	"""
+
+	indexed = False
+	updates_in_place = True
+
+	def __init__(self, task_file: Path):
+		self.task_file = Path(task_file)
+
+	def read(self, columns: list = None) -> pd.DataFrame:
+		from pyarrow import feather
+		return feather.read_table(self.task_file, columns=columns, memory_map=True).to_pandas()
+
+	def read_chunks(self, chunk_size: int = CHUNK_SIZE, columns: list = None):
+		pa = import_pyarrow()
+		with pa.memory_map(str(self.task_file)) as source:
+			reader = pa.ipc.open_file(source)
+			for i in range(reader.num_record_batches):
+				batch = reader.get_batch(i)
+				batch = batch.select(columns) if columns else batch
+				for start in range(0, batch.num_rows, chunk_size):
+					yield batch.slice(start, chunk_size).to_pandas()
+
+	def read_records(self) -> dict:
+		return records_from_dataframe(self.read())
+
+	def read_tasks(self) -> list:
+		return tasks_from_dataframe(self.read())
+
+	def read_page(self, start: int, count: int) -> list:
+		from pyarrow import feather
+		# memory-mapped, so only the rows of the page are read from disk
+		return tasks_from_dataframe(feather.read_table(self.task_file, memory_map=True).slice(start, count).to_pandas())
+
+	def append(self, rows: list) -> None:
+		with locked(self.task_file):  # so no other append lands between the read and the write
+			tasks = pd.concat([self.read(), to_arrow_types(pd.DataFrame(rows, columns=TASK_COLUMNS))], ignore_index=True)
+			self.write([tasks])
+
+	def read_row(self, task_id: str) -> list:
+		tasks = self.read()
+		tasks = tasks[tasks['id'] == str(task_id)]
+		return format_row(tasks.iloc[0]) if len(tasks) else None
+
+	def update(self, task_id: str, row: list) -> None:
+		with locked(self.task_file):  # the whole file is rewritten, as with an append
+			tasks = self.read()
+			is_task = tasks['id'].eq(str(task_id))
+			if not is_task.any():
+				raise KeyError(task_id)
+			tasks.loc[is_task.idxmax()] = to_arrow_types(pd.DataFrame([row], columns=TASK_COLUMNS)).iloc[0]
+			self.write([tasks])
+
+	def write(self, task_chunks) -> int:
+		pa = import_pyarrow()
+		num_tasks = 0
+
+		def write(temp_file):
+			nonlocal num_tasks
+			schema = arrow_schema()
+			with pa.ipc.new_file(temp_file, schema) as writer:
+				for task_chunk in task_chunks:
+					writer.write_batch(pa.RecordBatch.from_pandas(task_chunk[TASK_COLUMNS], schema=schema, preserve_index=False))
+					num_tasks += len(task_chunk)
+
+		with locked(self.task_file):
+			replace_file(self.task_file, write)
+		return num_tasks
+
+
+class ParquetStorage:
+	"""
+	Task file stored in the Parquet format. Smaller on disk than Feather, at the cost of decompressing on read.
+
+	Reads only touch the requested columns. Appends and updates rewrite the whole file.
+	"""
+
+	indexed = False
+	updates_in_place = True
+
+	def __init__(self, task_file: Path):
+		self.task_file = Path(task_file)
+
+	def read(self, columns: list = None) -> pd.DataFrame:
+		from pyarrow import parquet
+		return parquet.read_table(self.task_file, columns=columns, memory_map=True).to_pandas()
+
+	def read_chunks(self, chunk_size: int = CHUNK_SIZE, columns: list = None):
+		from pyarrow import parquet
+		for batch in parquet.ParquetFile(self.task_file, memory_map=True).iter_batches(chunk_size, columns=columns):
+			yield batch.to_pandas()
+
+	def read_records(self) -> dict:
+		return records_from_dataframe(self.read())
+
+	def read_tasks(self) -> list:
+		return tasks_from_dataframe(self.read())
+
+	def read_page(self, start: int, count: int) -> list:
+		from pyarrow import parquet
+		# only the row groups the page falls in are read
+		parquet_file = parquet.ParquetFile(self.task_file, memory_map=True)
+		pages = []
+		for i in range(parquet_file.num_row_groups):
+			num_rows = parquet_file.metadata.row_group(i).num_rows
+			if start < num_rows and count > 0:
+				page = parquet_file.read_row_group(i).slice(start, count)
+				pages.append(page.to_pandas())
+				count -= page.num_rows
+			start = max(0, start - num_rows)
+
+		return tasks_from_dataframe(pd.concat(pages, ignore_index=True)) if pages else []
+
+	def append(self, rows: list) -> None:
+		with locked(self.task_file):  # so no other append lands between the read and the write
+			tasks = pd.concat([self.read(), to_arrow_types(pd.DataFrame(rows, columns=TASK_COLUMNS))], ignore_index=True)
+			self.write([tasks])
+
+	def read_row(self, task_id: str) -> list:
+		tasks = self.read()
+		tasks = tasks[tasks['id'] == str(task_id)]
+		return format_row(tasks.iloc[0]) if len(tasks) else None
+
+	def update(self, task_id: str, row: list) -> None:
+		with locked(self.task_file):  # the whole file is rewritten, as with an append
+			tasks = self.read()
+			is_task = tasks['id'].eq(str(task_id))
+			if not is_task.any():
+				raise KeyError(task_id)
+			tasks.loc[is_task.idxmax()] = to_arrow_types(pd.DataFrame([row], columns=TASK_COLUMNS)).iloc[0]
+			self.write([tasks])
+
+	def write(self, task_chunks) -> int:
+		pa = import_pyarrow()
+		from pyarrow import parquet
+		num_tasks = 0
+
+		def write(temp_file):
+			nonlocal num_tasks
+			schema = arrow_schema()
+			with parquet.ParquetWriter(temp_file, schema) as writer:
+				for task_chunk in task_chunks:
+					writer.write_batch(pa.RecordBatch.from_pandas(task_chunk[TASK_COLUMNS], schema=schema, preserve_index=False))
+					num_tasks += len(task_chunk)
+
+		with locked(self.task_file):
+			replace_file(self.task_file, write)
+		return num_tasks
+
+
+class SqliteStorage:
+	"""
+	Task file stored in an SQLite database, indexed on id, complete, effort and due_date.
+
+	Single tasks and the incomplete tasks of one effort tier are looked up through the indexes instead of reading the
+	whole file, and appends and updates insert and update rows instead of rewriting it. Dates are stored as ISO 8601 text.
+	"""
+
+	indexed = True
+	updates_in_place = True
+
+	def __init__(self, task_file: Path):
+		self.task_file = Path(task_file)
+		self._connection = None
+
+	@property
+	def connection(self) -> sqlite3.Connection:
+		"""The connection to the database, opened on first use."""
+		if self._connection is None:
+			# the service uses it from whichever thread is serving the user, one at a time
+			self._connection = sqlite3.connect(self.task_file, check_same_thread=False)
+			self._connection.executescript(SQLITE_SCHEMA)
+		return self._connection
+
+	def close(self) -> None:
+		if self._connection is not None:
+			self._connection.close()
+			self._connection = None
+
+	def _query(self, columns: list, where: str = "", parameters=()) -> sqlite3.Cursor:
+		select = ", ".join(f'"{column}"' for column in (columns or TASK_COLUMNS))
+		return self.connection.execute(f"SELECT {select} FROM tasks {where} ORDER BY rowid", parameters)
+
+	@staticmethod
+	def _to_dataframe(rows: list, columns: list) -> pd.DataFrame:
+		task_dataframe = pd.DataFrame(rows, columns=columns or TASK_COLUMNS)
+		task_dataframe = task_dataframe.astype({column: dtype for column, dtype in TASK_DTYPES.items()
+		                                        if column in task_dataframe.columns})
+		for column in TASK_DATE_COLUMNS:
+			if column in task_dataframe.columns:
+				task_dataframe[column] = pd.to_datetime(task_dataframe[column], format="ISO8601")
+		return task_dataframe
+
+	def read(self, columns: list = None) -> pd.DataFrame:
+		return self._to_dataframe(self._query(columns).fetchall(), columns)
+
+	def read_chunks(self, chunk_size: int = CHUNK_SIZE, columns: list = None):
+		cursor = self._query(columns)
+		while rows := cursor.fetchmany(chunk_size):
+			yield self._to_dataframe(rows, columns)
+
+	def get(self, task_id: str) -> pd.DataFrame:
+		"""
+		Gets a single task through the primary key.
+
+		:param task_id: The ID of the task to get.
+		:return: A single row DataFrame of the task, if it exists, otherwise None.
+		"""
+		rows = self._query(None, "WHERE id = ?", (str(task_id),)).fetchall()
+		return self._to_dataframe(rows, None) if rows else None
+
+	def get_record(self, task_id: str) -> Task:
+		"""
+		Gets a single task through the primary key, without pandas.
+
+		:param task_id: The ID of the task to get.
+		:return: The task as a Task, if it exists, otherwise None.
+		"""
+		tasks = self._to_tasks(self._query(None, "WHERE id = ?", (str(task_id),)))
+		return tasks[0] if tasks else None
+
+	def read_records(self) -> dict:
+		return {task.id: task for task in self.read_tasks()}
+
+	@staticmethod
+	def _to_tasks(rows) -> list:
+		return [Task(task_id, bool(complete), title, urgency, importance, effort,
+		             datetime.fromisoformat(due_date) if due_date else None, created or "", modified or "")
+		        for task_id, complete, title, urgency, importance, effort, due_date, created, modified in rows]
+
+	def read_tasks(self) -> list:
+		return self._to_tasks(self._query(None))
+
+	def read_page(self, start: int, count: int) -> list:
+		select = ", ".join(f'"{column}"' for column in TASK_COLUMNS)
+		return self._to_tasks(self.connection.execute(f"SELECT {select} FROM tasks ORDER BY rowid LIMIT ? OFFSET ?",
+		                                              (count, start)))
+
+	def get_effort(self, task_id: str) -> int:
+		"""
+		Gets the effort of a single task through the primary key.
+
+		:param task_id: The ID of the task.
+		:return: The effort of the task, or 0 if it does not exist.
+		"""
+		row = self.connection.execute("SELECT effort FROM tasks WHERE id = ?", (str(task_id),)).fetchone()
+		return 0 if row is None else row[0]
+
+	def get_total_effort(self, task_ids) -> int:
+		"""
+		Gets the cumulative effort of the given tasks, looking each one up through the primary key.
+
+		:param task_ids: The IDs of the tasks.
+		:return: The sum of the tasks' effort. Unknown tasks count as 0.
+		"""
+		task_ids = [str(task_id) for task_id in task_ids]
+		efforts = dict(self.connection.execute(
+			"SELECT id, effort FROM tasks WHERE id IN (SELECT value FROM json_each(?))", (json.dumps(task_ids),)))
+		return sum(efforts.get(task_id, 0) for task_id in task_ids)
+
+	def read_incomplete(self, effort: int = None, columns: list = None) -> pd.DataFrame:
+		"""
+		Reads the incomplete tasks through the (complete, effort) index, so completed tasks are never read.
+
+		:param effort: Only read the tasks of this effort tier, if given.
+		:param columns: Only read these columns, if given.
+		:return: The incomplete tasks, in the order they were added.
+		"""
+		if effort is None:
+			return self._to_dataframe(self._query(columns, "WHERE complete = 0").fetchall(), columns)
+		return self._to_dataframe(self._query(columns, "WHERE complete = 0 AND effort = ?", (effort,)).fetchall(), columns)
+
+	def append(self, rows: list) -> None:
+		"""Inserts rows of text values, in TASK_COLUMNS order, as formatted for a CSV file."""
+		with self.connection:
+			self.connection.executemany(
+				f"INSERT INTO tasks ({', '.join(TASK_COLUMNS)}) VALUES ({', '.join('?' * len(TASK_COLUMNS))})",
+				[(task_id, str(complete).upper() == "TRUE", title, urgency, importance, effort, due_date or None,
+				  created, modified)
+				 for task_id, complete, title, urgency, importance, effort, due_date, created, modified in rows])
+
+	def read_row(self, task_id: str) -> list:
+		"""
+		Reads a single task through the primary key.
+
+		:param task_id: The ID of the task.
+		:return: The task's values in TASK_COLUMNS order, as formatted for a CSV file, if it exists, otherwise None.
+		"""
+		row = self._query(None, "WHERE id = ?", (str(task_id),)).fetchone()
+		return None if row is None else [row[0], "TRUE" if row[1] else "FALSE", *row[2:6], row[6] or "", *row[7:]]
+
+	def update(self, task_id: str, row: list) -> None:
+		"""
+		Replaces a single task in place through the primary key.
+
+		:param task_id: The ID of the task.
+		:param row: The task's new values in TASK_COLUMNS order, as formatted for a CSV file.
+		:raises: KeyError if there is no task with the ID.
+		"""
+		_, complete, title, urgency, importance, effort, due_date, created, modified = row
+		with self.connection:
+			cursor = self.connection.execute(
+				"UPDATE tasks SET complete = ?, title = ?, urgency = ?, importance = ?, effort = ?, due_date = ?, "
+				"_created = ?, _modified = ? WHERE id = ?",
+				(str(complete).upper() == "TRUE", title, urgency, importance, effort, due_date or None, created, modified,
+				 str(task_id)))
+		if cursor.rowcount == 0:
+			raise KeyError(task_id)
+
+	def write(self, task_chunks) -> int:
+		num_tasks = 0
+
+		def write(temp_file):
+			nonlocal num_tasks
+			connection = sqlite3.connect(temp_file)
+			try:
+				connection.executescript(SQLITE_SCHEMA)
+				for task_chunk in task_chunks:
+					# the first task wins if an ID is duplicated, like everywhere else tasks are looked up by ID
+					connection.executemany(
+						f"INSERT OR IGNORE INTO tasks ({', '.join(TASK_COLUMNS)}) "
+						f"VALUES ({', '.join('?' * len(TASK_COLUMNS))})",
+						to_sqlite_rows(task_chunk))
+					num_tasks += len(task_chunk)
+				connection.commit()
+			finally:
+				connection.close()
+
+		self.close()  # the file is about to be replaced
+		replace_file(self.task_file, write)
+		return num_tasks
+
+
+def format_row(task: pd.Series) -> list:
+	"""Formats a single typed task, e.g. read from a binary task file, as text values in TASK_COLUMNS order."""
+	return [task['id'], "TRUE" if task['complete'] else "FALSE", task['title'], int(task['urgency']),
+	        int(task['importance']), int(task['effort']),
+	        *("" if pd.isna(task[column]) else task[column].isoformat()
+	          for column in ['due_date', '_created', '_modified'])]
+
+
+def to_sqlite_rows(task_chunk: pd.DataFrame):
+	"""Converts a chunk of tasks, typed or read from a CSV file, to rows of SQLite values in TASK_COLUMNS order."""
+	task_chunk = task_chunk[TASK_COLUMNS]
+	complete = task_chunk['complete']
+	if complete.dtype != bool:
+		complete = complete.astype(str).str.upper() == "TRUE"
+
+	values = task_chunk.astype({'urgency': 'int64', 'importance': 'int64', 'effort': 'int64'}).astype(object)
+	values['complete'] = complete.astype(object)
+	for column in ['due_date', '_created', '_modified']:
+		if pd.api.types.is_datetime64_any_dtype(task_chunk[column]):
+			values[column] = task_chunk[column].dt.strftime("%Y-%m-%dT%H:%M:%S.%f").astype(object)
+		values[column] = values[column].where(values[column].notna() & (values[column] != ""), None)
+
+	return values.itertuples(index=False, name=None)
+
+
+STORAGE_TYPES = {
+	".csv": CsvStorage,
+	".feather": FeatherStorage,
+	".arrow": FeatherStorage,
+	".parquet": ParquetStorage,
+	**{suffix: SqliteStorage for suffix in SQLITE_SUFFIXES},
+}
+
+
+def get_storage(task_file: Path):
+	"""
+	Gets the storage backend of a task file, based on its extension.
+
+	:param task_file: The task file.
+	:return: The storage backend. Unknown extensions are treated as CSV.
+	"""
+	task_file = Path(task_file)
+	return STORAGE_TYPES.get(task_file.suffix.lower(), CsvStorage)(task_file)
+
+
+def convert(source_file: Path, destination_file: Path, chunk_size: int = CHUNK_SIZE) -> int:
+	"""
+	Converts a task file from one format to another, one chunk at a time.
+
+	:param source_file: The task file to convert, e.g. user-tasks.csv.
+	:param destination_file: The file to write, e.g. user-tasks.feather.
+	:param chunk_size: The number of tasks converted at a time.
+	:return: The number of tasks converted.
+	"""
+	source = get_storage(source_file)
+	destination = get_storage(destination_file)
+	task_chunks = source.read_chunks(chunk_size)
+	if isinstance(source, CsvStorage) and isinstance(destination, (FeatherStorage, ParquetStorage)):
+		task_chunks = map(to_arrow_types, task_chunks)
+
+	return destination.write(task_chunks)
+
+
+def main(argv: list = None):
+	parser = argparse.ArgumentParser(description="Converts a task file between CSV, Feather, Parquet and SQLite.")
+	parser.add_argument("source", type=Path, help="task file to convert, e.g. data/user-tasks.csv")
+	parser.add_argument("destination", type=Path, help="file to write, e.g. data/user-tasks.feather")
+	parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE, help="tasks converted at a time")
+	args = parser.parse_args(argv)
+
+	num_tasks = convert(args.source, args.destination, args.chunk_size)
+	print(f"{num_tasks} tasks converted from {args.source} to {args.destination}")
+
+
+if __name__ == "__main__":
+	main()
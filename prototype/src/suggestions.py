@@ -0,0 +1,129 @@
+"""
+File name: suggestions.py
+Description: Interleaves ranked effort tiers into a single list of suggestions.
+
+Author: Lacie Turner
+Date created: 2026-10-18
+Date last modified: 2026-10-18
+Python Version: 3.12
+"""
+
+from __future__ import annotations
+
+__author__ = "Lacie Turner"
+__maintainer__ = "Lacie Turner"
+__email__ = "tasketai@lacie.dev"
+__credits__ = ["Lacie Turner"]
+__status__ = "Development"
+__version__ = "0.0.1"
+
+import json
+from itertools import islice
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+	from prototype.src.ranked_index import RankedIndex
+
+
+OUTPUT_COLUMNS = ['id', 'title', 'urgency', 'importance', 'effort', 'due_date', 'relevance_score']
+SUGGESTION_LIMIT = 10
+# velocity: (effort of the main tier, [(effort of a tier to interleave, chunk size, nth index), ...])
+VELOCITY_TIERS = {
+	1: (1, []),
+	2: (2, [(1, 2, 4)]),
+	3: (3, [(2, 2, 3), (1, 1, 5)]),
+}
+
+
+def interleave(task_ids_1, task_ids_2, chunk_size: int = 2, nth_index: int = 4):
+	"""
+	Lazily merges task_ids_2 into task_ids_1, yielding a chunk of task_ids_2 before every nth element of task_ids_1.
+	Once task_ids_1 runs out, whatever is left of task_ids_2 is yielded.
+
+	Example:
+		task_ids_1 = [0, 1, 2, 3, 4]
+		task_ids_2 = ['a', 'b', 'c', 'd', 'e', 'f', 'g']
+		result = [0, 1, 2, 3, 'a', 'b', 4, 'c', 'd', 'e', 'f', 'g']
+
+	:param task_ids_1: The iterable to be merged into.
+	:param task_ids_2: The iterable to merge.
+	:param chunk_size: The number of elements of task_ids_2 to yield at a time.
+	:param nth_index: The stride of task_ids_1 between chunks.
+	:return: A generator of the merged elements.
+	"""
+	task_ids_2 = iter(task_ids_2)
+	for i, task_id in enumerate(task_ids_1):
+		if i > 0 and i % nth_index == 0:
+			yield from islice(task_ids_2, chunk_size)
+		yield task_id
+
+	yield from task_ids_2  # leftovers, if any
+
+
+def interleave_tiers(task_ids, *tiers):
+	"""
+	Lazily merges any number of ranked tiers into task_ids, one after the other.
+
+	:param task_ids: The main tier's task IDs.
+	:param tiers: (task_ids, chunk_size, nth_index) tuples, merged in the given order.
+	:return: A generator of the merged task IDs.
+	"""
+	for tier_task_ids, chunk_size, nth_index in tiers:
+		task_ids = interleave(task_ids, tier_task_ids, chunk_size, nth_index)
+
+	return iter(task_ids)
+
+
+def suggest_from_tiers(ranked_tiers: dict, velocity: int, exclude=(), limit: int = None) -> list:
+	"""
+	Returns the IDs of the suggested tasks for the given velocity, interleaving the ranked effort tiers as laid out by
+	VELOCITY_TIERS. Every way of suggesting tasks ends here, whichever way the tiers were ranked.
+
+	:param ranked_tiers: The ranked task IDs of each effort tier, best first, by effort. Each tier is only read as far
+	                     as the suggestions need.
+	:param velocity: The velocity of the user.
+	:param exclude: Task IDs to leave out, e.g. tasks that have already been selected or rejected.
+	:param limit: Only return the first limit suggestions, if given.
+	:return: The IDs of the suggested tasks, in the order they should be shown.
+	"""
+	main_effort, tiers = VELOCITY_TIERS.get(velocity, (None, []))
+	if main_effort is None:
+		return []
+
+	exclude = set(exclude)
+
+	def candidates(effort):
+		return (task_id for task_id in ranked_tiers.get(effort, ()) if task_id not in exclude)
+
+	task_ids = interleave_tiers(candidates(main_effort), *[(candidates(effort), chunk_size, nth_index)
+	                                                       for effort, chunk_size, nth_index in tiers])
+
+	return list(islice(task_ids, limit))
+
+
+def suggest_from_index(ranked_index: RankedIndex, velocity: int, exclude=(), limit: int = None) -> list:
+	"""
+	Returns the IDs of the suggested tasks for the given velocity from a ranked index.
+
+	:param ranked_index: The ranked index of the user's backlog.
+	:param velocity: The velocity of the user.
+	:param exclude: Task IDs to leave out, e.g. tasks that have already been selected or rejected.
+	:param limit: Only return the first limit suggestions, if given. Each effort tier is then only ranked as far as it
+	              can contribute to the first limit suggestions.
+	:return: The IDs of the suggested tasks, in the order they should be shown.
+	"""
+	main_effort, tiers = VELOCITY_TIERS.get(velocity, (None, []))
+	if main_effort is None:
+		return []
+
+	k = len(ranked_index) if limit is None else limit
+	exclude = set(exclude)
+	ranked_tiers = {effort: ranked_index.top(effort, k, exclude=exclude)
+	                for effort in [main_effort] + [effort for effort, _, _ in tiers]}
+
+	return suggest_from_tiers(ranked_tiers, velocity, limit=limit)
+
+
+def to_records(task_dataframe) -> list:
+	"""Converts ranked or suggested tasks to JSON-friendly dicts."""
+	return json.loads(task_dataframe[OUTPUT_COLUMNS].to_json(orient="records", date_format="iso"))
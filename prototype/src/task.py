@@ -4,10 +4,12 @@ Description: Contains logic related to tasks.
 
 Author: Lacie Turner
 Date created: 2025-02-10
-Date last modified: 2025-02-13
+Date last modified: 2026-10-18
 Python Version: 3.12
 """
 
+from __future__ import annotations
+
 __author__ = "Lacie Turner"
 __maintainer__ = "Lacie Turner"
 __email__ = "tasketai@lacie.dev"
@@ -16,54 +18,490 @@ __status__ = "Development"
 __version__ = "0.0.1"
 
 import uuid
-import pandas as pd
 import datetime as dt
 from pathlib import Path
-from prototype.src.rank_tasks import rank_tasks
+from typing import TYPE_CHECKING
+from prototype.src.file_lock import locked
+from prototype.src.rank_cache import RankCache
+from prototype.src.storage import CHUNK_SIZE, RANK_COLUMNS, TASK_COLUMNS, Task, get_storage, tasks_from_dataframe, tasks_to_dataframe
+
+# pandas and the ranking modules are imported where they are needed, so adding a task or looking one up starts quickly
+if TYPE_CHECKING:
+	import pandas as pd
+	from prototype.src.ranked_index import RankedIndex
+
+MAX_TITLE_LENGTH = 256
+IMPORT_COLUMNS = ['id', 'title', 'urgency', 'importance', 'effort', 'due_date']
+UPDATE_COLUMNS = ['complete', 'title', 'urgency', 'importance', 'effort', 'due_date']
+
 
+_rank_cache = RankCache()
 
-def load(task_file: Path) -> pd.DataFrame:
-	"""Loads a task file into a pandas DataFrame."""
+
+def load(task_file: Path, columns: list = None) -> pd.DataFrame:
+	"""
+	Loads a task file into a pandas DataFrame.
+
+	:param task_file: The task file, in any format supported by the storage module.
+	:param columns: Only load these columns, if given, e.g. storage.RANK_COLUMNS.
+	:return: The loaded tasks.
+	"""
 	task_file = Path(task_file)
 	assert task_file.exists(), f"Task file does not exist at {task_file}"
-	task_df = pd.read_csv(task_file)
+	task_df = get_storage(task_file).read(columns)
 
 	return task_df
 
 
+def load_tasks(task_file: Path) -> list:
+	"""
+	Loads a task file as Task records, without pandas where the format allows it, i.e. CSV and SQLite.
+
+	:param task_file: The task file, in any format supported by the storage module.
+	:return: The loaded tasks, in file order.
+	"""
+	task_file = Path(task_file)
+	assert task_file.exists(), f"Task file does not exist at {task_file}"
+
+	return get_storage(task_file).read_tasks()
+
+
+def read_page(task_file: Path, start: int, count: int) -> list:
+	"""
+	Reads a page of a task file as Task records, without loading the rest of the file.
+
+	:param task_file: The task file, in any format supported by the storage module.
+	:param start: The position of the first task, counting from 0.
+	:param count: The number of tasks to read.
+	:return: The tasks, in file order, fewer than count if the file ends first.
+	"""
+	return get_repository(task_file).storage.read_page(start, count)
+
+
+def load_chunks(task_file: Path, chunk_size: int = CHUNK_SIZE, incomplete_only: bool = True, columns: list = None):
+	"""
+	Lazily loads a task file in chunks, so it never has to fit in memory as a whole.
+
+	:param task_file: The task file, in any format supported by the storage module.
+	:param chunk_size: The number of rows per chunk.
+	:param incomplete_only: Whether to drop completed tasks from each chunk as it is read.
+	:param columns: Only load these columns, if given. Must include 'complete' if incomplete_only is set.
+	:return: A generator of DataFrames.
+	"""
+	task_file = Path(task_file)
+	assert task_file.exists(), f"Task file does not exist at {task_file}"
+	for chunk in get_storage(task_file).read_chunks(chunk_size, columns):
+		yield chunk.loc[~chunk['complete']] if incomplete_only else chunk
+
+
 def is_valid_title(title: str) -> bool:
-	if not title.strip() or len(title.strip()) > 256:
+	if not title.strip() or len(title.strip()) > MAX_TITLE_LENGTH:
 		return False
 	return True
 
 
+def validate(title: str, urgency, importance, effort) -> None:
+	"""
+	Validates the fields of a new task.
+
+	:raises: ValueError with the reason if a field is invalid.
+	"""
+	if not isinstance(title, str) or not is_valid_title(title):
+		raise ValueError(f"Title must be between 1 and {MAX_TITLE_LENGTH} characters long")
+	for name, value, maximum in (("Urgency", urgency, 5), ("Importance", importance, 5), ("Effort", effort, 3)):
+		try:
+			valid = not isinstance(value, bool) and int(value) == float(value) and 1 <= int(value) <= maximum
+		except (TypeError, ValueError):
+			valid = False
+		if not valid:
+			raise ValueError(f"{name} must be between 1 and {maximum}")
+
+
+def to_due_date(value) -> dt.datetime:
+	"""
+	Parses an ISO 8601 due date. Due dates are stored in local time, so a date with a time zone is converted to it.
+
+	:param value: The due date, e.g. "2026-01-02" or "2026-01-02T09:00:00+02:00".
+	:return: The due date, without a time zone.
+	:raises: ValueError if the value is not an ISO 8601 date.
+	"""
+	try:
+		due_date = dt.datetime.fromisoformat(value)
+	except (TypeError, ValueError):
+		raise ValueError("Due date must be an ISO 8601 date") from None
+	return due_date.astimezone().replace(tzinfo=None) if due_date.tzinfo is not None else due_date
+
+
+class TaskRepository:
+	"""
+	Keeps a task file in memory, indexed by task ID.
+
+	The tasks are kept once, as Task records read without pandas, and only re-read when the file's size or
+	modification time changes, or after the repository writes to it. Indexed storage, i.e. SQLite, answers single task
+	lookups itself, so those never read the whole file. Rankings are built from the incomplete tasks as a DataFrame,
+	read through the (complete, effort) index where the storage has one, and the rank cache keeps the rankings, not the
+	DataFrame.
+	"""
+
+	def __init__(self, task_file: Path):
+		self.task_file = Path(task_file)
+		self.storage = get_storage(self.task_file)
+		self._records_fingerprint = None
+		self._records = {}
+
+	def _stat(self) -> tuple:
+		stat = self.task_file.stat()
+		return stat.st_mtime_ns, stat.st_size
+
+	def invalidate(self) -> None:
+		"""Forces the task file to be re-read on the next access."""
+		self._records_fingerprint = None
+
+	@property
+	def dataframe(self) -> pd.DataFrame:
+		"""The task file as a pandas DataFrame, loaded on every access, so only build rankings from it."""
+		return load(self.task_file)
+
+	@property
+	def records(self) -> dict:
+		"""Every task as a Task keyed by ID, re-read only if the file has changed. Does not need pandas."""
+		fingerprint = self._stat()
+		if fingerprint != self._records_fingerprint:
+			self._records = self.storage.read_records()
+			self._records_fingerprint = fingerprint
+
+		return self._records
+
+	def get_record(self, task_id: uuid.UUID) -> Task:
+		"""
+		Gets a single task without pandas.
+
+		:param task_id: The ID of the task to get.
+		:return: The task as a Task, if it exists, otherwise None.
+		"""
+		if self.storage.indexed:
+			return self.storage.get_record(task_id)
+
+		return self.records.get(task_id)
+
+	def get(self, task_id: uuid.UUID) -> pd.DataFrame:
+		"""
+		Gets a single task.
+
+		:param task_id: The ID of the task to get.
+		:return: A single row DataFrame of the task, if it exists, otherwise None.
+		"""
+		if self.storage.indexed:
+			return self.storage.get(task_id)
+
+		record = self.records.get(task_id)
+		return None if record is None else tasks_to_dataframe([record])
+
+	def get_effort(self, task_id: uuid.UUID) -> int:
+		"""
+		Gets the effort of a single task.
+
+		:param task_id: The ID of the task.
+		:return: The effort of the task, or 0 if it does not exist.
+		"""
+		if self.storage.indexed:
+			return self.storage.get_effort(task_id)
+
+		record = self.records.get(task_id)
+		return 0 if record is None else record.effort
+
+	def get_total_effort(self, task_ids) -> int:
+		"""
+		Gets the cumulative effort of the given tasks.
+
+		:param task_ids: The IDs of the tasks.
+		:return: The sum of the tasks' effort. Unknown tasks count as 0.
+		"""
+		if self.storage.indexed:
+			return self.storage.get_total_effort(task_ids)
+
+		records = self.records
+		return sum(records[task_id].effort for task_id in task_ids if task_id in records)
+
+	def get_incomplete(self, effort: int = None) -> pd.DataFrame:
+		"""
+		Gets the incomplete tasks, which is all that rankings are built from. Indexed storage reads only those, rather
+		than the whole file.
+
+		:param effort: Only get the tasks of this effort tier, if given.
+		:return: The incomplete tasks, in file order.
+		"""
+		if self.storage.indexed:
+			return self.storage.read_incomplete(effort)
+
+		task_dataframe = self.dataframe
+		incomplete = ~task_dataframe['complete']
+		return task_dataframe.loc[incomplete if effort is None else incomplete & (task_dataframe['effort'] == effort)]
+
+	@property
+	def ranked_index(self) -> RankedIndex:
+		"""
+		The incomplete tasks ranked per effort tier, from the rank cache. The index is kept across days, as refresh()
+		brings its due date multipliers up to date, so call it before reading scores.
+		"""
+		from prototype.src.ranked_index import RankedIndex
+		return _rank_cache.get(self.task_file, "ranked_index", lambda: RankedIndex(self.get_incomplete()),
+		                       expires_daily=False)
+
+	def add(self, title: str, urgency: int, importance: int, effort: int) -> str:
+		"""
+		Appends a task to the task file.
+
+		:return: The ID of the added task.
+		"""
+		task_id = str(uuid.uuid4())
+		now = dt.datetime.now().isoformat()
+		with locked(self.task_file):  # so a task another process appends is not mistaken for our own
+			ranked_index = _rank_cache.peek(self.task_file, "ranked_index", expires_daily=False)
+			#id,complete,title,urgency,importance,effort,due_date,_created,_modified
+			self.storage.append([[task_id, "FALSE", title, urgency, importance, effort, "", now, now]])
+			self.invalidate()
+
+			if ranked_index is not None:
+				# keep the ranked index instead of re-building it for our own write
+				ranked_index.add(task_id, title, urgency, importance, effort)
+				_rank_cache.update(self.task_file, "ranked_index", ranked_index, expires_daily=False)
+
+		return task_id
+
+	def add_many(self, new_tasks) -> dict:
+		"""
+		Validates a batch of new tasks at once and appends the valid ones to the task file in a single write.
+
+		A task is rejected if a field is invalid, or if its ID, or its title ignoring case and surrounding whitespace,
+		is already used by an existing task or by an earlier task of the batch.
+
+		:param new_tasks: Dicts with a title, urgency, importance and effort each, and optionally an id and an ISO 8601
+		                  due_date, e.g. when migrating from another tool.
+		:return: The IDs of the added tasks, and the reason each rejected task was rejected, by position in the batch.
+		"""
+		import pandas as pd
+
+		new_tasks = list(new_tasks)
+		batch = pd.DataFrame([new_task if isinstance(new_task, dict) else {} for new_task in new_tasks],
+		                     columns=IMPORT_COLUMNS, index=pd.RangeIndex(len(new_tasks)), dtype=object)
+		errors = pd.Series("", index=batch.index, dtype=object)
+
+		def reject(rejected, reason):
+			errors[rejected & (errors == "")] = reason  # only the first reason a task is rejected for is kept
+
+		reject(pd.Series([not isinstance(new_task, dict) for new_task in new_tasks], dtype=bool), "Not an object")
+		titles = batch['title'].where(batch['title'].map(type) == str).str.strip()
+		reject(~titles.str.len().between(1, MAX_TITLE_LENGTH),
+		       f"Title must be between 1 and {MAX_TITLE_LENGTH} characters long")
+		levels = {}
+		for column, maximum in (('urgency', 5), ('importance', 5), ('effort', 3)):
+			# JSON true and false would otherwise pass as 1 and 0
+			levels[column] = pd.to_numeric(batch[column].where(batch[column].map(type) != bool), errors='coerce')
+			reject(~(levels[column].between(1, maximum) & (levels[column] % 1 == 0)),
+			       f"{column.title()} must be between 1 and {maximum}")
+		has_id = batch['id'].notna()
+		reject(has_id & ~batch['id'].map(lambda task_id: isinstance(task_id, str) and task_id.strip() != ""),
+		       "ID must be a non-empty string")
+
+		def parse_due_date(value):
+			try:
+				return to_due_date(value)
+			except ValueError:
+				return None
+
+		# parsed one by one, as a batch mixing dates with and without a time zone cannot share a column
+		has_due_date = batch['due_date'].notna() & (batch['due_date'] != "")
+		due_dates = pd.to_datetime(batch['due_date'].where(has_due_date).map(parse_due_date, na_action='ignore'),
+		                           errors='coerce')
+		reject(has_due_date & due_dates.isna(), "Due date must be an ISO 8601 date")
+
+		# the IDs and titles are checked and the tasks appended under one lock, so two imports cannot add the same task
+		with locked(self.task_file):
+			# de-duplicate through hash sets of the existing IDs and titles, and within the batch, first task wins
+			records = self.records
+			task_ids = batch['id'].where(has_id, pd.Series([str(uuid.uuid4()) for _ in batch.index])).astype(str)
+			title_keys = titles.str.casefold()
+			reject(task_ids.isin(records.keys()), "Duplicate ID")
+			reject(title_keys.isin({record.title.strip().casefold() for record in records.values()}), "Duplicate title")
+			reject(task_ids.where(errors == "").duplicated() & task_ids.where(errors == "").notna(), "Duplicate ID")
+			reject(title_keys.where(errors == "").duplicated() & title_keys.where(errors == "").notna(), "Duplicate title")
+
+			accepted = errors == ""
+			ranked_index = _rank_cache.peek(self.task_file, "ranked_index", expires_daily=False)
+			now = dt.datetime.now().isoformat()
+			num_accepted = int(accepted.sum())
+			rows = list(zip(task_ids[accepted].tolist(), ["FALSE"] * num_accepted, titles[accepted].tolist(),
+			                *(levels[column][accepted].astype(int).tolist() for column in ('urgency', 'importance', 'effort')),
+			                due_dates[accepted].dt.strftime("%Y-%m-%dT%H:%M:%S").fillna("").tolist(),
+			                [now] * num_accepted, [now] * num_accepted))
+			if rows:
+				self.storage.append(rows)
+				self.invalidate()
+
+			if rows and ranked_index is not None:
+				# keep the ranked index instead of re-building it for our own write
+				ranked_index.add_many(pd.DataFrame(rows, columns=TASK_COLUMNS))
+				_rank_cache.update(self.task_file, "ranked_index", ranked_index, expires_daily=False)
+
+		return {"added": [row[0] for row in rows],
+		        "errors": [{"position": position, "error": error} for position, error in errors[~accepted].items()]}
+
+	def update(self, task_id: str, **changes) -> Task:
+		"""
+		Changes the fields of a single task, without rewriting the task file where the storage allows it.
+
+		:param task_id: The ID of the task.
+		:param changes: The new values of any of UPDATE_COLUMNS. A due_date of None or "" removes the due date.
+		:return: The updated task.
+		:raises: KeyError if there is no task with the ID, ValueError if a field is unknown or invalid.
+		"""
+		unknown = set(changes) - set(UPDATE_COLUMNS)
+		if unknown:
+			raise ValueError(f"Cannot update {', '.join(sorted(unknown))}")
+
+		with locked(self.task_file):
+			row = self.storage.read_row(task_id)
+			if row is None:
+				raise KeyError(task_id)
+
+			task = dict(zip(TASK_COLUMNS, row)) | changes
+			validate(task['title'], task['urgency'], task['importance'], task['effort'])
+			due_date = to_due_date(str(task['due_date'])) if task['due_date'] else None
+			complete = task['complete'] is True or str(task['complete']).upper() == "TRUE"
+			record = Task(str(task_id), complete, task['title'].strip(), int(task['urgency']), int(task['importance']),
+			              int(task['effort']), due_date, task['_created'], dt.datetime.now().isoformat())
+
+			records_current = self._records_fingerprint == self._stat()
+			ranked_index = _rank_cache.peek(self.task_file, "ranked_index", expires_daily=False)
+			self.storage.update(task_id, record.to_row())
+			self.invalidate()
+
+			in_place = self.storage.updates_in_place
+			if records_current:
+				# the records only need this task replaced, not a re-read, and moved to the end where its row now is
+				if not in_place:
+					self._records.pop(record.id)
+				self._records[record.id] = record
+				self._records_fingerprint = self._stat()
+
+			if ranked_index is not None and in_place and not complete and record.id not in ranked_index:
+				ranked_index = None  # a re-opened task ranks by where it is in the file, so the index is re-built
+
+			if ranked_index is not None:
+				# keep the ranked index instead of re-building it for our own write
+				if complete:
+					ranked_index.remove(record.id)
+				else:
+					ranked_index.add(record.id, record.title, record.urgency, record.importance, record.effort,
+					                 record.due_date, keep_order=in_place)
+				_rank_cache.update(self.task_file, "ranked_index", ranked_index, expires_daily=False)
+
+		return record
+
+	def complete(self, task_id: str) -> Task:
+		"""
+		Marks a single task complete, which takes it out of the ranking.
+
+		:param task_id: The ID of the task.
+		:return: The updated task.
+		:raises: KeyError if there is no task with the ID.
+		"""
+		return self.update(task_id, complete=True)
+
+
+_repositories = {}
+
+
+def get_repository(task_file: Path) -> TaskRepository:
+	"""
+	Gets the repository for the given task file, creating it on first use.
+
+	:param task_file: The task file.
+	:return: The task file's repository.
+	"""
+	task_file = Path(task_file).resolve()
+	if task_file not in _repositories:
+		_repositories[task_file] = TaskRepository(task_file)
+
+	return _repositories[task_file]
+
+
+def close_repository(task_file: Path) -> None:
+	"""
+	Drops the repository and the ranking results of a task file from memory, e.g. once its user has gone idle.
+
+	:param task_file: The task file.
+	"""
+	repository = _repositories.pop(Path(task_file).resolve(), None)
+	if repository is not None and hasattr(repository.storage, "close"):
+		repository.storage.close()
+	_rank_cache.discard(task_file)
+
+
+def use_rank_cache_size(max_entries: int) -> None:
+	"""
+	Sets how many ranking results are kept in memory, e.g. one per user when serving many users.
+
+	:param max_entries: The number of results to keep.
+	"""
+	_rank_cache.max_entries = max_entries
+
+
+def use_rank_cache_dir(cache_dir: Path) -> None:
+	"""
+	Also keeps ranking results on disk, so a fresh process can skip ranking an unchanged backlog.
+
+	:param cache_dir: The directory to keep the snapshots in.
+	"""
+	_rank_cache.cache_dir = Path(cache_dir)
+
+
 def add(title: str, urgency: int, importance: int, effort: int, csv_file: Path) -> None:
 	if csv_file.exists() and csv_file.stat().st_size > 0:
-		with open(csv_file, "a") as f:
-			now = dt.datetime.now().isoformat()
-			#id,complete,title,urgency,importance,effort,due_date,_created,_modified
-			f.write(f"{uuid.uuid4()},FALSE,{title},{urgency},{importance},{effort},,{now},{now}\n")
+		get_repository(csv_file).add(title, urgency, importance, effort)
 		print(f"\n[INFO] Task added!\n")
 
 
-def get_task_by_id(task_id: uuid.UUID, task_file: Path) -> pd.DataFrame:
-	task_dataframe = load(task_file)
-	single_task_dataframe = task_dataframe.loc[task_dataframe['id'] == task_id]
+def import_tasks(new_tasks, task_file: Path) -> dict:
+	return get_repository(task_file).add_many(new_tasks)
 
-	return None if single_task_dataframe.empty else single_task_dataframe
+
+def update(task_id: str, task_file: Path, **changes) -> Task:
+	return get_repository(task_file).update(task_id, **changes)
+
+
+def complete(task_id: str, task_file: Path) -> Task:
+	return get_repository(task_file).complete(task_id)
+
+
+def get_task_by_id(task_id: uuid.UUID, task_file: Path) -> pd.DataFrame:
+	return get_repository(task_file).get(task_id)
 
 
 def get_effort(task_id: uuid.UUID, task_file: Path) -> int:
-	effort = 0
-	task = get_task_by_id(task_id, task_file)
-	if task is not None:
-		effort = list(task.get('effort'))[0]
+	return get_repository(task_file).get_effort(task_id)
 
-	return effort
 
+def get_total_effort(task_ids, task_file: Path) -> int:
+	return get_repository(task_file).get_total_effort(task_ids)
 
-def display_list(task_dataframe, start_index: int=0, end_index: int=-1) -> None:
-	task_dataframe = task_dataframe[start_index:end_index]
+
+def get_incomplete(effort: int, task_file: Path) -> pd.DataFrame:
+	return get_repository(task_file).get_incomplete(effort)
+
+
+def display_list(tasks, start_index: int=0, end_index: int=None) -> None:
+	"""
+	Prints a table of tasks.
+
+	:param tasks: Task records, or a DataFrame of tasks.
+	:param start_index: The position of the first task to print.
+	:param end_index: The position after the last task to print. Defaults to the last task.
+	"""
+	tasks = tasks[start_index:end_index]
+	if not isinstance(tasks, list):
+		tasks = tasks_from_dataframe(tasks)
 	print(f"\n{'Task'.ljust(48)}"
 	      f"{'Complete'.ljust(12)}"
 	      f"{'Urgency'.ljust(11)}"
@@ -71,23 +509,49 @@ def display_list(task_dataframe, start_index: int=0, end_index: int=-1) -> None:
 	      f"{'Effort'.ljust(10)}"
 	      f"{'Due Date'.ljust(20)}")
 	print("-" * 114)
-	for index, row in task_dataframe.iterrows():
-		print(f"{row['title'].ljust(48)}"
-		      f"{'Y'.ljust(12) if row['complete'] == "FALSE" else 'N'.ljust(12)}"
-		      f"{str(row['urgency']).ljust(11)}"
-		      f"{str(row['importance']).ljust(14)}"
-		      f"{str(row['effort']).ljust(10)}"
-		      f"{str(row['due_date']).ljust(20) if row['due_date'] == row['due_date'] else '--'.ljust(20)}")
+	for task in tasks:
+		print(f"{task.title.ljust(48)}"
+		      f"{'Y'.ljust(12) if task.complete else 'N'.ljust(12)}"
+		      f"{str(task.urgency).ljust(11)}"
+		      f"{str(task.importance).ljust(14)}"
+		      f"{str(task.effort).ljust(10)}"
+		      f"{str(task.due_date).ljust(20) if task.due_date is not None else '--'.ljust(20)}")
 	print()
 
 
 def display(task_id: uuid, task_file: Path) -> None:
-	task = get_task_by_id(task_id, task_file)
+	task = get_repository(task_file).get_record(task_id)
 	if task is not None:
-		task = list(task.get('title'))[0]
-		print(f"- {task}")
+		print(f"- {task.title}")
 
 
 def rank(task_file: Path):
-	tasks = load(task_file)
-	return rank_tasks(tasks)
+	from prototype.src.rank_tasks import rank_tasks
+	repository = get_repository(task_file)
+	return _rank_cache.get(task_file, "ranked_tasks", lambda: rank_tasks(repository.get_incomplete())).copy()
+
+
+def rank_by_effort(task_file: Path, k: int) -> dict:
+	from prototype.src.rank_tasks import rank_top_k_by_effort
+	repository = get_repository(task_file)
+	ranked_tiers = _rank_cache.get(task_file, f"top_{k}_by_effort", lambda: rank_top_k_by_effort(repository.get_incomplete(), k))
+	return {effort: ranked_tier.copy() for effort, ranked_tier in ranked_tiers.items()}
+
+
+def get_ranked_index(task_file: Path) -> RankedIndex:
+	return get_repository(task_file).ranked_index
+
+
+def peek_ranked_index(task_file: Path) -> RankedIndex:
+	"""Gets the ranked index of a task file only if a valid one is already in memory, without building it."""
+	return _rank_cache.peek(task_file, "ranked_index", expires_daily=False)
+
+
+def keep_ranked_index(task_file: Path, ranked_index: RankedIndex) -> None:
+	"""Keeps a ranked index that was built elsewhere, e.g. in a worker process, for the task file as it is now."""
+	_rank_cache.update(task_file, "ranked_index", ranked_index, expires_daily=False)
+
+
+def rank_by_effort_chunked(task_file: Path, k: int, chunk_size: int = CHUNK_SIZE, columns: list = RANK_COLUMNS) -> dict:
+	from prototype.src.rank_tasks import rank_top_k_by_effort_chunked
+	return rank_top_k_by_effort_chunked(load_chunks(task_file, chunk_size, columns=columns), k)
@@ -4,7 +4,7 @@ Description: Generates random tasks for testing purposes.
 
 Author: Lacie Turner
 Date created: 2025-02-10
-Date last modified: 2025-02-12
+Date last modified: 2026-10-18
 Python Version: 3.12
 """
 
@@ -13,23 +13,112 @@ __maintainer__ = "Lacie Turner"
 __email__ = "tasketai@lacie.dev"
 __credits__ = ["Lacie Turner"]
 __status__ = "Development"
-__version__ = "0.0.2"
+__version__ = "0.0.3"
 
-import csv
-import uuid
 import random
+import argparse
+import numpy as np
+import pandas as pd
 from pathlib import Path
 from datetime import datetime, timedelta
+from prototype.src.storage import FeatherStorage, to_arrow_types
 
-CSV_FILE = Path("../data/generated-test-tasks.csv")
+CSV_FILE = Path(__file__).resolve().parent.parent / "data" / "generated-test-tasks.csv"
 NUM_TASKS = 250
+CHUNK_SIZE = 100_000
 MIN_DUE_DATE = datetime.now() - timedelta(days=5)
 MAX_DUE_DATE = datetime.now() + timedelta(days=35)
 DUE_DATE_PROBABILITY = random.uniform(0.08, 0.16)
+TASK_HEADER = ["id", "complete", "title", "urgency", "importance", "effort", "due_date", "_created", "_modified"]
+UUID_DASHES = [8, 13, 18, 23]  # positions of the dashes in a formatted UUID
+
+
+def generate_uuids(rng: np.random.Generator, num_uuids: int) -> np.ndarray:
+	"""
+	Generates random (version 4) UUID strings without creating a uuid.UUID per task.
+
+	:param rng: The random number generator to use.
+	:param num_uuids: The number of UUIDs to generate.
+	:return: An array of UUID strings.
+	"""
+	uuid_bytes = rng.integers(0, 256, size=(num_uuids, 16), dtype=np.uint8)
+	uuid_bytes[:, 6] = (uuid_bytes[:, 6] & 0x0F) | 0x40  # version 4
+	uuid_bytes[:, 8] = (uuid_bytes[:, 8] & 0x3F) | 0x80  # RFC 4122 variant
+
+	hex_digits = np.frombuffer(b"0123456789abcdef", dtype=np.uint8)
+	hex_chars = np.empty((num_uuids, 32), dtype=np.uint8)
+	hex_chars[:, 0::2] = hex_digits[uuid_bytes >> 4]
+	hex_chars[:, 1::2] = hex_digits[uuid_bytes & 0x0F]
+
+	uuid_chars = np.full((num_uuids, 36), ord("-"), dtype=np.uint8)
+	uuid_chars[:, np.setdiff1d(np.arange(36), UUID_DASHES)] = hex_chars
+
+	return uuid_chars.view("S36").ravel().astype(str)
+
+
+def generate_task_chunk(rng: np.random.Generator, num_tasks: int, start: int = 0,
+                        min_due_date: datetime = MIN_DUE_DATE, max_due_date: datetime = MAX_DUE_DATE,
+                        due_date_probability: float = DUE_DATE_PROBABILITY, completion_ratio: float = 0.0,
+                        urgency_weights=None, importance_weights=None, effort_weights=None) -> pd.DataFrame:
+	"""
+	Generates a chunk of tasks as a DataFrame, one column at a time.
+
+	:param rng: The random number generator to use.
+	:param num_tasks: The number of tasks to generate.
+	:param start: The number of the first task, used in its title.
+	:param min_due_date: The minimum due date to consider.
+	:param max_due_date: The maximum due date to consider.
+	:param due_date_probability: The probability of a task having a due date.
+	:param completion_ratio: The probability of a task being complete.
+	:param urgency_weights: The relative weights of urgency 1 to 5. Uniform if not given.
+	:param importance_weights: The relative weights of importance 1 to 5. Uniform if not given.
+	:param effort_weights: The relative weights of effort 1 to 3. Uniform if not given.
+	:return: The generated tasks, with the same columns and text formats as a task file.
+	"""
+	def choose(num_levels: int, weights) -> np.ndarray:
+		if weights is None:
+			return rng.integers(1, num_levels + 1, size=num_tasks)
+		weights = np.asarray(weights, dtype=float)
+		return rng.choice(np.arange(1, num_levels + 1), size=num_tasks, p=weights / weights.sum())
+
+	# Generate due date based on probability
+	due_date_range = max(1, (max_due_date - min_due_date).days)
+	due_dates = np.datetime64(min_due_date, "us") + rng.integers(0, due_date_range, size=num_tasks).astype("timedelta64[D]")
+	has_due_date = rng.random(num_tasks) < due_date_probability
+
+	now = datetime.now().isoformat()
+	numbers = pd.Series(np.arange(start, start + num_tasks)).astype(str).str.zfill(3)
+
+	return pd.DataFrame({
+		"id": generate_uuids(rng, num_tasks),
+		"complete": np.where(rng.random(num_tasks) < completion_ratio, "TRUE", "FALSE"),
+		"title": ("test task " + numbers).to_numpy(),
+		"urgency": choose(5, urgency_weights),
+		"importance": choose(5, importance_weights),
+		"effort": choose(3, effort_weights),
+		"due_date": np.where(has_due_date, np.datetime_as_string(due_dates, unit="us"), ""),
+		"_created": now,
+		"_modified": now,
+	}, columns=TASK_HEADER)
+
+
+def generate_task_chunks(num_tasks: int, chunk_size: int = CHUNK_SIZE, seed: int = None, **distributions):
+	"""
+	Lazily generates tasks in chunks, so only one chunk is ever held in memory.
+
+	:param num_tasks: The number of tasks to generate.
+	:param chunk_size: The number of tasks per chunk.
+	:param seed: The seed of the random number generator. The same seed always generates the same tasks.
+	:param distributions: Keyword arguments passed on to generate_task_chunk.
+	:return: A generator of DataFrames.
+	"""
+	rng = np.random.default_rng(seed)
+	for start in range(0, num_tasks, chunk_size):
+		yield generate_task_chunk(rng, min(chunk_size, num_tasks - start), start, **distributions)
 
 
 def generate_tasks(num_tasks: int, min_due_date: datetime = MIN_DUE_DATE, max_due_date: datetime = MAX_DUE_DATE,
-                   due_date_probability: float = DUE_DATE_PROBABILITY):
+                   due_date_probability: float = DUE_DATE_PROBABILITY, seed: int = None):
 	"""
 	Generates a list of tasks based on the given parameters.
 
@@ -37,40 +126,82 @@ def generate_tasks(num_tasks: int, min_due_date: datetime = MIN_DUE_DATE, max_du
 	:param min_due_date: The minimum due date to consider.
 	:param max_due_date: The maximum due date to consider.
 	:param due_date_probability: The probability to consider due date.
+	:param seed: The seed of the random number generator, if the tasks should be reproducible.
 	:return: The list of generated tasks.
 	"""
 	tasks = []
-	for num in range(num_tasks):
-		task_id = str(uuid.uuid4())
-		complete = "FALSE"  # random.choice([True, False])
-		title = f"test task {str(num).zfill(3)}"
-		urgency = random.randint(1, 5)
-		importance = random.randint(1, 5)
-		effort = random.randint(1, 3)
-		due_date = ""  # default is no due date
-
-		# Generate due date based on probability
-		if random.random() < due_date_probability:
-			time_between_dates = max_due_date - min_due_date
-			random_number_of_days = random.randrange(time_between_dates.days)
-			due_date = min_due_date + timedelta(days=random_number_of_days)
-			if due_date > max_due_date:  # Ensure it's not after max_due_date
-				due_date = max_due_date.strftime("%Y-%m-%d %H:%M:%S")
-			due_date = due_date.isoformat()
-
-		now = datetime.now().isoformat()
-		tasks.append([task_id, complete, title, urgency, importance, effort, due_date, now, now])
+	for chunk in generate_task_chunks(num_tasks, seed=seed, min_due_date=min_due_date, max_due_date=max_due_date,
+	                                  due_date_probability=due_date_probability):
+		tasks.extend(chunk.values.tolist())
 
 	return tasks
 
 
-def main():
-	tasks = generate_tasks(NUM_TASKS)
-	with open(CSV_FILE, "w", newline="") as csv_file:
-		writer = csv.writer(csv_file)
-		writer.writerow(["id","complete","title","urgency","importance","effort","due_date","_created","_modified"])
-		writer.writerows(tasks)
-	print(f"{NUM_TASKS} tasks generated and saved to {CSV_FILE}")
+def write_csv(chunks, output_file: Path) -> int:
+	"""
+	Streams chunks of tasks to a CSV task file.
+
+	:param chunks: The DataFrames to write.
+	:param output_file: The file to write to.
+	:return: The number of tasks written.
+	"""
+	num_tasks = 0
+	with open(output_file, "w", newline="") as f:
+		f.write(",".join(TASK_HEADER) + "\n")
+		for chunk in chunks:
+			# generated values never contain commas or quotes, so the rows can be joined without a CSV writer
+			columns = [chunk[column].astype(str).tolist() for column in TASK_HEADER]
+			f.write("\n".join(map(",".join, zip(*columns))) + "\n")
+			num_tasks += len(chunk)
+
+	return num_tasks
+
+
+def write_feather(chunks, output_file: Path) -> int:
+	"""
+	Streams chunks of tasks to a Feather (Arrow IPC) file with typed columns. Requires pyarrow.
+
+	:param chunks: The DataFrames to write.
+	:param output_file: The file to write to.
+	:return: The number of tasks written.
+	"""
+	return FeatherStorage(output_file).write(map(to_arrow_types, chunks))
+
+
+def main(argv: list = None):
+	parser = argparse.ArgumentParser(description="Generates random tasks for testing purposes.")
+	parser.add_argument("-n", "--num-tasks", type=int, default=NUM_TASKS, help="number of tasks to generate")
+	parser.add_argument("-o", "--output", type=Path, default=CSV_FILE, help="task file, .csv or .feather/.arrow")
+	parser.add_argument("--seed", type=int, help="seed for reproducible tasks")
+	parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE, help="tasks generated and written at a time")
+	parser.add_argument("--due-date-probability", type=float, help="share of tasks with a due date (8-16%% if unset)")
+	parser.add_argument("--min-due-days", type=int, default=-5, help="earliest due date, in days from today")
+	parser.add_argument("--max-due-days", type=int, default=35, help="latest due date, in days from today")
+	parser.add_argument("--completion-ratio", type=float, default=0.0, help="share of tasks that are complete")
+	parser.add_argument("--urgency-weights", type=float, nargs=5, help="relative weights of urgency 1 to 5")
+	parser.add_argument("--importance-weights", type=float, nargs=5, help="relative weights of importance 1 to 5")
+	parser.add_argument("--effort-weights", type=float, nargs=3, help="relative weights of effort 1 to 3")
+	args = parser.parse_args(argv)
+
+	now = datetime.now()
+	due_date_probability = args.due_date_probability
+	if due_date_probability is None:
+		due_date_probability = np.random.default_rng(args.seed).uniform(0.08, 0.16)
+
+	chunks = generate_task_chunks(args.num_tasks, args.chunk_size, args.seed,
+	                              min_due_date=now + timedelta(days=args.min_due_days),
+	                              max_due_date=now + timedelta(days=args.max_due_days),
+	                              due_date_probability=due_date_probability,
+	                              completion_ratio=args.completion_ratio,
+	                              urgency_weights=args.urgency_weights,
+	                              importance_weights=args.importance_weights,
+	                              effort_weights=args.effort_weights)
+
+	if args.output.suffix in (".feather", ".arrow"):
+		num_tasks = write_feather(chunks, args.output)
+	else:
+		num_tasks = write_csv(chunks, args.output)
+	print(f"{num_tasks} tasks generated and saved to {args.output}")
 
 
 if __name__ == "__main__":
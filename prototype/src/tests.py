@@ -1,35 +1,752 @@
-from prototype.tasketai import merge_task_suggestions
+import io
+import os
+import sys
+import json
+import asyncio
+import tempfile
+import contextlib
+import subprocess
+import multiprocessing
+import urllib.request
+import numpy as np
+from itertools import combinations, count, islice
+import pandas as pd
+from pathlib import Path
+from prototype.tasketai import parse_args, run_command
+import prototype.src.user_data as user_data
+import prototype.src.batch_rank as batch_rank
+from prototype.src.planner import plan
+import prototype.src.task as task
+from prototype.src.user_data import UserDataSession
+from prototype.src.storage import CsvStorage, SqliteStorage, convert, tasks_from_dataframe, tasks_to_dataframe
+from prototype.src.task_gen import generate_tasks, generate_task_chunks, write_csv
+from prototype.src.rank_cache import RankCache
+from prototype.src.service import RankingService
+from prototype.src.batch_rank import find_users, rank_user, rank_users
+from prototype.src.ranked_index import RankedIndex
+from prototype.src.suggestions import interleave, interleave_tiers, suggest_from_index, suggest_from_tiers
+from prototype.src.rank_tasks import rank_tasks, rank_top_k_by_effort, combine_relevance, combine_relevance_vectorized, due_date_multiplier, top_k_positions
+from prototype.src.rank_tasks import preprocess_tasks, rank_task_records, rank_top_k_records_by_effort
 
 
-def test_merge_task_suggestions():
+def test_interleave():
 	list_1 = list(range(20))
 	list_2 = ['a', 'b', 'c', 'd', 'e', 'f', 'g']
-	merged_list = merge_task_suggestions(list_1, list_2)
+	merged_list = list(interleave(list_1, list_2))
 	expected = [0, 1, 2, 3, 'a', 'b', 4, 5, 6, 7, 'c', 'd', 8, 9, 10, 11, 'e', 'f', 12, 13, 14, 15, 'g', 16, 17, 18, 19]
 	assert merged_list == expected, f"Test case 1 failed. Got: {merged_list}, Expected: {expected}"
 
 	list_1 = list(range(5))
 	list_2 = ['a', 'b', 'c', 'd', 'e', 'f', 'g']
-	merged_list = merge_task_suggestions(list_1, list_2)
+	merged_list = list(interleave(list_1, list_2))
 	expected = [0, 1, 2, 3, 'a', 'b', 4, 'c', 'd', 'e', 'f', 'g']
 	assert merged_list == expected, f"Test case 2 failed. Got: {merged_list}, Expected: {expected}"
 
 	list_1 = list(range(10))
 	list_2 = ['a', 'b']
-	merged_list = merge_task_suggestions(list_1, list_2)
+	merged_list = list(interleave(list_1, list_2))
 	expected = [0, 1, 2, 3, 'a', 'b', 4, 5, 6, 7, 8, 9]
 	assert merged_list == expected, f"Test case 3 failed. Got: {merged_list}, Expected: {expected}"
 
 	list_1 = list(range(10))
 	list_2 = ['a', 'b', 'c', 'd', 'e', 'f', 'g']
-	merged_list = merge_task_suggestions(list_1, list_2, chunk_size=3, nth_index=2)
+	merged_list = list(interleave(list_1, list_2, chunk_size=3, nth_index=2))
 	expected = [0, 1, 'a', 'b', 'c', 2, 3, 'd', 'e', 'f', 4, 5, 'g', 6, 7, 8, 9]
 	assert merged_list == expected, f"Test case 3 failed. Got: {merged_list}, Expected: {expected}"
 
 	return True
 
+
+def test_interleave_tiers():
+	list_1 = list(range(12))
+	list_2 = ['a', 'b', 'c', 'd', 'e']
+	list_3 = ['X', 'Y', 'Z']
+	merged_list = list(interleave_tiers(list_1, (list_2, 2, 3), (list_3, 1, 5)))
+	expected = list(interleave(interleave(list_1, list_2, chunk_size=2, nth_index=3), list_3, chunk_size=1, nth_index=5))
+	assert merged_list == expected, f"Test case 1 failed. Got: {merged_list}, Expected: {expected}"
+
+	# only the elements that are asked for are ever read
+	merged_list = list(islice(interleave_tiers(count(), (count(100), 2, 4)), 8))
+	expected = [0, 1, 2, 3, 100, 101, 4, 5]
+	assert merged_list == expected, f"Test case 2 failed. Got: {merged_list}, Expected: {expected}"
+
+	return True
+
+
+def test_combine_relevance_vectorized():
+	urgency = [urgency for urgency in range(1, 6) for _ in range(1, 6)]
+	importance = [importance for _ in range(1, 6) for importance in range(1, 6)]
+	scores = combine_relevance_vectorized(urgency, importance)
+	expected = [combine_relevance(u, i) for u, i in zip(urgency, importance)]
+	assert list(scores) == expected, f"Test case 1 failed. Got: {list(scores)}, Expected: {expected}"
+
+	days_until_due = [np.nan, -10, -1, 0, 1, 6, 7, 30]
+	multipliers = due_date_multiplier(days_until_due)
+	expected = [1.0, 1.5 + (10 * 0.05), 1.5 + (1 * 0.05), 1.5, 1.25, 1.25, 1.0, 1.0]
+	assert list(multipliers) == expected, f"Test case 2 failed. Got: {list(multipliers)}, Expected: {expected}"
+
+	return True
+
+
+def test_top_k_positions():
+	scores = [2.2, 4.8, 3.8, 4.8, 7.0, 2.2, 4.8, 3.8]
+	expected = list(np.argsort(-np.array(scores), kind='stable'))
+	for k in range(len(scores) + 2):
+		positions = list(top_k_positions(scores, k))
+		assert positions == expected[:k], f"Test case {k + 1} failed. Got: {positions}, Expected: {expected[:k]}"
+
+	return True
+
+
+def test_ranked_index():
+	columns = ["id", "complete", "title", "urgency", "importance", "effort", "due_date", "_created", "_modified"]
+	task_dataframe = pd.DataFrame(generate_tasks(200), columns=columns)
+	task_dataframe['complete'] = task_dataframe['complete'] == "TRUE"
+	task_dataframe['due_date'] = task_dataframe['due_date'].where(task_dataframe['due_date'] != "")
+	ranked_index = RankedIndex(task_dataframe)
+	ranked_tasks = rank_tasks(task_dataframe)
+	for effort in range(1, 4):
+		task_ids = ranked_index.top(effort, 200)
+		expected = list(ranked_tasks.loc[ranked_tasks['effort'] == effort, 'id'])
+		assert task_ids == expected, f"Test case {effort} failed. Got: {task_ids}, Expected: {expected}"
+
+	best_task_id = ranked_index.top(1, 1)[0]
+	ranked_index.remove(best_task_id)
+	assert best_task_id not in ranked_index.top(1, 200), "Test case 4 failed. Removed task was still ranked"
+
+	ranked_index.add("new-task", "new task", urgency=5, importance=5, effort=1, due_date=pd.Timestamp.now() - pd.Timedelta(days=30))
+	task_ids = ranked_index.top(1, 1)
+	assert task_ids == ["new-task"], f"Test case 5 failed. Got: {task_ids}, Expected: ['new-task']"
+
+	return True
+
+
+def test_ranked_index_refresh():
+	columns = ["id", "complete", "title", "urgency", "importance", "effort", "due_date", "_created", "_modified"]
+	task_dataframe = pd.DataFrame(generate_tasks(300), columns=columns)
+	task_dataframe['complete'] = task_dataframe['complete'] == "TRUE"
+	start = pd.Timestamp("2026-10-18 09:30")
+	hours = np.random.default_rng(1).integers(-20 * 24, 20 * 24, len(task_dataframe))
+	task_dataframe['due_date'] = (start + pd.to_timedelta(hours, unit="h")).where(hours % 4 != 0)
+	ranked_index = RankedIndex(task_dataframe, now=start)
+	ranked_index.add("new-task", "new task", urgency=5, importance=5, effort=1, due_date=start + pd.Timedelta(days=2))
+
+	# forward by an hour, a day, to the exact time tasks are due, a week, and back in time
+	for num, now in enumerate([start + pd.Timedelta(hours=1), start + pd.Timedelta(days=1), pd.Timestamp("2026-10-20 10:00"),
+	                           start + pd.Timedelta(days=8), start - pd.Timedelta(days=2)], start=1):
+		ranked_index.refresh(now)
+		expected = RankedIndex(task_dataframe, now=now)
+		expected.add("new-task", "new task", urgency=5, importance=5, effort=1, due_date=start + pd.Timedelta(days=2))
+		for effort in range(1, 4):
+			result = ranked_index.top(effort, 300)
+			assert result == expected.top(effort, 300), f"Test case {num} failed. Got: {result}, Expected: {expected.top(effort, 300)}"
+
+	# due dates are on the half hour, so no task changes tier between these two times
+	ranked_index.refresh(start - pd.Timedelta(days=2) + pd.Timedelta(minutes=1))
+	result = ranked_index.refresh(start - pd.Timedelta(days=2) + pd.Timedelta(minutes=20))
+	assert result == 0, f"Test case 6 failed. Got: {result}, Expected: 0"
+
+	return True
+
+
+def test_task_records():
+	with tempfile.TemporaryDirectory() as directory:
+		task_file = Path(directory) / "tasks.csv"
+		write_csv(generate_task_chunks(500, seed=1, completion_ratio=0.2), task_file)
+		task_dataframe = task.load(task_file)
+		tasks = task.load_tasks(task_file)
+
+		# the csv module and pandas read the same tasks, and they convert back to the same DataFrame
+		result = tasks_from_dataframe(task_dataframe)
+		assert result == tasks, f"Test case 1 failed. Got: {result[:2]}, Expected: {tasks[:2]}"
+		result = tasks_to_dataframe(tasks)
+		assert result.equals(task_dataframe), f"Test case 2 failed. Got: {result.head()}, Expected: {task_dataframe.head()}"
+
+		# ranked the same way, and to the same scores, as the DataFrame
+		now = pd.Timestamp.now().to_pydatetime()
+		expected = preprocess_tasks(task_dataframe.copy(), now)
+		result = [(ranked_task.id, score) for ranked_task, score in rank_task_records(tasks, now=now)]
+		expected_ranking = expected.loc[~expected['complete']].sort_values('relevance_score', ascending=False, kind='stable')
+		expected_ranking = list(zip(expected_ranking['id'], expected_ranking['relevance_score']))
+		assert result == expected_ranking, f"Test case 3 failed. Got: {result[:5]}, Expected: {expected_ranking[:5]}"
+		result = rank_task_records(tasks, k=10, now=now)
+		assert [ranked_task.id for ranked_task, _ in result] == [task_id for task_id, _ in expected_ranking[:10]], \
+			f"Test case 4 failed. Got: {result}"
+
+		ranked_tiers = rank_top_k_records_by_effort(tasks, 20, now=now)
+		expected_tiers = rank_top_k_by_effort(task_dataframe, 20)
+		for effort in (1, 2, 3):
+			result = [ranked_task.id for ranked_task, _ in ranked_tiers[effort]]
+			assert result == list(expected_tiers[effort]['id']), f"Test case 5 failed. Got: {result}"
+
+		exclude = {ranked_tiers[1][0][0].id}
+		for velocity in (0, 1, 2, 3):
+			tiers = {effort: [ranked_task.id for ranked_task, _ in ranked_tier] for effort, ranked_tier in ranked_tiers.items()}
+			result = suggest_from_tiers(tiers, velocity, exclude, limit=10)
+			tiers = {effort: ranked_tier['id'].tolist() for effort, ranked_tier in expected_tiers.items()}
+			expected = suggest_from_tiers(tiers, velocity, exclude, limit=10)
+			assert result == expected, f"Test case 6 failed. Got: {result}, Expected: {expected}"
+
+		# the ranked index hands out the same tasks, e.g. for the suggestion menu
+		ranked_index = RankedIndex(task_dataframe, now=now)
+		ranked_index.add("new-task", "new task", urgency=5, importance=5, effort=1, due_date="2026-01-02")
+		task_ids = ranked_index.ranked(5)
+		result = ranked_index.get_task_records(task_ids)
+		expected = ranked_index.get_tasks(task_ids)
+		assert [(ranked_task.id, ranked_task.title, score) for ranked_task, score in result] == \
+			list(zip(expected['id'], expected['title'], expected['relevance_score'])), f"Test case 7 failed. Got: {result}"
+
+	return True
+
+
+def test_suggest():
+	columns = ["id", "complete", "title", "urgency", "importance", "effort", "due_date", "_created", "_modified"]
+	task_dataframe = pd.DataFrame(generate_tasks(100), columns=columns)
+	task_dataframe['complete'] = task_dataframe['complete'] == "TRUE"
+	task_dataframe['due_date'] = task_dataframe['due_date'].where(task_dataframe['due_date'] != "")
+	ranked_tasks = rank_tasks(task_dataframe)
+	ranked_index = RankedIndex(task_dataframe)
+	excluded_task_ids = set(task_dataframe['id'][:10])
+	ranked_tiers = {effort: ranked_tasks.loc[ranked_tasks['effort'] == effort, 'id'].tolist() for effort in range(1, 4)}
+
+	for velocity in range(1, 4):
+		suggested_task_ids = suggest_from_tiers(ranked_tiers, velocity, exclude=excluded_task_ids)
+		tier_task_ids = {effort: ranked_index.top(effort, 100, exclude=excluded_task_ids) for effort in range(1, 4)}
+		if velocity == 1:
+			expected = tier_task_ids[1]
+		elif velocity == 2:
+			expected = list(interleave(tier_task_ids[2], tier_task_ids[1]))
+		else:
+			expected = interleave(tier_task_ids[3], tier_task_ids[2], chunk_size=2, nth_index=3)
+			expected = list(interleave(expected, tier_task_ids[1], chunk_size=1, nth_index=5))
+		assert suggested_task_ids == expected, f"Test case {velocity} failed. Got: {suggested_task_ids}, Expected: {expected}"
+
+		suggested_task_ids = suggest_from_index(ranked_index, velocity, exclude=excluded_task_ids, limit=5)
+		assert suggested_task_ids == expected[:5], f"Test case {velocity} (limit) failed. Got: {suggested_task_ids}, Expected: {expected[:5]}"
+
+	return True
+
+
+def test_plan():
+	candidates = [('a', 1, 4.8), ('b', 1, 2.4), ('c', 2, 7.0), ('d', 2, 3.1), ('e', 3, 9.5), ('f', 3, 6.2)]
+	for velocity in range(0, 7):
+		planned_task_ids = plan(candidates, velocity)
+		best_score = max(sum(score for _, _, score in subset)
+		                 for size in range(len(candidates) + 1) for subset in combinations(candidates, size)
+		                 if sum(effort for _, effort, _ in subset) <= velocity)
+		planned_score = sum(score for task_id, _, score in candidates if task_id in planned_task_ids)
+		planned_effort = sum(effort for task_id, effort, _ in candidates if task_id in planned_task_ids)
+		assert planned_effort <= velocity, f"Test case {velocity + 1} failed. Effort {planned_effort} exceeds velocity {velocity}"
+		assert planned_score == best_score, f"Test case {velocity + 1} failed. Got: {planned_score}, Expected: {best_score}"
+
+	return True
+
+
+def test_rank_by_effort_chunked():
+	with tempfile.TemporaryDirectory() as directory:
+		task_file = Path(directory) / "tasks.csv"
+		write_csv(generate_task_chunks(1000, seed=1, completion_ratio=0.2), task_file)
+		ranked_tiers = task.rank_by_effort_chunked(task_file, 10, chunk_size=64)
+		expected_tiers = rank_top_k_by_effort(task.load(task_file), 10)
+
+	for effort, expected_tier in expected_tiers.items():
+		task_ids = list(ranked_tiers[effort]['id'])
+		expected = list(expected_tier['id'])
+		assert task_ids == expected, f"Test case {effort} failed. Got: {task_ids}, Expected: {expected}"
+
+	return True
+
+
+def test_sqlite_storage():
+	with tempfile.TemporaryDirectory() as directory:
+		csv_file = Path(directory) / "tasks.csv"
+		sqlite_file = Path(directory) / "tasks.sqlite"
+		write_csv(generate_task_chunks(500, seed=1, completion_ratio=0.2), csv_file)
+		convert(csv_file, sqlite_file, chunk_size=64)
+		expected = CsvStorage(csv_file).read()
+		storage = SqliteStorage(sqlite_file)
+
+		result = storage.read()
+		assert result.equals(expected), f"Test case 1 failed. Got: {result.head()}, Expected: {expected.head()}"
+
+		task_ids = list(expected['id'][:5])
+		result = [storage.get_effort(task_id) for task_id in task_ids] + [storage.get_effort("unknown")]
+		expected_efforts = list(expected['effort'][:5]) + [0]
+		assert result == expected_efforts, f"Test case 2 failed. Got: {result}, Expected: {expected_efforts}"
+
+		result = storage.get_total_effort(task_ids + ["unknown"])
+		assert result == sum(expected_efforts), f"Test case 3 failed. Got: {result}, Expected: {sum(expected_efforts)}"
+
+		result = list(storage.read_incomplete(2)['id'])
+		expected_ids = list(expected.loc[~expected['complete'] & (expected['effort'] == 2), 'id'])
+		assert result == expected_ids, f"Test case 4 failed. Got: {result}, Expected: {expected_ids}"
+
+		# the ranked index is built from the incomplete tasks only, and ties across tiers keep the file order
+		ranked_index = task.get_ranked_index(sqlite_file)
+		result = ranked_index.ranked()
+		expected_ids = RankedIndex(expected, now=ranked_index._scored_at).ranked()
+		assert result == expected_ids, f"Test case 4 (ranked index) failed. Got: {result[:5]}, Expected: {expected_ids[:5]}"
+		task.close_repository(sqlite_file)
+
+		storage.append([["new", "FALSE", "new task", 5, 5, 1, "", "", ""]])
+		result = storage.get("new")
+		assert result['title'].tolist() == ["new task"], f"Test case 5 failed. Got: {result}, Expected: new task"
+
+		storage.update("new", ["new", "TRUE", "renamed task", 1, 2, 3, "2026-01-02T00:00:00", "", ""])
+		result = storage.read_row("new")
+		expected_row = ["new", "TRUE", "renamed task", 1, 2, 3, "2026-01-02T00:00:00", "", ""]
+		assert result == expected_row, f"Test case 6 failed. Got: {result}, Expected: {expected_row}"
+		storage.close()
+
+	return True
+
+
+def test_user_data_session():
+	schema_file = Path(__file__).resolve().parent.parent / "data" / "__user-data-schema.json"
+	with tempfile.TemporaryDirectory() as directory:
+		data_file = Path(directory) / "user-data.json"
+		session = UserDataSession(data_file, Path(directory) / "tasks.csv", schema_file, compact_threshold=1024)
+		assert data_file.exists(), "Test case 0 failed. Got: no snapshot, Expected: one written on first login"
+		snapshot = data_file.stat().st_mtime_ns
+		session.set_daily_attr("velocity", 3)
+		session.add_task("selected", "a")
+		session.add_task("selected", "b")
+		session.del_task("selected", "a")
+		session.flush()
+
+		assert data_file.stat().st_mtime_ns == snapshot and session.log_file.exists(), \
+			"Test case 1 failed. Got: a rewritten snapshot, Expected: the changes in the event log"
+		result = UserDataSession(data_file, Path(directory) / "tasks.csv", schema_file).data
+		expected = {**session.data, "last_login": result["last_login"]}  # re-opening logs in again
+		assert result == expected, f"Test case 2 failed. Got: {result}, Expected: {expected}"
+
+		for num in range(50):
+			session.add_task("suggested", f"task {num}")
+			session.flush()
+		assert data_file.exists(), "Test case 3 failed. Got: no snapshot, Expected: a compacted snapshot"
+		assert session.log_file.stat().st_size < 1024, f"Test case 4 failed. Got: {session.log_file.stat().st_size} bytes"
+		result = UserDataSession(data_file, Path(directory) / "tasks.csv", schema_file).data
+		expected = {**session.data, "last_login": result["last_login"]}  # re-opening logs in again
+		assert result == expected, f"Test case 5 failed. Got: {result}, Expected: {expected}"
+
+	return True
+
+
+def test_rank_cache():
+	builds = []
+
+	def build():
+		builds.append(1)
+		return RankedIndex(task.load(task_file))
+
+	with tempfile.TemporaryDirectory() as directory:
+		task_file = Path(directory) / "tasks.csv"
+		other_file = Path(directory) / "other.csv"
+		write_csv(generate_task_chunks(200, seed=1), task_file)
+		write_csv(generate_task_chunks(200, seed=2), other_file)
+		cache = RankCache(Path(directory) / "cache", max_entries=1)
+
+		expected = cache.get(task_file, "ranked_index", build).top(2, 10)
+		cache.get(task_file, "ranked_index", build)
+		os.utime(task_file, ns=(0, 0))  # touched, but not changed
+		cache.get(task_file, "ranked_index", build)
+		assert len(builds) == 1, f"Test case 1 failed. Got: {len(builds)} builds, Expected: 1"
+
+		result = RankCache(Path(directory) / "cache").get(task_file, "ranked_index", build).top(2, 10)
+		assert len(builds) == 1, f"Test case 2 failed. Got: {len(builds)} builds, Expected: 1"
+		assert result == expected, f"Test case 3 failed. Got: {result}, Expected: {expected}"
+
+		cache.get(other_file, "ranked_index", lambda: None)  # evicts task_file, as only one entry is kept
+		assert cache.peek(task_file, "ranked_index") is None, "Test case 4 failed. Got: a result, Expected: None"
+
+		task.add("new task", 5, 5, 2, task_file)
+		cache.get(task_file, "ranked_index", build)
+		assert len(builds) == 2, f"Test case 5 failed. Got: {len(builds)} builds, Expected: 2"
+
+	return True
+
+
+def test_lazy_imports():
+	# in a fresh interpreter, as this one has long imported pandas
+	code = ("import sys, prototype.src.task, prototype.src.user_data, prototype.tasketai; "
+	        "print(sorted(name for name in ('pandas.core', 'numpy.core', 'inquirer.prompt') if name in sys.modules))")
+	root = Path(__file__).resolve().parent.parent.parent
+	result = subprocess.run([sys.executable, "-c", code], cwd=root, capture_output=True, text=True, check=True).stdout.strip()
+	assert result == "[]", f"Test case 1 failed. Got: {result}, Expected: []"
+
+	return True
+
+
+def test_run_command():
+	schema_file = Path(__file__).resolve().parent.parent / "data" / "__user-data-schema.json"
+	with tempfile.TemporaryDirectory() as directory:
+		task_file = Path(directory) / "tasks.csv"
+		write_csv(generate_task_chunks(100, seed=1), task_file)
+		user_data.open_session(Path(directory) / "user-data.json", task_file, schema_file)
+
+		result = run_command("add", tasks=[{"title": "a, b", "urgency": 5, "importance": 5, "effort": 1},
+		                                   {"title": "", "urgency": 5, "importance": 5, "effort": 1}])
+		assert len(result["added"]) == 1, f"Test case 1 failed. Got: {result}, Expected: 1 task added"
+		assert [error["position"] for error in result["errors"]] == [1], f"Test case 2 failed. Got: {result}"
+
+		expected = list(task.rank(task_file)['id'][:5])
+		result = [ranked_task['id'] for ranked_task in run_command("rank", top=5)]
+		assert result == expected, f"Test case 3 failed. Got: {result}, Expected: {expected}"
+
+		task_id = run_command("suggest", velocity=1, limit=1)[0]['id']
+		result = run_command("select", ids=[task_id, "unknown"])
+		assert result == {"selected": [task_id], "unknown": ["unknown"]}, f"Test case 4 failed. Got: {result}"
+		result = [suggested_task['id'] for suggested_task in run_command("suggest", velocity=1, limit=5)]
+		assert task_id not in result, f"Test case 5 failed. Got: {result}, Expected: {task_id} left out"
+
+		# options read from JSON may be strings, and bad ones fail only their own request
+		result = run_command("suggest", velocity="1", limit="5")
+		expected = run_command("suggest", velocity=1, limit=5)
+		assert result == expected and result, f"Test case 6 failed. Got: {result}, Expected: {expected}"
+		for options in ({"top": "x"}, {"top": True}, {"top": 2.5}, {"top": -1}):
+			try:
+				run_command("rank", **options)
+			except ValueError:
+				continue
+			assert False, f"Test case 7 failed. Got: no error for {options}, Expected: a ValueError"
+
+	# --json works before and after the command
+	for argv in (["--json", "rank"], ["rank", "--json"], ["rank"]):
+		result = parse_args(argv).json
+		assert result == ("--json" in argv), f"Test case 8 failed. Got: {result} for {argv}"
+
+	return True
+
+
+def test_import_tasks():
+	with tempfile.TemporaryDirectory() as directory:
+		task_file = Path(directory) / "tasks.csv"
+		write_csv(generate_task_chunks(100, seed=1), task_file)
+		existing = task.load(task_file)
+		ranked_index = task.get_ranked_index(task_file)
+
+		new_tasks = [{"title": "Water the plants", "urgency": 3, "importance": 4, "effort": 1, "due_date": "2026-01-02"},
+		             {"title": " water the PLANTS ", "urgency": 3, "importance": 4, "effort": 1},
+		             {"title": existing['title'][0], "urgency": 3, "importance": 4, "effort": 1},
+		             {"id": existing['id'][1], "title": "Reused ID", "urgency": 3, "importance": 4, "effort": 1},
+		             {"title": "Too urgent", "urgency": 6, "importance": 4, "effort": 1},
+		             {"title": "Bad due date", "urgency": 3, "importance": 4, "effort": 1, "due_date": "soon"},
+		             "not a task",
+		             {"id": "migrated-1", "title": "Migrated", "urgency": "2", "importance": 5.0, "effort": 3}]
+		result = task.import_tasks(new_tasks, task_file)
+		assert result["added"][1:] == ["migrated-1"], f"Test case 1 failed. Got: {result['added']}"
+		result = [error["position"] for error in result["errors"]]
+		assert result == [1, 2, 3, 4, 5, 6], f"Test case 2 failed. Got: {result}, Expected: [1, 2, 3, 4, 5, 6]"
+
+		# the cached index was updated along with the file, and ranks them the same as a fresh one
+		assert task.get_ranked_index(task_file) is ranked_index, "Test case 3 failed. Got: a rebuilt index"
+		expected = RankedIndex(task.load(task_file), now=ranked_index._scored_at)
+		for effort in (1, 2, 3):
+			result = ranked_index.top(effort, 20)
+			assert result == expected.top(effort, 20), f"Test case 4 failed. Got: {result}, Expected: {expected.top(effort, 20)}"
+
+		# dates with and without a time zone in one batch, and values JSON would let through
+		new_tasks = [{"title": "Local", "urgency": 3, "importance": 4, "effort": 1, "due_date": "2026-01-02T09:00:00"},
+		             {"title": "Offset", "urgency": 3, "importance": 4, "effort": 1, "due_date": "2026-01-02T09:00:00+02:00"},
+		             {"id": "", "title": "Empty ID", "urgency": 3, "importance": 4, "effort": 1},
+		             {"title": "Boolean urgency", "urgency": True, "importance": 4, "effort": 1}]
+		result = task.import_tasks(new_tasks, task_file)
+		errors = [(error["position"], error["error"]) for error in result["errors"]]
+		expected = [(2, "ID must be a non-empty string"), (3, "Urgency must be between 1 and 5")]
+		assert errors == expected, f"Test case 5 failed. Got: {errors}, Expected: {expected}"
+		result = [task.get_repository(task_file).get_record(task_id).due_date for task_id in result["added"]]
+		offset = pd.Timestamp("2026-01-02T09:00:00+02:00").to_pydatetime().astimezone().replace(tzinfo=None)
+		expected = [pd.Timestamp("2026-01-02T09:00:00").to_pydatetime(), offset]
+		assert result == expected, f"Test case 6 failed. Got: {result}, Expected: {expected}"
+
+	return True
+
+
+def test_update_task():
+	with tempfile.TemporaryDirectory() as directory:
+		task_file = Path(directory) / "tasks.csv"
+		write_csv(generate_task_chunks(200, seed=1), task_file)
+		ranked_index = task.get_ranked_index(task_file)
+		task_ids = list(task.get_repository(task_file).records)
+
+		result = task.update(task_ids[0], task_file, title='Quoted "title", with a\nline break', due_date="2026-01-02")
+		assert result.due_date == pd.Timestamp("2026-01-02").to_pydatetime(), f"Test case 1 failed. Got: {result.due_date}"
+		task.complete(task_ids[1], task_file)
+		task.update(task_ids[2], task_file, urgency=5, importance=5)
+
+		# the old rows are blanked out, so every reader sees each task once, with its new fields
+		tasks = task.load(task_file)
+		assert len(tasks) == 200 and not tasks['id'].duplicated().any(), f"Test case 2 failed. Got: {len(tasks)} rows"
+		result = CsvStorage(task_file).read_records()
+		assert result[task_ids[0]].title == 'Quoted "title", with a\nline break', f"Test case 3 failed. Got: {result[task_ids[0]]}"
+		assert result[task_ids[1]].complete and result[task_ids[1]] == task.get_repository(task_file).get_record(task_ids[1]), \
+			f"Test case 4 failed. Got: {result[task_ids[1]]}"
+		result = tasks.set_index('id').loc[task_ids[2], ['urgency', 'importance']].tolist()
+		assert result == [5, 5], f"Test case 5 failed. Got: {result}, Expected: [5, 5]"
+
+		# the cached index was updated along with the file, and ranks the tasks the same as a fresh one
+		expected = RankedIndex(tasks, now=ranked_index._scored_at)
+		assert task_ids[1] not in ranked_index, "Test case 6 failed. Got: a completed task in the index"
+		for effort in (1, 2, 3):
+			result = ranked_index.top(effort, 20)
+			assert result == expected.top(effort, 20), f"Test case 7 failed. Got: {result}, Expected: {expected.top(effort, 20)}"
+
+		# compacting drops the blanked out rows, and updates keep finding the moved rows afterwards
+		size = task_file.stat().st_size
+		task_file.chmod(0o640)
+		task.get_repository(task_file).storage.compact()
+		assert task_file.stat().st_size < size, f"Test case 8 failed. Got: {task_file.stat().st_size}, Expected: < {size}"
+		result = oct(task_file.stat().st_mode & 0o777)
+		assert result == oct(0o640), f"Test case 8 failed. Got: {result}, Expected: {oct(0o640)}"
+		result = task.update(task_ids[0], task_file, effort=1, due_date=None)
+		assert result.effort == 1 and result.due_date is None, f"Test case 9 failed. Got: {result}"
+		result = CsvStorage(task_file).read_records()
+		assert len(result) == 200 and result[task_ids[0]] == task.get_repository(task_file).get_record(task_ids[0]), \
+			f"Test case 10 failed. Got: {len(result)} tasks"
+
+		for changes in ({"effort": 4}, {"due_date": "soon"}, {"id": "new"}):
+			try:
+				task.update(task_ids[0], task_file, **changes)
+				assert False, f"Test case 11 failed. Got: no error for {changes}"
+			except ValueError:
+				pass
+		try:
+			task.update("unknown", task_file, urgency=1)
+			assert False, "Test case 12 failed. Got: no error for an unknown task"
+		except KeyError:
+			pass
+		task.close_repository(task_file)
+
+		# SQLite updates the row where it is, so the records and the cached index keep the order of a fresh load
+		sqlite_file = Path(directory) / "tasks.sqlite"
+		convert(task_file, sqlite_file)
+		sqlite_ids = list(task.get_repository(sqlite_file).records)
+		task.get_ranked_index(sqlite_file)
+		task.update(sqlite_ids[0], sqlite_file, urgency=5, importance=5)
+		task.update(task_ids[1], sqlite_file, complete=False)  # completed in the CSV file above
+		ranked_index = task.get_ranked_index(sqlite_file)
+		result = list(task.get_repository(sqlite_file).records), ranked_index.ranked()
+		task.close_repository(sqlite_file)
+		expected = (list(task.get_repository(sqlite_file).records),
+		            RankedIndex(task.load(sqlite_file), now=ranked_index._scored_at).ranked())
+		assert result == expected, f"Test case 13 failed. Got: {result[1][:5]}, Expected: {expected[1][:5]}"
+		task.close_repository(sqlite_file)
+
+	return True
+
+
+def test_read_page():
+	with tempfile.TemporaryDirectory() as directory:
+		task_file = Path(directory) / "tasks.csv"
+		write_csv(generate_task_chunks(1000, seed=1), task_file)
+		sqlite_file = Path(directory) / "tasks.sqlite"
+		convert(task_file, sqlite_file)
+		task.update(task.load_tasks(task_file)[3].id, task_file, title="Moved to the end")  # leaves a blank row behind
+		tasks = task.load_tasks(task_file)
+
+		# forward, far ahead, back, and past the end, e.g. from the backlog viewer
+		for num, (start, count) in enumerate([(0, 21), (20, 21), (700, 21), (256, 300), (240, 21), (990, 21), (1000, 21)],
+		                                     start=1):
+			result = task.read_page(task_file, start, count)
+			assert result == tasks[start:start + count], f"Test case {num} failed. Got: {[t.id for t in result]}"
+
+		expected = task.load_tasks(sqlite_file)
+		result = task.read_page(sqlite_file, 500, 21) + task.read_page(sqlite_file, 995, 21)
+		assert result == expected[500:521] + expected[995:], f"Test case 8 failed. Got: {[t.id for t in result]}"
+		task.close_repository(sqlite_file)
+
+		# the last task of a page is printed, too
+		with contextlib.redirect_stdout(io.StringIO()) as output:
+			task.display_list(task.read_page(task_file, 997, 21))
+		result = output.getvalue()
+		assert "Moved to the end" in result and len(result.strip().splitlines()) == 5, f"Test case 9 failed. Got: {result}"
+		task.close_repository(task_file)
+
+	return True
+
+
+def test_ranking_service():
+	schema_file = Path(__file__).resolve().parent.parent / "data" / "__user-data-schema.json"
+
+	def request(port, method, path, body=None):
+		data = None if body is None else json.dumps(body).encode()
+		http_request = urllib.request.Request(f"http://127.0.0.1:{port}{path}", data=data, method=method)
+		try:
+			with urllib.request.urlopen(http_request) as response:
+				return response.status, json.loads(response.read())
+		except urllib.error.HTTPError as err:
+			return err.code, json.loads(err.read())
+
+	async def scenario(service, port):
+		# the requests run in threads, so the service keeps answering them on this event loop
+		new_tasks = {"tasks": [{"title": "a", "urgency": 5, "importance": 5, "effort": 1},
+		                       {"title": "b", "urgency": 1, "importance": 1, "effort": 1}]}
+		added = (await asyncio.to_thread(request, port, "POST", "/users/ada/tasks", new_tasks))[1]["result"]["added"]
+		ranks = await asyncio.gather(*[asyncio.to_thread(request, port, "GET", f"/users/{name}/rank?top=5")
+		                               for name in ("ada", "bob", "ada")])
+		selected = await asyncio.to_thread(request, port, "POST", "/users/ada/select", {"ids": [added[0]]})
+		suggested = await asyncio.to_thread(request, port, "GET", "/users/ada/suggest?velocity=1")
+		errors = [(await asyncio.to_thread(request, port, method, path))[0]
+		          for method, path in (("GET", "/users/carl/rank"), ("GET", "/users/a.b/rank"),
+		                               ("GET", "/users/ada/rank?top=x"), ("DELETE", "/users/ada/rank"))]
+		reader, writer = await asyncio.open_connection("127.0.0.1", port)
+		writer.write(b"POST /users/ada/tasks HTTP/1.1\r\nContent-Length: -1\r\n\r\n")
+		errors.append(int((await reader.readline()).split()[1]))
+		writer.close()
+		return added, ranks, selected, suggested, errors
+
+	with tempfile.TemporaryDirectory() as directory:
+		write_csv(generate_task_chunks(300, seed=1), Path(directory) / "bob-tasks.csv")
+		service = RankingService(directory, workers=1, schema_file=schema_file)
+
+		async def run():
+			server = await service.start(port=0)
+			try:
+				return await scenario(service, server.sockets[0].getsockname()[1])
+			finally:
+				server.close()
+				service.close()
+
+		added, ranks, selected, suggested, errors = asyncio.run(run())
+		result = [ranked_task['id'] for ranked_task in ranks[0][1]["result"]]
+		assert result == added, f"Test case 1 failed. Got: {result}, Expected: {added}"
+		expected = list(task.rank(Path(directory) / "bob-tasks.csv")['id'][:5])
+		result = [ranked_task['id'] for ranked_task in ranks[1][1]["result"]]
+		assert result == expected, f"Test case 2 failed. Got: {result}, Expected: {expected}"
+		assert selected[1]["result"]["selected"] == added[:1], f"Test case 3 failed. Got: {selected}"
+		result = [suggested_task['id'] for suggested_task in suggested[1]["result"]]
+		assert result == added[1:], f"Test case 4 failed. Got: {result}, Expected: {added[1:]}"
+		expected = [404, 400, 400, 405, 400]
+		assert errors == expected, f"Test case 5 failed. Got: {errors}, Expected: {expected}"
+		result = UserDataSession(Path(directory) / "ada.json", Path(directory) / "ada-tasks.csv", schema_file)
+		assert result.get_attr('selected_tasks') == added[:1], f"Test case 6 failed. Got: {result.get_attr('selected_tasks')}"
+
+	return True
+
+
+def test_concurrent_writers():
+	schema_file = Path(__file__).resolve().parent.parent / "data" / "__user-data-schema.json"
+	num_workers, num_writes = 4, 25
+
+	def write(worker):
+		session = UserDataSession(data_file, task_file, schema_file, compact_threshold=512)
+		repository = task.TaskRepository(task_file)
+		for num in range(num_writes):
+			session.add_task("selected", f"{worker}-{num}")
+			session.flush()
+			repository.add(f"task {worker}-{num}", 3, 3, 2)
+
+	with tempfile.TemporaryDirectory() as directory:
+		data_file = Path(directory) / "user-data.json"
+		task_file = Path(directory) / "tasks.csv"
+		write_csv(generate_task_chunks(10, seed=1), task_file)
+		workers = [multiprocessing.get_context("fork").Process(target=write, args=(worker,)) for worker in range(num_workers)]
+		for worker in workers:
+			worker.start()
+		for worker in workers:
+			worker.join()
+
+		result = sorted(UserDataSession(data_file, task_file, schema_file).get_attr('selected_tasks'))
+		expected = sorted(f"{worker}-{num}" for worker in range(num_workers) for num in range(num_writes))
+		assert result == expected, f"Test case 1 failed. Got: {len(result)} tasks, Expected: {len(expected)}"
+		result = len(task.load(task_file))
+		assert result == 10 + len(expected), f"Test case 2 failed. Got: {result}, Expected: {10 + len(expected)}"
+
+	return True
+
+
+def test_rank_users():
+	schema_file = Path(__file__).resolve().parent.parent / "data" / "__user-data-schema.json"
+	with tempfile.TemporaryDirectory() as directory:
+		users_dir = Path(directory) / "users"
+		users_dir.mkdir()
+		for num in range(3):
+			write_csv(generate_task_chunks(300, seed=num, completion_ratio=0.1), users_dir / f"user{num}-tasks.csv")
+		(users_dir / "broken-tasks.csv").write_text("not,a,task,file\n")
+		selected_task = task.rank(users_dir / "user1-tasks.csv")['id'][0]
+		session = UserDataSession(users_dir / "user1.json", users_dir / "user1-tasks.csv", schema_file)
+		session.add_task("selected", selected_task)
+		session.flush()
+
+		output_file = Path(directory) / "suggestions.ndjson"
+		stats = rank_users(find_users(users_dir), output_file, top=5, workers=2, schema_file=schema_file)
+		assert (stats["users"], stats["errors"]) == (4, 1), f"Test case 1 failed. Got: {stats}, Expected: 4 users, 1 error"
+		results = {result["user"]: result for result in map(json.loads, output_file.read_text().splitlines())}
+		assert "error" in results["broken"], f"Test case 2 failed. Got: {results['broken']}, Expected: an error"
+
+		for num in range(3):
+			ranked_index = RankedIndex(task.load(users_dir / f"user{num}-tasks.csv"))
+			exclude = {selected_task} if num == 1 else set()
+			for velocity in (1, 2, 3):
+				result = results[f"user{num}"]["suggestions"][str(velocity)]
+				expected = suggest_from_index(ranked_index, velocity, exclude=exclude, limit=5)
+				assert result == expected, f"Test case 3 failed. Got: {result}, Expected: {expected}"
+
+		# a user whose changes have not been compacted yet only has an event log
+		selected_task = results["user0"]["suggestions"]["1"][0]
+		session = UserDataSession(users_dir / "user0.json", users_dir / "user0-tasks.csv", schema_file)
+		session.add_task("selected", selected_task)
+		session.flush()
+		(users_dir / "user0.json").unlink()
+		user = {"user": "user0", "data_file": str(users_dir / "user0.json"), "task_file": str(users_dir / "user0-tasks.csv")}
+		result = rank_user(user, top=5, schema_file=schema_file)["suggestions"][1]
+		assert selected_task not in result, f"Test case 4 failed. Got: {result}, Expected: {selected_task} left out"
+
+		# a backlog past RECORDS_MAX_TASKS is ranked as a DataFrame instead, to the same suggestions
+		user = {"user": "user2", "data_file": None, "task_file": str(users_dir / "user2-tasks.csv")}
+		expected = rank_user(user, top=5, schema_file=schema_file)
+		max_tasks, batch_rank.RECORDS_MAX_TASKS = batch_rank.RECORDS_MAX_TASKS, 100
+		try:
+			result = rank_user(user, top=5, schema_file=schema_file)
+		finally:
+			batch_rank.RECORDS_MAX_TASKS = max_tasks
+		assert result == expected, f"Test case 5 failed. Got: {result}, Expected: {expected}"
+
+	return True
+
+
 try:
-	test_merge_task_suggestions()
-	print("merge_task_suggestions() tests passed")
+	test_interleave()
+	print("interleave() tests passed")
+	test_interleave_tiers()
+	print("interleave_tiers() tests passed")
+	test_combine_relevance_vectorized()
+	print("combine_relevance_vectorized() tests passed")
+	test_top_k_positions()
+	print("top_k_positions() tests passed")
+	test_ranked_index()
+	print("RankedIndex tests passed")
+	test_ranked_index_refresh()
+	print("RankedIndex.refresh() tests passed")
+	test_task_records()
+	print("Task record tests passed")
+	test_suggest()
+	print("suggest() tests passed")
+	test_plan()
+	print("plan() tests passed")
+	test_rank_by_effort_chunked()
+	print("rank_by_effort_chunked() tests passed")
+	test_sqlite_storage()
+	print("SqliteStorage tests passed")
+	test_user_data_session()
+	print("UserDataSession tests passed")
+	test_rank_cache()
+	print("RankCache tests passed")
+	test_lazy_imports()
+	print("lazy import tests passed")
+	test_run_command()
+	print("run_command() tests passed")
+	test_import_tasks()
+	print("import_tasks() tests passed")
+	test_update_task()
+	print("update() tests passed")
+	test_read_page()
+	print("read_page() tests passed")
+	test_ranking_service()
+	print("RankingService tests passed")
+	test_concurrent_writers()
+	print("concurrent writer tests passed")
+	test_rank_users()
+	print("rank_users() tests passed")
 except AssertionError as err:
 	print(err)
@@ -4,7 +4,7 @@ Description: Handles user data.
 
 Author: Lacie Turner
 Date created: 2025-02-12
-Date last modified: 2025-02-13
+Date last modified: 2026-10-18
 Python Version: 3.12
 """
 
@@ -16,38 +16,351 @@ __status__ = "Development"
 __version__ = "0.0.1"
 
 import json
+import sqlite3
 import datetime as dt
 import prototype.src.task as task
 from pathlib import Path
+from prototype.src.file_lock import locked
+from prototype.src.storage import SQLITE_SUFFIXES, replace_file
 
 USER_DATA_FILE = Path("./data/user-data.json").resolve()
 USER_TASK_FILE = Path("./data/user-tasks.csv").resolve()
 USER_DATA_SCHEMA_FILE = Path("./data/__user-data-schema.json").resolve()
+RANK_CACHE_DIR = Path("./data/.rank-cache").resolve()
+TASK_LISTS = ["completed", "suggested", "rejected", "selected"]
+DAILY_ATTRIBUTES = ['velocity', 'selected_tasks', 'completed_tasks', 'suggested_tasks', 'rejected_tasks']
+USER_DATA_SQLITE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS profile (attribute TEXT PRIMARY KEY, value TEXT);
+CREATE TABLE IF NOT EXISTS velocity (date TEXT PRIMARY KEY, velocity INTEGER);
+CREATE TABLE IF NOT EXISTS history (
+	date TEXT NOT NULL,
+	list_type TEXT NOT NULL,
+	task_id TEXT NOT NULL,
+	PRIMARY KEY (date, list_type, task_id)
+);
+"""
+COMPACT_THRESHOLD = 64 * 1024  # bytes of event log before it is folded into the snapshot
 
 
-def load() -> dict:
+def apply_event(data: dict, event: dict) -> bool:
 	"""
-	Loads the user's data from a JSON file.
+	Applies a single change to the user's data.
 
-	:return: The loaded user's data.
+	:param data: The user's data, changed in place.
+	:param event: The change, as recorded by a UserDataSession.
+	:return: Whether the data changed.
+	"""
+	op = event["op"]
+	if op == "set":
+		if data.get(event["attribute"]) == event["value"]:
+			return False
+		data[event["attribute"]] = event["value"]
+	elif op == "set_daily":
+		if data[event["attribute"]].get(event["date"]) == event["value"]:
+			return False
+		data[event["attribute"]][event["date"]] = event["value"]
+	elif op == "add":
+		tasks = data[f"{event['list']}_tasks"].setdefault(event["date"], [])
+		if event["task_id"] in tasks:
+			return False
+		tasks.append(event["task_id"])
+	elif op == "del":
+		tasks = data[f"{event['list']}_tasks"].get(event["date"], [])
+		if event["task_id"] not in tasks:
+			return False
+		tasks.remove(event["task_id"])
+	else:
+		raise ValueError(f"Unknown user data event: {op}")
+
+	return True
+
+
+class UserDataSession:
+	"""
+	Keeps the user's data in memory for the length of a session.
+
+	The data file is a snapshot, and every change after it is appended to an event log next to it, one JSON line per
+	change, so saving never rewrites the whole file. Opening a session reads the snapshot and replays the log. Once the
+	log grows past compact_threshold bytes, it is folded back into the snapshot, written to a temporary file that is
+	then renamed over the data file.
+
+	Several processes can share the same data file, e.g. a batch job beside the interactive program. The files are
+	locked while they are read or written, and every flush first applies the changes other processes have flushed
+	since, so no process overwrites another's changes.
 	"""
-	if not USER_DATA_FILE.exists():
-		# print(f"[DEBUG] No user data file found")
-		USER_DATA_FILE.touch()
 
-	if USER_DATA_FILE.stat().st_size == 0:
-		_data = json.loads(USER_DATA_SCHEMA_FILE.read_text(encoding="UTF-8")) # load schema
-		USER_DATA_FILE.write_text(json.dumps(_data))
-		# print(f"[DEBUG] User data file generated at {USER_DATA_FILE}")
+	def __init__(self, data_file: Path = USER_DATA_FILE, task_file: Path = USER_TASK_FILE,
+	             schema_file: Path = USER_DATA_SCHEMA_FILE, compact_threshold: int = COMPACT_THRESHOLD,
+	             login: bool = True):
+		self.data_file = Path(data_file)
+		self.log_file = self.data_file.with_suffix(".log")
+		self.task_file = Path(task_file)
+		self.schema_file = Path(schema_file)
+		self.compact_threshold = compact_threshold
+		self.dirty = False
+		self._events = []
+		self.data = self._read()
+
+		if login:  # otherwise the session only reads the user's data, e.g. for a batch job
+			self.set_attr("last_login", dt.datetime.now().isoformat())
+			self.set_attr("task_csv", str(self.task_file))
+			self.flush()
+
+	def _snapshot_id(self):
+		"""Identifies the current snapshot, which is replaced by a new file every time it is compacted."""
+		if not self.data_file.exists():
+			return None
+		stat = self.data_file.stat()
+		return stat.st_ino, stat.st_mtime_ns, stat.st_size
+
+	def _replay(self, data: dict) -> None:
+		"""Applies the events appended to the log since it was last read, and remembers how far it has been read."""
+		content = b""
+		if self.log_file.exists():
+			with open(self.log_file, "rb") as f:
+				f.seek(self._log_offset)
+				content = f.read()
+		for line in content.splitlines():
+			try:
+				event = json.loads(line)
+			except json.JSONDecodeError:
+				continue  # an event cut off by a crash
+			apply_event(data, event)
+		self._log_offset += len(content)
+		self._log_ends_line = content.endswith(b"\n") if content else self._log_ends_line
+
+	def _read(self) -> dict:
+		with locked(self.data_file, shared=True):
+			self._snapshot = self._snapshot_id()
+			if self._snapshot is None or self.data_file.stat().st_size == 0:
+				# print(f"[DEBUG] No user data file found")
+				data = json.loads(self.schema_file.read_text(encoding="UTF-8"))  # load schema
+			else:
+				data = json.loads(self.data_file.read_text(encoding="UTF-8"))
+
+			self._log_offset = 0
+			self._log_ends_line = True
+			self._replay(data)
+
+		return data
+
+	def _catch_up(self) -> None:
+		"""
+		Applies the changes other processes have flushed since this session last read the files. The pending changes
+		are applied again after them, in the order they are about to be written to the log. Must be called while the
+		data file is locked.
+		"""
+		if self._snapshot_id() != self._snapshot:
+			self.data = self._read()  # compacted by another process, which also emptied the log
+		else:
+			self._replay(self.data)
+		for event in self._events:
+			apply_event(self.data, event)
+
+	def _record(self, event: dict) -> None:
+		"""Applies a change to the in-memory data and queues it for the next flush, if it changes anything."""
+		if apply_event(self.data, event):
+			self._events.append(event)
+			self.dirty = True
+
+	def flush(self) -> bool:
+		"""
+		Appends the user's changes to the event log, compacting it if it has grown past the threshold.
+
+		:return: Whether anything was written.
+		"""
+		if not self.dirty:
+			return False
+
+		with locked(self.data_file):
+			self._catch_up()
+			# a line cut off by a crash would otherwise swallow the first of our events
+			content = "" if self._log_ends_line else "\n"
+			content += "".join(json.dumps(event) + "\n" for event in self._events)
+			with open(self.log_file, "a", encoding="UTF-8") as f:
+				f.write(content)
+			self._log_offset += len(content.encode("UTF-8"))
+			self._log_ends_line = True
+			self._events.clear()
+			self.dirty = False
+
+			# the first flush of a new user writes the snapshot, so the data file exists from the start
+			if self._snapshot is None or self.log_file.stat().st_size > self.compact_threshold:
+				self.compact()
+		return True
+
+	def compact(self) -> None:
+		"""Writes the user's data, including the changes of other processes, to a new snapshot and empties the event log."""
+		with locked(self.data_file):
+			# re-read, as other processes may have flushed changes this session has not seen yet
+			data = self._read()
+
+			def write(temp_file):
+				with open(temp_file, "w", encoding="UTF-8") as f:
+					json.dump(data, f)
+
+			replace_file(self.data_file, write)
+
+			# replaying the log onto the new snapshot changes nothing, so a crash before this line loses no data
+			self.log_file.unlink(missing_ok=True)
+			self._snapshot = self._snapshot_id()
+			self._log_offset = 0
+			self._log_ends_line = True
+
+		self.data = data
+		for event in self._events:
+			apply_event(self.data, event)  # changes not flushed yet
+
+	def has_attr(self, attribute: str) -> bool:
+		"""Checks if today's value of the given attribute is set."""
+		today = str(dt.date.today())
+		return False if self.data.get(attribute).get(today) is None else True
+
+	def get_attr(self, attribute: str):
+		"""Gets the given attribute, or today's value of it for daily attributes."""
+		if attribute in DAILY_ATTRIBUTES:
+			today = str(dt.date.today())
+			return self.data.get(attribute).get(today, [])
+		return self.data.get(attribute, None)
 
-	user_data = json.loads(USER_DATA_FILE.read_text(encoding="UTF-8"))
+	def set_attr(self, attribute: str, value) -> None:
+		"""Sets the given attribute."""
+		self._record({"op": "set", "attribute": attribute, "value": value})
 
-	user_data["last_login"] = dt.datetime.now().isoformat()
-	user_data["task_csv"] = str(USER_TASK_FILE)
+	def set_daily_attr(self, attribute: str, value) -> None:
+		"""Sets today's value of the given daily attribute."""
+		self._record({"op": "set_daily", "attribute": attribute, "date": str(dt.date.today()), "value": value})
 
-	USER_DATA_FILE.write_text(json.dumps(user_data))
+	def add_task(self, task_list: str, task_id: str) -> None:
+		"""Adds a task to today's entry of the given task list."""
+		self._record({"op": "add", "list": task_list, "date": str(dt.date.today()), "task_id": task_id})
 
-	return user_data
+	def del_task(self, task_list: str, task_id: str) -> None:
+		"""Removes a task from today's entry of the given task list."""
+		self._record({"op": "del", "list": task_list, "date": str(dt.date.today()), "task_id": task_id})
+
+
+class SqliteUserDataSession(UserDataSession):
+	"""
+	A user data session stored in an SQLite database instead of a JSON file and event log.
+
+	The profile, the velocities and the task lists each have their own table, the task lists keyed by date and list
+	type, so every change is a single row written in place. flush() commits the pending changes.
+	"""
+
+	def __init__(self, data_file: Path = USER_DATA_FILE, task_file: Path = USER_TASK_FILE,
+	             schema_file: Path = USER_DATA_SCHEMA_FILE, login: bool = True):
+		self.connection = sqlite3.connect(data_file, check_same_thread=False)  # e.g. flushed from a service thread
+		self.connection.executescript(USER_DATA_SQLITE_SCHEMA)
+		super().__init__(data_file, task_file, schema_file, login=login)
+
+	def _read(self) -> dict:
+		data = json.loads(self.schema_file.read_text(encoding="UTF-8"))
+		for attribute, value in self.connection.execute("SELECT attribute, value FROM profile"):
+			data[attribute] = json.loads(value)
+		for date, velocity in self.connection.execute("SELECT date, velocity FROM velocity"):
+			data["velocity"][date] = velocity
+		for date, task_list, task_id in self.connection.execute(
+				"SELECT date, list_type, task_id FROM history ORDER BY rowid"):
+			data[f"{task_list}_tasks"].setdefault(date, []).append(task_id)
+
+		return data
+
+	def _record(self, event: dict) -> None:
+		if not apply_event(self.data, event):
+			return
+
+		op = event["op"]
+		if op == "set":
+			self.connection.execute("INSERT INTO profile (attribute, value) VALUES (?, ?) "
+			                        "ON CONFLICT (attribute) DO UPDATE SET value = excluded.value",
+			                        (event["attribute"], json.dumps(event["value"])))
+		elif op == "set_daily" and event["attribute"] == "velocity":
+			self.connection.execute("INSERT INTO velocity (date, velocity) VALUES (?, ?) "
+			                        "ON CONFLICT (date) DO UPDATE SET velocity = excluded.velocity",
+			                        (event["date"], event["value"]))
+		elif op == "set_daily":
+			task_list = event["attribute"].removesuffix("_tasks")
+			self.connection.execute("DELETE FROM history WHERE date = ? AND list_type = ?", (event["date"], task_list))
+			self.connection.executemany("INSERT OR IGNORE INTO history (date, list_type, task_id) VALUES (?, ?, ?)",
+			                            [(event["date"], task_list, task_id) for task_id in event["value"]])
+		elif op == "add":
+			self.connection.execute("INSERT OR IGNORE INTO history (date, list_type, task_id) VALUES (?, ?, ?)",
+			                        (event["date"], event["list"], event["task_id"]))
+		elif op == "del":
+			self.connection.execute("DELETE FROM history WHERE date = ? AND list_type = ? AND task_id = ?",
+			                        (event["date"], event["list"], event["task_id"]))
+		self.dirty = True
+
+	def flush(self) -> bool:
+		"""
+		Commits the user's changed data to the database.
+
+		:return: Whether anything was committed.
+		"""
+		if not self.dirty:
+			return False
+
+		self.connection.commit()
+		self.dirty = False
+		return True
+
+	def compact(self) -> None:
+		pass  # there is no event log to fold
+
+
+_session = None
+
+
+def open_session(data_file: Path = USER_DATA_FILE, task_file: Path = USER_TASK_FILE,
+                 schema_file: Path = USER_DATA_SCHEMA_FILE) -> UserDataSession:
+	"""
+	Opens a new user data session, replacing the current one.
+
+	:param data_file: The user's data file. A .sqlite or .db file opens an SQLite session, anything else a JSON one.
+	:param task_file: The user's task file.
+	:param schema_file: The schema used to create the user's data file, if it does not exist yet.
+	:return: The opened session.
+	"""
+	global _session
+	if _session is not None:
+		_session.flush()
+	_session = new_session(data_file, task_file, schema_file)
+
+	return _session
+
+
+def new_session(data_file: Path, task_file: Path, schema_file: Path = USER_DATA_SCHEMA_FILE,
+                login: bool = True) -> UserDataSession:
+	"""
+	Opens a user data session without making it the current one, e.g. to keep the sessions of many users at once.
+
+	:param data_file: The user's data file. A .sqlite or .db file opens an SQLite session, anything else a JSON one.
+	:param task_file: The user's task file.
+	:param schema_file: The schema used to create the user's data file, if it does not exist yet.
+	:param login: Whether to record the login, or only read the user's data.
+	:return: The opened session.
+	"""
+	session_type = SqliteUserDataSession if Path(data_file).suffix.lower() in SQLITE_SUFFIXES else UserDataSession
+	return session_type(data_file, task_file, schema_file, login=login)
+
+
+def get_session() -> UserDataSession:
+	"""
+	Gets the current user data session, opening one on first use.
+
+	:return: The current session.
+	"""
+	return _session if _session is not None else open_session()
+
+
+def load() -> dict:
+	"""
+	Loads the user's data from the current session.
+
+	:return: The loaded user's data.
+	"""
+	return get_session().data
 
 
 def greeting():
@@ -63,9 +376,7 @@ def has_attr(attribute: str) -> bool:
 	:param attribute: The attribute to check.
 	:return: Whether the user has the given attribute.
 	"""
-	user_data = load()
-	today = str(dt.date.today())
-	return False if user_data.get(attribute).get(today) is None else True
+	return get_session().has_attr(attribute)
 
 
 def get_attr(attribute: str):
@@ -75,11 +386,7 @@ def get_attr(attribute: str):
 	:param attribute: The attribute to get.
 	:return: The specified attribute, if it exists, otherwise None.
 	"""
-	user_data = load()
-	if attribute in ['velocity', 'selected_tasks', 'completed_tasks', 'suggested_tasks', 'rejected_tasks']:
-		today = str(dt.date.today())
-		return user_data.get(attribute).get(today, [])
-	return user_data.get(attribute, None)
+	return get_session().get_attr(attribute)
 
 
 def add_username(username: str):
@@ -88,9 +395,9 @@ def add_username(username: str):
 
 	:param username: The username to add.
 	"""
-	user_data = load()
-	user_data["username"] = username
-	USER_DATA_FILE.write_text(json.dumps(user_data))
+	session = get_session()
+	session.set_attr("username", username)
+	session.flush()
 	print(f"\n[INFO] Successfully {f'updated username to \'{username}\'' if username else 'removed username'}.")
 
 	# re-greet them by their new name :)
@@ -104,10 +411,9 @@ def add_velocity(velocity: int):
 
 	:param velocity: The velocity to add.
 	"""
-	user_data = load()
-	today = str(dt.date.today())
-	user_data["velocity"][today] = velocity
-	USER_DATA_FILE.write_text(json.dumps(user_data))
+	session = get_session()
+	session.set_daily_attr("velocity", velocity)
+	session.flush()
 	# print(f"[DEBUG] User velocity updated.")
 
 
@@ -120,11 +426,7 @@ def get_selected_effort() -> int:
 	user_data = load()
 	selected_tasks = get_attr('selected_tasks')
 
-	selected_effort = 0
-	for selected_task in selected_tasks:
-		selected_effort += task.get_effort(selected_task, user_data.get('task_csv'))
-
-	return selected_effort
+	return task.get_total_effort(selected_tasks, user_data.get('task_csv'))
 
 
 def add_task(task_list: str, task_id: str):
@@ -135,17 +437,10 @@ def add_task(task_list: str, task_id: str):
 	:param task_id: The task ID to add.
 	:raises: AssertionError if the task_list is not one of the following: ["completed", "suggested", "rejected", "selected"]
 	"""
-	assert task_list in ["completed", "suggested", "rejected", "selected"], "Invalid list type"
-	user_data = load()
-	today = str(dt.date.today())
-
-	if not user_data[f"{task_list}_tasks"].get(today):
-		user_data[f"{task_list}_tasks"][today] = []
-
-	if task_id not in user_data[f"{task_list}_tasks"][today]:
-		user_data[f"{task_list}_tasks"][today].append(task_id)
-
-	USER_DATA_FILE.write_text(json.dumps(user_data))
+	assert task_list in TASK_LISTS, "Invalid list type"
+	session = get_session()
+	session.add_task(task_list, task_id)
+	session.flush()
 	# print(f"[DEBUG] Added task {task_id} to {task_list}_tasks.")
 
 
@@ -157,14 +452,10 @@ def del_task(task_list: str, task_id: str):
 	:param task_id: The task ID to add.
 	:raises: AssertionError if the task_list is not one of the following: ["completed", "suggested", "rejected", "selected"]
 	"""
-	assert task_list in ["completed", "suggested", "rejected", "selected"], "Invalid list type"
-	user_data = load()
-	today = str(dt.date.today())
-
-	if task_id in user_data[f"{task_list}_tasks"][today]:
-		user_data[f"{task_list}_tasks"][today].remove(task_id)
-
-	USER_DATA_FILE.write_text(json.dumps(user_data))
+	assert task_list in TASK_LISTS, "Invalid list type"
+	session = get_session()
+	session.del_task(task_list, task_id)
+	session.flush()
 
 
 def display_message():
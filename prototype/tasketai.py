@@ -4,7 +4,7 @@ Description: Main runner file.
 
 Author: Lacie Turner
 Date created: 2025-02-10
-Date last modified: 2025-02-13
+Date last modified: 2026-10-18
 Python Version: 3.12
 """
 
@@ -15,12 +15,18 @@ __credits__ = ["Lacie Turner"]
 __status__ = "Development"
 __version__ = "0.0.1"
 
-import inquirer
-import pandas as pd
+import sys
+import json
+import argparse
 import prototype.src.task as task
-from inquirer import errors
+from pathlib import Path
+import prototype.src.planner as planner
 import prototype.src.user_data as user_data
-from prototype.src.user_data import USER_TASK_FILE
+from prototype.src.suggestions import SUGGESTION_LIMIT, suggest_from_index, to_records
+from prototype.src.user_data import USER_DATA_FILE, USER_TASK_FILE
+from prototype.src.lazy_import import lazy_import
+
+inquirer = lazy_import("inquirer")
 
 MAX_TASKS_PER_PAGE = 20
 MAX_SUGGESTIONS_PER_PAGE = 3
@@ -52,31 +58,43 @@ def task_input_validation(answers, current):
 		assert int(importance) in range(1, 6), "Must be between 1 and 5"
 		assert int(effort) in range(1, 4), "Must be between 1 and 3"
 	except AssertionError as err:
-		raise errors.ValidationError("", reason=str(err))
+		from inquirer.errors import ValidationError
+		raise ValidationError("", reason=str(err))
 	except KeyboardInterrupt:
 		raise
 	return True
 
 
 def view_task_list() -> None:
-	"""Paginated view of task list."""
-	task_df = task.load(USER_TASK_FILE)
-	# print(f"[DEBUG] Loaded {len(task_df)} tasks")
-
-	start = 0
-	end = MAX_TASKS_PER_PAGE if len(task_df) > MAX_TASKS_PER_PAGE else -1
-	load_more = True if len(task_df) > MAX_TASKS_PER_PAGE else False
+	"""Paginated view of task list. Only the tasks on the current page are read from the task file."""
+	task_file = user_data.get_attr('task_csv')
+	page = 0
 	while True:
-		task.display_list(task_df, start, end)
-		if end >= len(task_df):
-			load_more = False
+		# read one task past the page, to know whether there is a next page
+		tasks = task.read_page(task_file, page * MAX_TASKS_PER_PAGE, MAX_TASKS_PER_PAGE + 1)
+		if not tasks and page > 0:
+			print(f"\n[INFO] There is no page {page + 1}.\n")
+			page = previous_page
+			continue
+		task.display_list(tasks, 0, MAX_TASKS_PER_PAGE)
+		print(f"Page {page + 1}\n")
+
+		choices = ([("See more", "next")] if len(tasks) > MAX_TASKS_PER_PAGE else []) + \
+		          ([("Previous page", "previous")] if page > 0 else []) + \
+		          [("Go to page", "go_to"), ("Back", "back")]
 		try:
-			choice = inquirer.list_input("Select an option", choices=["See more", "Back"] if load_more else ["Back"])
-			if choice == "Back":
+			choice = inquirer.list_input("Select an option", choices=choices)
+			previous_page = page
+			if choice == "back":
 				break
-			elif choice == "See more":
-				start = end
-				end = start + MAX_TASKS_PER_PAGE
+			elif choice == "next":
+				page += 1
+			elif choice == "previous":
+				page -= 1
+			elif choice == "go_to":
+				number = inquirer.text(message="Page number",
+				                       validate=lambda _, current: current.isdigit() and int(current) >= 1)
+				page = int(number) - 1
 
 		except KeyboardInterrupt:
 			break
@@ -107,7 +125,7 @@ def add_task_input() -> None:
 		         urgency=answers.get('urgency'),
 		         importance=answers.get('importance'),
 		         effort=answers.get('effort'),
-		         csv_file=USER_TASK_FILE)
+		         csv_file=user_data.get_attr('task_csv'))
 
 	except (TypeError, KeyboardInterrupt):
 		return
@@ -147,122 +165,47 @@ def settings_menu() -> None:
 	except KeyboardInterrupt:
 		return
 
-def merge_task_suggestions(task_list_1, task_list_2, chunk_size: int = 2, nth_index: int = 4) -> list:
-	"""
-	Merges task_list_2 into task_list_1 at every nth and nth + 1 index.
-	Example 1:
-		task_list_1 = [0, 1, 2, 3, 4]
-		task_list_2 = ['a', 'b', 'c', 'd', 'e', 'f', 'g']
-		index = 4
-		result = [0, 1, 2, 3, 'a', 'b', 4, 'c', 'd', 'e', 'f', 'g']
-	Example 2:
-		task_list_1 = [0, 1, 2, 3, 4, 5, 6, 7, 8, 9, 10, 11, 12]
-		task_list_2 = ['a', 'b', 'c']
-		index = 4
-		result = [0, 1, 2, 3, 'a', 'b', 4, 5, 6, 7, 'c', 8, 9, 10, 11, 12]
-	
-	:param task_list_1: The list to be merged into.
-	:param task_list_2: The list to merge.
-	:param chunk_size: The chunk size of task_list_2 to merge.
-	:param nth_index: The nth index of task_list_1 to be merged to.
-	"""
-	# break list_2 into chunks
-	task_list_2_chunks = [task_list_2[i:i+chunk_size] for i in range(0, len(task_list_2), chunk_size)]
-
-	insert_count = 0
-	for i in range(len(task_list_1)):
-		if not task_list_2_chunks:
-			# no more chunks, stop iterating
-			break
-		if i > 0 and i % nth_index == 0:
-			# get list_2 chunk
-			task_list_2_chunk = task_list_2_chunks.pop(0)
-			# insert at nth index
-			task_list_1.insert(i + insert_count, task_list_2_chunk)
-			# keep track of inserts to offset index shift from insertion
-			insert_count += 1
-
-	task_list_1.extend(task_list_2_chunks)  # add leftover chunks, if any
-	task_list_1 = [element for item in task_list_1 for element in (item if isinstance(item, list) else [item])]  # flatten the list
-
-	return task_list_1
-
-
-def get_suggestions(velocity: int):
+def get_suggestions(velocity: int, limit: int = None, records: bool = False):
 	"""
 	Prompts the user to select from a paginated view of suggested tasks.
 
 	:param velocity: The velocity of the user.
+	:param limit: Only return the first limit suggestions, if given. Each effort tier is then only ranked as far as it
+	              can contribute to the first limit suggestions.
+	:param records: Whether to return (Task, relevance score) pairs instead of a DataFrame, e.g. to display them.
 	"""
 	task_file = user_data.get_attr('task_csv')
-	ranked_tasks = task.rank(task_file)
-	selected_tasks = user_data.get_attr('selected_tasks') if user_data.get_attr('selected_tasks') else []
-
-	suggested_task_ids = []
-	if velocity == 1:
-		low_effort_tasks = ranked_tasks.loc[ranked_tasks['effort'] == 1]
-		for index, row in low_effort_tasks.iterrows():
-			suggested_task_ids.append(row['id']) if row['id'] not in selected_tasks else None
-
-	elif velocity == 2:
-		low_effort_tasks = ranked_tasks.loc[ranked_tasks['effort'] == 1]
-		med_effort_tasks = ranked_tasks.loc[ranked_tasks['effort'] == 2]
-
-		for index, row in med_effort_tasks.iterrows():
-			suggested_task_ids.append(row['id']) if row['id'] not in selected_tasks else None
-
-		low_effort_task_ids = []
-		for index, row in low_effort_tasks.iterrows():
-			low_effort_task_ids.append(row['id']) if row['id'] not in selected_tasks else None
-		suggested_task_ids = merge_task_suggestions(suggested_task_ids, low_effort_task_ids)
-
-	elif velocity == 3:
-		low_effort_tasks = ranked_tasks.loc[ranked_tasks['effort'] == 1]
-		med_effort_tasks = ranked_tasks.loc[ranked_tasks['effort'] == 2]
-		high_effort_tasks = ranked_tasks.loc[ranked_tasks['effort'] == 3]
-
-		for index, row in high_effort_tasks.iterrows():
-			suggested_task_ids.append(row['id']) if row['id'] not in selected_tasks else None
-
-		low_effort_task_ids = []
-		for index, row in low_effort_tasks.iterrows():
-			low_effort_task_ids.append(row['id']) if row['id'] not in selected_tasks else None
-		med_effort_task_ids = []
-		for index, row in med_effort_tasks.iterrows():
-			med_effort_task_ids.append(row['id']) if row['id'] not in selected_tasks else None
-
-		suggested_task_ids = merge_task_suggestions(suggested_task_ids, med_effort_task_ids, chunk_size=2, nth_index=3)
-		suggested_task_ids = merge_task_suggestions(suggested_task_ids, low_effort_task_ids, chunk_size=1, nth_index=5)
+	ranked_index = task.get_ranked_index(task_file)
+	ranked_index.refresh()
+	excluded_tasks = set(user_data.get_attr('selected_tasks')) | set(user_data.get_attr('rejected_tasks'))
 
-	ranked_prioritized_tasks = ranked_tasks.loc[ranked_tasks['id'].isin(suggested_task_ids)].copy()
-	ranked_prioritized_tasks['id'] = pd.Categorical(ranked_prioritized_tasks['id'], categories=suggested_task_ids, ordered=True)
+	task_ids = suggest_from_index(ranked_index, velocity, exclude=excluded_tasks, limit=limit)
 
-	return ranked_prioritized_tasks.sort_values('id')
+	return ranked_index.get_task_records(task_ids) if records else ranked_index.get_tasks(task_ids)
 
 
 def suggest_task_menu() -> None:
 	"""Prompts the user to select suggested tasks."""
 	velocity = user_data.get_attr('velocity') - user_data.get_selected_effort()
-	suggested_tasks = get_suggestions(velocity)
 
 	start_index = 0
-	end_index = MAX_SUGGESTIONS_PER_PAGE if len(suggested_tasks) > MAX_SUGGESTIONS_PER_PAGE else -1
-	load_more = True if len(suggested_tasks) > MAX_SUGGESTIONS_PER_PAGE else False
+	end_index = MAX_SUGGESTIONS_PER_PAGE
 	remaining_velocity = velocity
 	selected_tasks = set()
 
 	try:
 		while remaining_velocity > 0:
-			suggested_tasks = get_suggestions(remaining_velocity)
-
-			if end_index >= len(suggested_tasks):
-				load_more = False
+			# rank one suggestion past the current page to know whether there is another page
+			suggested_tasks = get_suggestions(remaining_velocity, limit=end_index + 1, records=True)
+			load_more = len(suggested_tasks) > end_index
 
 			current_choices = []
 
-			for index, row in suggested_tasks[start_index:end_index].iterrows():
-				current_choices.append((f"[{EFFORT_DICT.get(row['effort'])}] {row['title']}", str(row['id'])))
-				user_data.add_task("suggested", str(row['id']))
+			page = [suggested_task for suggested_task, _ in suggested_tasks[start_index:end_index]]
+			for suggested_task in page:
+				current_choices.append((f"[{EFFORT_DICT.get(suggested_task.effort)}] {suggested_task.title}",
+				                        str(suggested_task.id)))
+				user_data.add_task("suggested", str(suggested_task.id))
 
 			current_choices.append(('See more', 0)) if load_more else None
 			current_choices.append(('Back', -1))
@@ -278,7 +221,7 @@ def suggest_task_menu() -> None:
 				continue
 
 			else:
-				effort = list(suggested_tasks.loc[suggested_tasks['id'] == choice].get('effort'))[0]
+				effort = {suggested_task.id: suggested_task.effort for suggested_task in page}[choice]
 				selected_tasks.add(choice)
 				remaining_velocity -= effort
 
@@ -290,6 +233,33 @@ def suggest_task_menu() -> None:
 		return
 
 
+def auto_plan_menu() -> None:
+	"""Plans the user's day from their remaining velocity and prompts them to accept the plan."""
+	task_file = user_data.get_attr('task_csv')
+	velocity = user_data.get_attr('velocity') - user_data.get_selected_effort()
+	ranked_index = task.get_ranked_index(task_file)
+	ranked_index.refresh()
+	excluded_tasks = set(user_data.get_attr('selected_tasks')) | set(user_data.get_attr('rejected_tasks'))
+	planned_tasks = planner.plan_day(ranked_index, velocity, exclude=excluded_tasks)
+
+	if not planned_tasks:
+		print(f"\n[INFO] There are no tasks that fit your remaining velocity.\n")
+		return
+
+	print(f"\nHere is your plan for today:")
+	for planned_task in planned_tasks:
+		task.display(task_id=planned_task, task_file=task_file)
+	print()
+
+	try:
+		if inquirer.confirm("Select these tasks?", default=True):
+			for planned_task in planned_tasks:
+				user_data.add_task("selected", planned_task)
+
+	except KeyboardInterrupt:
+		return
+
+
 def main_menu():
 	"""Provides the main menu."""
 	user_data.greeting()
@@ -300,6 +270,7 @@ def main_menu():
 			choices.append(("Velocity", 3))
 		if user_data.has_attr('velocity') and user_data.get_selected_effort() < user_data.get_attr('velocity'):
 			choices.append(("Suggest Tasks", 4))
+			choices.append(("Auto-Plan My Day", 5))
 
 		try:
 			choice = inquirer.list_input("Select an option",
@@ -320,6 +291,8 @@ def main_menu():
 				velocity_input()
 			elif choice == 4:
 				suggest_task_menu()
+			elif choice == 5:
+				auto_plan_menu()
 			elif choice == 0:
 				settings_menu()
 
@@ -329,9 +302,260 @@ def main_menu():
 	print("Goodbye!")
 
 
-def main():
-	print_header()
-	main_menu()
+def rank_command(top: int = None) -> list:
+	"""
+	Ranks the user's backlog.
+
+	:param top: Only return the top tasks, if given.
+	:return: The ranked tasks, best first.
+	"""
+	ranked_tasks = task.rank(user_data.get_attr('task_csv'))
+	return to_records(ranked_tasks if top is None else ranked_tasks.head(top))
+
+
+def suggest_command(velocity: int = None, limit: int = SUGGESTION_LIMIT) -> list:
+	"""
+	Suggests tasks, leaving out today's selected and rejected tasks.
+
+	:param velocity: The velocity to suggest tasks for. Defaults to what is left of today's velocity.
+	:param limit: The number of suggestions.
+	:return: The suggested tasks, in the order they should be shown.
+	"""
+	if velocity is None:
+		velocity = (user_data.get_attr('velocity') or 0) - user_data.get_selected_effort()
+	return to_records(get_suggestions(velocity, limit=limit))
+
+
+def add_command(new_tasks) -> dict:
+	"""
+	Adds tasks to the user's backlog, all in one write.
+
+	:param new_tasks: Dicts with a title, urgency, importance and effort each.
+	:return: The IDs of the added tasks, and the reason each rejected task was rejected, by position.
+	"""
+	return task.import_tasks(new_tasks, user_data.get_attr('task_csv'))
+
+
+def list_tasks_command(task_list: str, task_ids) -> dict:
+	"""
+	Adds existing tasks to one of today's task lists, e.g. to select or complete them. Completed tasks are also marked
+	complete in the task file, so they are no longer ranked.
+
+	:param task_list: The list to add the tasks to, e.g. "selected".
+	:param task_ids: The IDs of the tasks.
+	:return: The IDs that were added, and those that do not exist.
+	"""
+	repository = task.get_repository(user_data.get_attr('task_csv'))
+	added, unknown = [], []
+	for task_id in task_ids:
+		if repository.get_record(task_id) is None:
+			unknown.append(task_id)
+			continue
+		if task_list == "completed":
+			repository.complete(task_id)
+		user_data.get_session().add_task(task_list, task_id)
+		added.append(task_id)
+	user_data.get_session().flush()
+
+	return {task_list: added, "unknown": unknown}
+
+
+def update_command(task_id: str, changes: dict) -> dict:
+	"""
+	Changes the fields of a single task in the user's backlog.
+
+	:param task_id: The ID of the task.
+	:param changes: The new values, e.g. {"urgency": 5, "due_date": "2026-11-01"}.
+	:return: The updated task, or the ID if it does not exist.
+	:raises: ValueError if a field is unknown or invalid.
+	"""
+	try:
+		record = task.update(task_id, user_data.get_attr('task_csv'), **changes)
+	except KeyError:
+		return {"updated": None, "unknown": [task_id]}
+
+	return {"updated": record.to_dict(), "unknown": []}
+
+
+def read_ndjson(lines):
+	"""Parses one JSON value per line, skipping blank lines. Lines that are not valid JSON are parsed as None."""
+	for line in lines:
+		if not line.strip():
+			continue
+		try:
+			yield json.loads(line)
+		except json.JSONDecodeError:
+			yield None
+
+
+def int_option(options: dict, name: str, default: int = None, minimum: int = 0, maximum: int = None) -> int:
+	"""
+	Gets a whole number option of a command, e.g. 2 or "2" when read from JSON.
+
+	:param options: The command's options.
+	:param name: The name of the option.
+	:param default: The value if the option is missing or null.
+	:param minimum: The smallest valid value.
+	:param maximum: The largest valid value, if any.
+	:return: The option's value.
+	:raises: ValueError if the value is not a whole number in range.
+	"""
+	value = options.get(name)
+	if value is None:
+		return default
+	try:
+		valid = not isinstance(value, bool) and int(value) == float(value)
+	except (TypeError, ValueError):
+		valid = False
+	if not valid or int(value) < minimum or (maximum is not None and int(value) > maximum):
+		raise ValueError(f"{name} must be a whole number from {minimum}" + (f" to {maximum}" if maximum is not None else ""))
+	return int(value)
+
+
+def run_command(command: str, **options):
+	"""
+	Runs a single batch command for the current user.
+
+	:param command: One of "rank", "suggest", "add", "select", "complete" or "update".
+	:param options: The command's options, as named by the command line, e.g. top, velocity, limit, tasks or ids, or
+	                the id and changes of an update.
+	:return: The command's result, as JSON-friendly values.
+	:raises: ValueError if the command or one of its options is invalid.
+	"""
+	if command == "rank":
+		return rank_command(int_option(options, "top"))
+	elif command == "suggest":
+		return suggest_command(int_option(options, "velocity", maximum=3),
+		                       int_option(options, "limit", SUGGESTION_LIMIT))
+	elif command == "add":
+		return add_command(options.get("tasks", []))
+	elif command == "select":
+		return list_tasks_command("selected", options.get("ids", []))
+	elif command == "complete":
+		return list_tasks_command("completed", options.get("ids", []))
+	elif command == "update":
+		return update_command(options.get("id"), options.get("changes", {}))
+	raise ValueError(f"Unknown command: {command}")
+
+
+def batch_command(requests, data_file: Path = USER_DATA_FILE, task_file: Path = USER_TASK_FILE) -> None:
+	"""
+	Runs many commands in one process, writing one JSON result line per request.
+
+	Each request is an object with a "command" and its options, and optionally the "data_file" and "task_file" of the
+	user it is for, e.g. {"command": "suggest", "velocity": 2, "data_file": "data/ada.json"}. Requests for the same
+	user share their session and ranking.
+
+	:param requests: The parsed requests.
+	:param data_file: The data file of requests that do not name one.
+	:param task_file: The task file of requests that do not name one.
+	"""
+	default_data_file, default_task_file = data_file, task_file
+	for request in requests:
+		try:
+			if not isinstance(request, dict):
+				raise ValueError("Requests must be JSON objects")
+			data_file = Path(request.get("data_file", default_data_file)).resolve()
+			task_file = Path(request.get("task_file", default_task_file)).resolve()
+			session = user_data.get_session()
+			if session.data_file.resolve() != data_file or session.task_file.resolve() != task_file:
+				user_data.open_session(data_file, task_file)
+			options = {key: value for key, value in request.items() if key not in ("command", "data_file", "task_file")}
+			response = {"ok": True, "result": run_command(request.get("command"), **options)}
+		except Exception as err:
+			response = {"ok": False, "error": f"{type(err).__name__}: {err}"}
+		print(json.dumps(response), flush=True)
+
+	user_data.get_session().flush()
+
+
+def print_result(command: str, result) -> None:
+	"""Prints the result of a batch command for people rather than programs."""
+	if command in ("rank", "suggest"):
+		for position, ranked_task in enumerate(result, start=1):
+			print(f"{position:>4}. [{EFFORT_DICT.get(ranked_task['effort'])}] {ranked_task['title']} "
+			      f"({ranked_task['relevance_score']:.2f}) {ranked_task['id']}")
+	elif command == "add":
+		for task_id in result["added"]:
+			print(f"[INFO] Task added: {task_id}")
+	elif command == "update":
+		if result["updated"] is not None:
+			print(f"[INFO] Task updated: {result['updated']['id']}")
+	else:
+		for task_id in result["selected" if command == "select" else "completed"]:
+			print(f"[INFO] Task {'selected' if command == 'select' else 'completed'}: {task_id}")
+	for error in result.get("errors", []) if isinstance(result, dict) else []:
+		print(f"[ERROR] Task {error['position']}: {error['error']}", file=sys.stderr)
+	for task_id in result.get("unknown", []) if isinstance(result, dict) else []:
+		print(f"[ERROR] No task with ID {task_id}", file=sys.stderr)
+
+
+def parse_args(argv: list = None) -> argparse.Namespace:
+	parser = argparse.ArgumentParser(description="Tasketai. Runs the interactive menu unless a command is given.")
+	parser.add_argument("--data-file", type=Path, default=USER_DATA_FILE, help="the user's data file")
+	parser.add_argument("--task-file", type=Path, default=USER_TASK_FILE, help="the user's task file")
+	parser.add_argument("--json", action="store_true", help="print results as JSON")
+	# --json may also follow the command. It is suppressed there by default, so it does not undo a --json before it
+	output_parser = argparse.ArgumentParser(add_help=False)
+	output_parser.add_argument("--json", action="store_true", default=argparse.SUPPRESS, help="print results as JSON")
+	commands = parser.add_subparsers(dest="command")
+
+	rank_parser = commands.add_parser("rank", parents=[output_parser], help="rank the backlog")
+	rank_parser.add_argument("--top", type=int, help="only print the top N tasks")
+
+	suggest_parser = commands.add_parser("suggest", parents=[output_parser], help="suggest tasks")
+	suggest_parser.add_argument("--velocity", type=int, choices=range(0, 4), help="defaults to today's remaining velocity")
+	suggest_parser.add_argument("--limit", type=int, default=SUGGESTION_LIMIT, help="number of suggestions")
+
+	commands.add_parser("add", parents=[output_parser],
+	                    help="add tasks read from stdin, one JSON object per line, e.g. "
+	                         "{\"title\": \"...\", \"urgency\": 3, \"importance\": 4, \"effort\": 1}")
+
+	select_parser = commands.add_parser("select", parents=[output_parser], help="select tasks for today")
+	select_parser.add_argument("ids", nargs="+", help="task IDs")
+
+	complete_parser = commands.add_parser("complete", parents=[output_parser],
+	                                      help="mark tasks complete, and as completed today")
+	complete_parser.add_argument("ids", nargs="+", help="task IDs")
+
+	update_parser = commands.add_parser("update", parents=[output_parser], help="change the fields of a task")
+	update_parser.add_argument("id", help="task ID")
+	update_parser.add_argument("--title")
+	update_parser.add_argument("--urgency", type=int, choices=range(1, 6))
+	update_parser.add_argument("--importance", type=int, choices=range(1, 6))
+	update_parser.add_argument("--effort", type=int, choices=range(1, 4))
+	update_parser.add_argument("--due-date", help="ISO 8601 date, or \"\" to remove the due date")
+
+	commands.add_parser("batch", parents=[output_parser],
+	                    help="run commands read from stdin, one JSON object per line, and print one JSON result per line")
+
+	return parser.parse_args(argv)
+
+
+def main(argv: list = None):
+	args = parse_args(argv)
+	task.use_rank_cache_dir(user_data.RANK_CACHE_DIR)
+	user_data.open_session(args.data_file, args.task_file)
+
+	if args.command is None:
+		print_header()
+		main_menu()
+	elif args.command == "batch":
+		batch_command(read_ndjson(sys.stdin), args.data_file, args.task_file)
+	else:
+		options = {"top": getattr(args, "top", None), "velocity": getattr(args, "velocity", None),
+		           "limit": getattr(args, "limit", SUGGESTION_LIMIT), "ids": getattr(args, "ids", [])}
+		if args.command == "add":
+			options["tasks"] = read_ndjson(sys.stdin)
+		elif args.command == "update":
+			options["id"] = args.id
+			options["changes"] = {field: getattr(args, field) for field in ("title", "urgency", "importance", "effort",
+			                                                                 "due_date") if getattr(args, field) is not None}
+		result = run_command(args.command, **options)
+		if args.json:
+			print(json.dumps(result))
+		else:
+			print_result(args.command, result)
 
 
 if __name__ == '__main__':